@@ -1,10 +1,15 @@
 import numpy as np
 from tqdm import tqdm
 
-from ..utils.DataLoader import load_dataset
+from ..utils.Distance import load_distance
 from ..utils.DataWriter import DataWriter
+from ..utils.CandidateList import make_candidate_list
+from ..utils.Memmap import allocate_array
+from ..LocalSearch import LocalSearch
 # from .src.Logger import *
 from .src.Agent import Agent, AgentRank
+from .src.RouteBuilder import build_route
+from .src.Pheromone import deposit_pheromone
 
 
 class AntSystem:
@@ -19,13 +24,19 @@ class AntSystem:
         INIT_PHEROMONE {float} -- initial pheromone concentration (default: 1.0)
         PHEROMONE_Q {float} --  numerator of calculating pheromone increase(default: 1.0)
         IS_SAVE {bool} -- wehther save results or not (default: True)
+        CANDIDATE_NUM {int} -- the number of nearest cities which agents choose from (default: None)
         CITY_NUM {float} -- the number of cities
         AGENT_NUM {float} -- the number of agents
         agent {Agent} -- each agents' information
         pheromone {np.ndarray} -- pheromone concentration
-        distance {np.ndarray} -- distance between cities
+        distance {DistanceBase} -- distance between cities
         distance_inv {np.ndarray} -- inverse of distance
+        choice {np.ndarray} -- buffer of pheromone ** ALPHA * distance_inv, which is reused at every iteration
+        candidate {np.ndarray} -- each city's nearest cities, None when CANDIDATE_NUM is None
+        local_search {LocalSearch} -- local search which improves the best ant of each iteration, None when it's disabled
+        rng {np.random.Generator} -- random generator of route building, None when np.random is used
         best_distance {float} -- the best score
+        best_route {np.ndarray} -- the best route
         pre_best_distance {float} -- the best score of previous iteration
         writer {DataWriter} -- writer for saving scores
 
@@ -45,7 +56,9 @@ class AntSystem:
     """
 
     def __init__(self, dataset_filename, agent_num,
-                 alpha=1.0, beta=5.0, rho=0.5, init_pheromone=1.0, pheromone_q=1.0, is_save=True, save_filename="result.csv"):
+                 alpha=1.0, beta=5.0, rho=0.5, init_pheromone=1.0, pheromone_q=1.0, is_save=True, save_filename="result.csv",
+                 candidate_num=None, dtype=np.float64, mmap_mode=None, distance_mode="dense", local_search=False, seed=None,
+                 distance_inv=None):
         """
         Arguments:
         ----------
@@ -61,8 +74,15 @@ class AntSystem:
             pheromone_q {float} --  numerator of calculating pheromone increase(default: 1.0)
             is_save {bool} -- wehther save results or not (default: True)
             save_filename {str} -- file name of results (default: result.csv)
+            candidate_num {int} -- the number of nearest cities which agents choose from. If this is None, agents choose from all cities (default: None)
+            dtype {np.dtype} -- data type of distance, pheromone and distance_inv (default: np.float64)
+            mmap_mode {str} -- if this is set, distance is memory-mapped from dataset cache with this mode, and pheromone and distance_inv are backed by temporary files (default: None)
+            distance_mode {str} -- "dense" holds distance array, "coordinate" calculates distance from coordinates when it's needed (default: "dense")
+            local_search {bool} -- whether improve the best ant of each iteration with 2-opt and Or-opt or not (default: False)
+            seed {int} -- seed of random generator. If this is None, np.random is used (default: None)
+            distance_inv {np.ndarray} -- precomputed inverse of distance ** BETA, which is shared by colonies of MultiColony (default: None)
         """
-        city_num, distance = load_dataset(dataset_filename)
+        city_num, distance = load_distance(dataset_filename, distance_mode, dtype, mmap_mode)
         self.CITY_NUM = city_num
         self.AGENT_NUM = agent_num
         self.ALPHA = alpha
@@ -71,14 +91,29 @@ class AntSystem:
         self.INIT_PHEROMONE = init_pheromone
         self.PHEROMONE_Q = pheromone_q
         self.IS_SAVE = is_save
+        self.CANDIDATE_NUM = candidate_num
         if is_save:
             self.writer = DataWriter(save_filename)
 
         self.agent = Agent(self.CITY_NUM, self.AGENT_NUM)
-        self.pheromone = np.ones((self.CITY_NUM, self.CITY_NUM)) * init_pheromone
+        use_mmap = mmap_mode is not None
+        self.pheromone = allocate_array((self.CITY_NUM, self.CITY_NUM), dtype, use_mmap)
+        self.pheromone.fill(init_pheromone)
         self.distance = distance
-        self.distance_inv = 1.0 / pow(distance, self.BETA)
+        self.distance_inv = distance_inv
+        if distance_inv is None:
+            self.distance_inv = allocate_array((self.CITY_NUM, self.CITY_NUM), dtype, use_mmap)
+            for start, stop, row_distance in distance.iter_rows():
+                np.power(row_distance, self.BETA, out=self.distance_inv[start:stop])
+            np.divide(1.0, self.distance_inv, out=self.distance_inv)
+        self.choice = allocate_array((self.CITY_NUM, self.CITY_NUM), dtype, use_mmap)
+        self.candidate = None if candidate_num is None else make_candidate_list(distance, candidate_num)
+        self.local_search = None
+        if local_search:
+            self.local_search = LocalSearch(distance, candidate=self.candidate)
+        self.rng = None if seed is None else np.random.default_rng(seed)
         self.best_distance = np.inf
+        self.best_route = None
         self.pre_best_distance = np.inf
 
     def search(self, iteration, is_judge_convergence=False, convergence_iteration=None):
@@ -99,13 +134,7 @@ class AntSystem:
         converge_cnt = 0
 
         for i in range(iteration):
-            self.agent.reset_agent()
-            self._generate_route()
-            self.agent.find_best()
-            self._update_pheromone()
-
-            if self.agent.best_distance < self.best_distance:
-                self.best_distance = self.agent.best_distance
+            if self._iterate():
                 converge_cnt = 0
             elif self.best_distance == self.pre_best_distance:
                 converge_cnt += 1
@@ -119,58 +148,68 @@ class AntSystem:
 
             self.pre_best_distance = self.best_distance
 
-        self.writer.save()
+        if self.IS_SAVE:
+            self.writer.save()
+
+    def receive_route(self, route, route_distance):
+        """ deposit pheromone on route which is found by other colony.
+        best_distance and best_route are kept, so that they are found by this colony itself
+
+        Arguments:
+        ----------
+            route {np.ndarray} -- route
+            route_distance {float} -- distance of route
+        """
+        deposit_pheromone(self.pheromone, route, self.PHEROMONE_Q / route_distance)
+
+    def _iterate(self):
+        """ move all agents once and update pheromone
+
+        Returns:
+        --------
+            {bool} -- True when the best route is updated
+        """
+        self.agent.reset_agent()
+        self._generate_route()
+        if self.local_search is not None:
+            self._improve_iteration_best()
+        self.agent.find_best()
+        self._update_pheromone()
+
+        if self.agent.best_distance < self.best_distance:
+            self.best_distance = self.agent.best_distance
+            self.best_route = self.agent.best_route.copy()
+            return True
+        return False
 
     def _generate_route(self):
         """ generate route"""
-        for agent in self.agent:
-            start = np.random.randint(0, self.CITY_NUM, 1)[0]
-            prob_arr = np.zeros(self.CITY_NUM)
-            agent.set_next_city(start)
-
-            for i in range(self.CITY_NUM-1):
-                prob_arr *= 0
-                for city in range(self.CITY_NUM):
-                    if not agent.is_already_visit(city):
-                        prob = pow(self.pheromone[city, agent.current_city], self.ALPHA) * self.distance_inv[city, agent.current_city]
-                        prob_arr[city] = prob
-
-                rand = np.random.rand()
-                for city in range(self.CITY_NUM):
-                    if prob_arr[city] == 0:
-                        continue
-
-                    prob = prob_arr[:city+1].sum() / prob_arr.sum()
-                    if prob > rand:
-                        agent.set_next_city(city)
-                        break
-
-            self._calculate_distance(agent)
+        np.power(self.pheromone, self.ALPHA, out=self.choice)
+        self.choice *= self.distance_inv
+        build_route(self.choice, self.agent.route, self.agent.visited, self.candidate, self.rng)
+        self.agent.route_length.fill(self.CITY_NUM)
+        self._calculate_distance(self.agent)
 
     def _calculate_distance(self, agent):
         """ calculate distance
 
         Arguments:
         ----------
-            agent {Agent} -- agent instance which has already route information
+            agent {Agent} -- agents which have already route information
         """
-        distance = 0
-        for i in range(self.CITY_NUM):
-            city1 = agent.route[i]
-            city2 = agent.route[(i+1) % self.CITY_NUM]
-            distance += self.distance[city1, city2]
+        agent.distance[:] = self.distance.route_distance(agent.route)
 
-        agent.distance = distance
+    def _improve_iteration_best(self):
+        """ improve route of the best ant in this iteration with local search"""
+        idx = int(self.agent.distance.argmin())
+        route, route_distance = self.local_search.improve(self.agent.route[idx])
+        self.agent.route[idx] = route
+        self.agent.distance[idx] = route_distance
 
     def _update_pheromone(self):
         """ update pheromone"""
         self.pheromone *= self.RHO
-
-        for agent in self.agent:
-            inc = self.PHEROMONE_Q / agent.distance
-            for base_city, next_city in agent.get_city_pair():
-                self.pheromone[base_city, next_city] += inc
-                self.pheromone[next_city, base_city] += inc
+        deposit_pheromone(self.pheromone, self.agent.route, self.PHEROMONE_Q / self.agent.distance)
 
 
 class MaxMinAntSystem(AntSystem):
@@ -184,14 +223,20 @@ class MaxMinAntSystem(AntSystem):
         INIT_PHEROMONE {float} -- initial pheromone concentration (default: 1.0)
         PHEROMONE_Q {float} --  numerator of calculating pheromone increase(default: 1.0)
         IS_SAVE {bool} -- wehther save results or not (default: True)
+        CANDIDATE_NUM {int} -- the number of nearest cities which agents choose from (default: None)
         CITY_NUM {float} -- the number of cities
         AGENT_NUM {float} -- the number of agents
         PHEROMONE_MIN_COEF {float} -- coefficient which is used at calculating minimum of pheromone concentration
         agent {Agent} -- each agents' information
         pheromone {np.ndarray} -- pheromone concentration
-        distance {np.ndarray} -- distance between cities
+        distance {DistanceBase} -- distance between cities
         distance_inv {np.ndarray} -- inverse of distance
+        choice {np.ndarray} -- buffer of pheromone ** ALPHA * distance_inv, which is reused at every iteration
+        candidate {np.ndarray} -- each city's nearest cities, None when CANDIDATE_NUM is None
+        local_search {LocalSearch} -- local search which improves the best ant of each iteration, None when it's disabled
+        rng {np.random.Generator} -- random generator of route building, None when np.random is used
         best_distance {float} -- the best score
+        best_route {np.ndarray} -- the best route
         pre_best_distance {float} -- the best score of previous iteration
         writer {DataWriter} -- writer for saving scores
 
@@ -211,7 +256,9 @@ class MaxMinAntSystem(AntSystem):
     """
 
     def __init__(self, dataset_filename, agent_num,
-                 alpha=1.0, beta=5.0, rho=0.5, init_pheromone=1.0, pheromone_q=1.0, p_best=0.05, is_save=True, save_filename="result.csv"):
+                 alpha=1.0, beta=5.0, rho=0.5, init_pheromone=1.0, pheromone_q=1.0, p_best=0.05, is_save=True, save_filename="result.csv",
+                 candidate_num=None, dtype=np.float64, mmap_mode=None, distance_mode="dense", local_search=False, seed=None,
+                 distance_inv=None):
         """
         Arguments:
         ----------
@@ -228,25 +275,46 @@ class MaxMinAntSystem(AntSystem):
             p_best {float} -- parameter for calculating minimum of pheromone (default: 0.05)
             is_save {bool} -- wehther save results or not (default: True)
             save_filename {str} -- file name of results (default: result.csv)
+            candidate_num {int} -- the number of nearest cities which agents choose from. If this is None, agents choose from all cities (default: None)
+            dtype {np.dtype} -- data type of distance, pheromone and distance_inv (default: np.float64)
+            mmap_mode {str} -- if this is set, distance is memory-mapped from dataset cache with this mode, and pheromone and distance_inv are backed by temporary files (default: None)
+            distance_mode {str} -- "dense" holds distance array, "coordinate" calculates distance from coordinates when it's needed (default: "dense")
+            local_search {bool} -- whether improve the best ant of each iteration with 2-opt and Or-opt or not (default: False)
+            seed {int} -- seed of random generator. If this is None, np.random is used (default: None)
+            distance_inv {np.ndarray} -- precomputed inverse of distance ** BETA, which is shared by colonies of MultiColony (default: None)
         """
         super(MaxMinAntSystem, self).__init__(dataset_filename, agent_num,
                                               alpha, beta, rho, init_pheromone, pheromone_q,
-                                              is_save, save_filename)
+                                              is_save, save_filename, candidate_num, dtype, mmap_mode, distance_mode, local_search,
+                                              seed, distance_inv)
 
         self.PHEROMONE_MIN_COEF = pow(p_best, 1.0/self.CITY_NUM)
 
+    def receive_route(self, route, route_distance):
+        """ deposit pheromone on route which is found by other colony, and keep pheromone within its maximum and minimum
+
+        Arguments:
+        ----------
+            route {np.ndarray} -- route
+            route_distance {float} -- distance of route
+        """
+        super(MaxMinAntSystem, self).receive_route(route, route_distance)
+        # limits come from the best ant of the last iteration, so that before the first iteration it's clipped at the first update
+        if np.isfinite(self.agent.best_distance):
+            self._clip_pheromone()
+
     def _update_pheromone(self):
         """ update pheromone(There're maimum and minimum value of pheromone)"""
         self.pheromone *= self.RHO
-        pheromone_max = 1.0 / ((1 - self.RHO) * self.agent.best_distance)
-        pheromone_min = pheromone_max * (1-self.PHEROMONE_MIN_COEF) / ((self.CITY_NUM / 2 - 1)*self.PHEROMONE_MIN_COEF)
         inc = self.PHEROMONE_Q / self.agent.best_distance
-        for base_city, next_city in self.agent.get_best_route_pair():
-            self.pheromone[base_city, next_city] += inc
-            self.pheromone[next_city, base_city] += inc
+        deposit_pheromone(self.pheromone, self.agent.best_route, inc)
+        self._clip_pheromone()
 
-        self.pheromone[self.pheromone > pheromone_max] = pheromone_max
-        self.pheromone[self.pheromone < pheromone_min] = pheromone_min
+    def _clip_pheromone(self):
+        """ clip pheromone with maximum and minimum which are calculated from the best ant of current iteration"""
+        pheromone_max = 1.0 / ((1 - self.RHO) * self.agent.best_distance)
+        pheromone_min = pheromone_max * (1-self.PHEROMONE_MIN_COEF) / ((self.CITY_NUM / 2 - 1)*self.PHEROMONE_MIN_COEF)
+        np.clip(self.pheromone, pheromone_min, pheromone_max, out=self.pheromone)
 
 
 class AntSystemElite(AntSystem):
@@ -260,14 +328,20 @@ class AntSystemElite(AntSystem):
         INIT_PHEROMONE {float} -- initial pheromone concentration (default: 1.0)
         PHEROMONE_Q {float} --  numerator of calculating pheromone increase(default: 1.0)
         IS_SAVE {bool} -- wehther save results or not (default: True)
+        CANDIDATE_NUM {int} -- the number of nearest cities which agents choose from (default: None)
         CITY_NUM {float} -- the number of cities
         AGENT_NUM {float} -- the number of agents
         PHEROMONE_MIN_COEF {float} -- coefficient which is used at calculating minimum of pheromone concentration
         agent {AgentRank} -- each agents' information with rank information
         pheromone {np.ndarray} -- pheromone concentration
-        distance {np.ndarray} -- distance between cities
+        distance {DistanceBase} -- distance between cities
         distance_inv {np.ndarray} -- inverse of distance
+        choice {np.ndarray} -- buffer of pheromone ** ALPHA * distance_inv, which is reused at every iteration
+        candidate {np.ndarray} -- each city's nearest cities, None when CANDIDATE_NUM is None
+        local_search {LocalSearch} -- local search which improves the best ant of each iteration, None when it's disabled
+        rng {np.random.Generator} -- random generator of route building, None when np.random is used
         best_distance {float} -- the best score
+        best_route {np.ndarray} -- the best route
         pre_best_distance {float} -- the best score of previous iteration
         writer {DataWriter} -- writer for saving scores
 
@@ -286,7 +360,9 @@ class AntSystemElite(AntSystem):
         26277.257
     """
     def __init__(self, dataset_filename, agent_num,
-                 alpha=1.0, beta=5.0, rho=0.5, init_pheromone=1.0, pheromone_q=1.0, is_save=True, save_filename="result.csv"):
+                 alpha=1.0, beta=5.0, rho=0.5, init_pheromone=1.0, pheromone_q=1.0, is_save=True, save_filename="result.csv",
+                 candidate_num=None, dtype=np.float64, mmap_mode=None, distance_mode="dense", local_search=False, seed=None,
+                 distance_inv=None):
         """
         Arguments:
         ----------
@@ -300,6 +376,17 @@ class AntSystemElite(AntSystem):
             rho {float} -- rate of reducing pheromone (default: 0.98)
             init_pheromone {float} -- initial pheromone concentration (default: 1.0)
             pheromone_q {float} --  numerator of calculating pheromone increase(default: 1.0)
+            is_save {bool} -- wehther save results or not (default: True)
+            save_filename {str} -- file name of results (default: result.csv)
+            candidate_num {int} -- the number of nearest cities which agents choose from. If this is None, agents choose from all cities (default: None)
+            dtype {np.dtype} -- data type of distance, pheromone and distance_inv (default: np.float64)
+            mmap_mode {str} -- if this is set, distance is memory-mapped from dataset cache with this mode, and pheromone and distance_inv are backed by temporary files (default: None)
+            distance_mode {str} -- "dense" holds distance array, "coordinate" calculates distance from coordinates when it's needed (default: "dense")
+            local_search {bool} -- whether improve the best ant of each iteration with 2-opt and Or-opt or not (default: False)
+            seed {int} -- seed of random generator. If this is None, np.random is used (default: None)
+            distance_inv {np.ndarray} -- precomputed inverse of distance ** BETA, which is shared by colonies of MultiColony (default: None)
         """
-        super(AntSystemElite, self).__init__(dataset_filename, agent_num, alpha, beta, rho, init_pheromone, pheromone_q)
+        super(AntSystemElite, self).__init__(dataset_filename, agent_num, alpha, beta, rho, init_pheromone, pheromone_q,
+                                             is_save, save_filename, candidate_num, dtype, mmap_mode, distance_mode, local_search,
+                                             seed, distance_inv)
         self.agent = AgentRank(self.CITY_NUM, self.AGENT_NUM)
\ No newline at end of file
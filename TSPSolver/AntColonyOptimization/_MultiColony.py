@@ -0,0 +1,361 @@
+import multiprocessing
+import os
+import tempfile
+import numpy as np
+
+from ._AntColonyOptimization import AntSystem, MaxMinAntSystem, AntSystemElite
+from ..utils.Distance import load_distance, DenseDistance
+from ..utils.DataWriter import DataWriter
+from ..utils.Memmap import allocate_array
+from ..utils.Parallel import SharedArray, get_worker_num, split_chunk, share_array, attach_array
+
+
+class MultiColony:
+    """ Independent ACO colonies which run in parallel.
+    Each colony is AntSystem, MaxMinAntSystem or AntSystemElite with its own seed and pheromone, and colonies are distributed
+    to worker processes which are connected by pipes. Distance and distance_inv are computed once and shared by shared memory,
+    or by their files when mmap_mode is set.
+    Every EXCHANGE_INTERVAL iterations colonies share the best route of all colonies, or their pheromone is replaced by its average.
+    Exchange is synchronous, so that results are the same for the same seed regardless of the number of processes.
+
+    Attributes:
+    -----------
+        CITY_NUM {int} -- the number of cities
+        COLONY_NUM {int} -- the number of colonies
+        MODE {list[str]} -- ACO method of each colony
+        EXCHANGE_INTERVAL {int} -- the number of iterations between exchanges, None when colonies don't exchange
+        EXCHANGE {str} -- "best" where the best route is deposited on all colonies, or "pheromone" where pheromone is averaged
+        IS_SAVE {bool} -- whether save results or not
+        distance {DistanceBase} -- distance between cities
+        distance_inv {np.ndarray} -- inverse of distance ** beta, which is shared by all colonies
+        best_route {np.ndarray} -- the best route of all colonies
+        best_distance {float} -- the best distance of all colonies
+        history {np.ndarray} -- the best distance which each colony found by itself after each iteration, shape is (colony_num, iteration)
+        writer {DataWriter} -- writer for saving scores
+
+    Examples:
+    ---------
+        >>> colony = MultiColony("kroA100.tsp", 4, 100, mode=["AntSystem", "MaxMinAntSystem"] * 2,
+        ...                      exchange_interval=10, exchange="best", seed=0, n_jobs=-1)
+        >>> best_route, best_distance, history = colony.search(100)
+    """
+
+    __MODE = {"AntSystem": AntSystem, "MaxMinAntSystem": MaxMinAntSystem, "AntSystemElite": AntSystemElite}
+    __EXCHANGE = ("best", "pheromone")
+
+    def __init__(self, dataset_filename, colony_num, agent_num, mode="AntSystem", alpha=1.0, beta=5.0, rho=0.5, init_pheromone=1.0,
+                 pheromone_q=1.0, exchange_interval=None, exchange="best", is_save=True, save_filename="result.csv", candidate_num=None,
+                 local_search=False, seed=None, n_jobs=None, dtype=np.float64, mmap_mode=None, distance_mode="dense"):
+        """
+        Arguments:
+        ----------
+            dataset_filename {str} -- dataset file name
+            colony_num {int} -- the number of colonies
+            agent_num {int} -- the number of agents of each colony
+
+        Keyword Arguments:
+        ------------------
+            mode {str or list[str]} -- "AntSystem", "MaxMinAntSystem" or "AntSystemElite", or list of them for each colony (default: "AntSystem")
+            alpha {float} -- weight of pheromone (default: 1.0)
+            beta {float} -- weight of hueristics (default: 5.0)
+            rho {float} -- rate of reducing pheromone (default: 0.5)
+            init_pheromone {float} -- initial pheromone concentration (default: 1.0)
+            pheromone_q {float} --  numerator of calculating pheromone increase(default: 1.0)
+            exchange_interval {int} -- the number of iterations between exchanges. If this is None, colonies never exchange (default: None)
+            exchange {str} -- "best" or "pheromone" (default: "best")
+            is_save {bool} -- whether save results or not (default: True)
+            save_filename {str} -- file name of results (default: result.csv)
+            candidate_num {int} -- the number of nearest cities which agents choose from. If this is None, agents choose from all cities (default: None)
+            local_search {bool} -- whether improve the best ant of each iteration with 2-opt and Or-opt or not (default: False)
+            seed {int} -- seed from which seeds of colonies are spawned. If this is set, results are reproducible (default: None)
+            n_jobs {int} -- the number of processes, which is at most colony_num. -1 means all CPUs (default: None)
+            dtype {np.dtype} -- data type of distance, pheromone and distance_inv (default: np.float64)
+            mmap_mode {str} -- if this is set, distance is memory-mapped from dataset cache with this mode, and distance_inv and
+                               buffers of colonies are backed by temporary files (default: None)
+            distance_mode {str} -- "dense" holds distance array, "coordinate" calculates distance from coordinates when it's needed (default: "dense")
+        """
+        mode = [mode] * colony_num if isinstance(mode, str) else list(mode)
+        if len(mode) != colony_num:
+            raise ValueError(f"The number of modes must be colony_num: {len(mode)}")
+        for _mode in mode:
+            if _mode not in self.__MODE:
+                raise ValueError(f"Unknown mode: {_mode}")
+        if exchange not in self.__EXCHANGE:
+            raise ValueError(f"Unknown exchange: {exchange}")
+
+        city_num, distance = load_distance(dataset_filename, distance_mode, dtype, mmap_mode)
+        self.CITY_NUM = city_num
+        self.COLONY_NUM = colony_num
+        self.MODE = mode
+        self.EXCHANGE_INTERVAL = exchange_interval
+        self.EXCHANGE = exchange
+        self.IS_SAVE = is_save
+        if is_save:
+            self.writer = DataWriter(save_filename)
+
+        self.distance = distance
+        # distance_inv is kept in a named file with mmap_mode, so that workers map it instead of copying it
+        self._tmp_dir = None if mmap_mode is None else tempfile.TemporaryDirectory()
+        filename = None if mmap_mode is None else os.path.join(self._tmp_dir.name, "distance_inv.npy")
+        self.distance_inv = allocate_array((city_num, city_num), dtype, mmap_mode is not None, filename)
+        for start, stop, row_distance in distance.iter_rows():
+            np.power(row_distance, beta, out=self.distance_inv[start:stop])
+        np.divide(1.0, self.distance_inv, out=self.distance_inv)
+        if isinstance(self.distance_inv, np.memmap):
+            self.distance_inv.flush()
+
+        self.n_jobs = n_jobs
+        self._setting = {"agent_num": agent_num, "alpha": alpha, "beta": beta, "rho": rho, "init_pheromone": init_pheromone,
+                         "pheromone_q": pheromone_q, "is_save": False, "candidate_num": candidate_num, "dtype": dtype,
+                         "mmap_mode": mmap_mode, "local_search": local_search}
+        self._seed = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(colony_num)]
+        self.best_route = None
+        self.best_distance = np.inf
+        self.history = np.empty((colony_num, 0))
+
+    def search(self, iteration):
+        """ start searching best route
+
+        Arguments:
+        ----------
+            iteration {int} -- the number of iterations of each colony
+
+        Returns:
+        --------
+            best_route {np.ndarray} -- the best route
+            best_distance {float} -- the best distance
+            history {np.ndarray} -- the best distance which each colony found by itself after each iteration, shape is (colony_num, iteration)
+        """
+        worker_num = min(get_worker_num(self.n_jobs), self.COLONY_NUM)
+        colonies = split_chunk(range(self.COLONY_NUM), worker_num)
+        interval = max(1, iteration) if self.EXCHANGE_INTERVAL is None else self.EXCHANGE_INTERVAL
+        epoch = [interval] * (iteration // interval)
+        if iteration % interval > 0:
+            epoch.append(iteration % interval)
+
+        history = []
+        solver_class = [self.__MODE[mode] for mode in self.MODE]
+        with _ColonyPool(self.distance, self.distance_inv, solver_class, self._setting, self._seed, colonies,
+                         self.EXCHANGE == "pheromone", worker_num > 1) as pool:
+            route = None
+            for i, _iteration in enumerate(epoch):
+                result = pool.iterate(_iteration, route)
+
+                colony_best = np.array([result[colony][1] for colony in range(self.COLONY_NUM)])
+                best_colony = int(colony_best.argmin())
+                if colony_best[best_colony] < self.best_distance:
+                    self.best_distance = float(colony_best[best_colony])
+                    self.best_route = result[best_colony][0]
+                history.append(np.array([result[colony][2] for colony in range(self.COLONY_NUM)]).reshape(self.COLONY_NUM, -1))
+
+                if self.EXCHANGE_INTERVAL is not None:
+                    if self.EXCHANGE == "best":
+                        route = (self.best_route, self.best_distance)
+                    else:
+                        pool.pheromone[...] = pool.pheromone.mean(axis=0)
+
+                print(f"{str(i).rjust(len(str(len(epoch))))} \t{self.best_distance: .3f}")
+                if self.IS_SAVE:
+                    self.writer.write(colony_best)
+
+        if self.IS_SAVE:
+            self.writer.save()
+
+        self.history = np.concatenate([self.history] + history, axis=1)
+        return self.best_route, self.best_distance, self.history
+
+
+class _ColonyPool:
+    """ worker processes which hold colonies, or colonies in this process when it's not parallel
+
+    Attributes:
+    -----------
+        colonies {list[list[int]]} -- colonies of each worker
+        pheromone {np.ndarray} -- pheromone of all colonies, shape is (colony_num, city_num, city_num), None when it isn't shared
+    """
+
+    def __init__(self, distance, distance_inv, solver_class, setting, seed, colonies, is_pheromone_shared, is_parallel):
+        """
+        Arguments:
+        ----------
+            distance {DistanceBase} -- distance between cities
+            distance_inv {np.ndarray} -- inverse of distance ** beta
+            solver_class {list[type]} -- ACO class of each colony
+            setting {dict} -- common arguments of colonies
+            seed {list[int]} -- seed of each colony
+            colonies {list[list[int]]} -- colonies of each worker
+            is_pheromone_shared {bool} -- whether pheromone of colonies is held in one array which this process can average
+            is_parallel {bool} -- whether colonies run in worker processes or not
+        """
+        self.colonies = colonies
+        self.pheromone = None
+        self._shared = []
+        self._process = []
+        self._connection = []
+        colony_num, city_num, distance_inv_dtype = len(solver_class), len(distance_inv), distance_inv.dtype
+        if not is_parallel:
+            if is_pheromone_shared:
+                self.pheromone = np.empty((colony_num, city_num, city_num), dtype=distance_inv.dtype)
+            self._solver = _make_colony(distance, distance_inv, self.pheromone, solver_class, setting, seed, colonies[0])
+            return
+
+        if isinstance(distance, DenseDistance):
+            distance, shared = share_array(distance.matrix)
+            self._shared.append(shared)
+        distance_inv, shared = share_array(distance_inv)
+        self._shared.append(shared)
+        pheromone = None
+        if is_pheromone_shared:
+            self._shared.append(SharedArray.create((colony_num, city_num, city_num), distance_inv_dtype))
+            self.pheromone = self._shared[-1].array
+            pheromone = self._shared[-1].spec
+
+        for _colonies in colonies:
+            connection, child_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_colony_worker,
+                                              args=(child_connection, distance, distance_inv, pheromone, solver_class, setting, seed, _colonies))
+            process.start()
+            child_connection.close()
+            self._process.append(process)
+            self._connection.append(connection)
+
+        # wait until all colonies are made, so that pheromone isn't averaged before it's initialized
+        for connection in self._connection:
+            connection.recv()
+
+    def iterate(self, iteration, route):
+        """ run all colonies
+
+        Arguments:
+        ----------
+            iteration {int} -- the number of iterations
+            route {tuple} -- route and its distance which is deposited on all colonies before running, or None
+
+        Returns:
+        --------
+            {dict[int, tuple]} -- the best route, the best distance and the best distance of each iteration of each colony
+        """
+        if len(self._process) == 0:
+            return _iterate_colony(self._solver, iteration, route)
+
+        for connection in self._connection:
+            connection.send((iteration, route))
+
+        result = {}
+        for connection in self._connection:
+            result.update(connection.recv())
+        return result
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        for connection in self._connection:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+        for process in self._process:
+            process.join()
+        self.pheromone = None
+        for shared in self._shared:
+            if shared is not None:
+                shared.unlink()
+
+
+def _make_colony(distance, distance_inv, pheromone, solver_class, setting, seed, colonies):
+    """ make colonies
+
+    Arguments:
+    ----------
+        distance {DistanceBase} -- distance between cities
+        distance_inv {np.ndarray} -- inverse of distance ** beta
+        pheromone {np.ndarray} -- pheromone of all colonies which colonies use instead of their own, or None
+        solver_class {list[type]} -- ACO class of each colony
+        setting {dict} -- common arguments of colonies
+        seed {list[int]} -- seed of each colony
+        colonies {list[int]} -- colonies which are made
+
+    Returns:
+    --------
+        {dict[int, AntSystem]} -- solver of each colony
+    """
+    solver = {}
+    for colony in colonies:
+        aco = solver_class[colony](distance, seed=seed[colony], distance_inv=distance_inv, **setting)
+        if pheromone is not None:
+            pheromone[colony] = aco.pheromone
+            aco.pheromone = pheromone[colony]
+        solver[colony] = aco
+    return solver
+
+
+def _iterate_colony(solver, iteration, route):
+    """ run colonies
+
+    Arguments:
+    ----------
+        solver {dict[int, AntSystem]} -- solver of each colony
+        iteration {int} -- the number of iterations
+        route {tuple} -- route and its distance which is deposited on all colonies before running, or None
+
+    Returns:
+    --------
+        {dict[int, tuple]} -- the best route, the best distance and the best distance of each iteration of each colony
+    """
+    result = {}
+    for colony, aco in solver.items():
+        if route is not None:
+            aco.receive_route(*route)
+        history = np.empty(iteration)
+        for i in range(iteration):
+            aco._iterate()
+            history[i] = aco.best_distance
+        result[colony] = (aco.best_route, aco.best_distance, history)
+    return result
+
+
+def _colony_worker(connection, distance, distance_inv, pheromone, solver_class, setting, seed, colonies):
+    """ worker process which runs colonies whenever it receives a request, until it receives None
+
+    Arguments:
+    ----------
+        connection {Connection} -- pipe to the main process
+        distance {DistanceBase or tuple} -- distance provider, or spec of share_array which has distance array
+        distance_inv {tuple} -- spec of share_array which has distance_inv
+        pheromone {tuple} -- spec of SharedArray which has pheromone of all colonies, or None
+        solver_class {list[type]} -- ACO class of each colony
+        setting {dict} -- common arguments of colonies
+        seed {list[int]} -- seed of each colony
+        colonies {list[int]} -- colonies in this worker
+    """
+    shared = []
+    if isinstance(distance, tuple):
+        matrix, _shared = attach_array(distance)
+        shared.append(_shared)
+        distance = DenseDistance(matrix)
+        matrix = None
+    distance_inv, _shared = attach_array(distance_inv)
+    shared.append(_shared)
+    if pheromone is not None:
+        shared.append(SharedArray.attach(pheromone))
+        pheromone = shared[-1].array
+
+    solver = _make_colony(distance, distance_inv, pheromone, solver_class, setting, seed, colonies)
+    try:
+        connection.send(None)
+        while True:
+            request = connection.recv()
+            if request is None:
+                break
+            connection.send(_iterate_colony(solver, *request))
+    finally:
+        solver = None
+        distance = None
+        distance_inv = None
+        pheromone = None
+        for _shared in shared:
+            if _shared is not None:
+                _shared.close()
+        connection.close()
@@ -2,7 +2,8 @@ from ._AntColonyOptimization import AntSystem
 from ._AntColonyOptimization import MaxMinAntSystem
 from ._AntColonyOptimization import AntSystemElite
 from ._GridSearch import GridSearch
+from ._MultiColony import MultiColony
 
 
 __all__ = ("AntSystem", "MaxMinAntSystem", "AntSystemElite",
-           "GridSearch")
+           "GridSearch", "MultiColony")
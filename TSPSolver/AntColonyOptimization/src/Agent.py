@@ -1,29 +1,69 @@
+import numpy as np
+
+from ...utils.Tour import Tour
+
+
 class AgentBase:
-    """
+    """ view of one agent whose information is stored in Agent's arrays
+
     Attributes:
     -----------
         CITY_NUM {int} -- the number of cites
         distance {float} -- distance
-        route {list[int]} -- list of visit history
+        route {np.ndarray} -- visit history
+        tour {Tour} -- copy of route as Tour, which is written back to route when it's set
     """
 
-    def __init__(self, city_num):
+    __slots__ = ("CITY_NUM", "_agent", "_idx")
+
+    def __init__(self, agent, idx):
         """
         Arguments:
         ----------
-            city_num {int} -- the number of cities
+            agent {Agent} -- agents which hold arrays
+            idx {int} -- agent id
         """
-        self.CITY_NUM = city_num
-        self.reset_values()
+        self.CITY_NUM = agent.CITY_NUM
+        self._agent = agent
+        self._idx = idx
 
     def reset_values(self):
         """reset all variables"""
-        self.distance = 0.0
-        self.route = []
+        self._agent.distance[self._idx] = 0.0
+        self._agent.route_length[self._idx] = 0
+        self._agent.visited[self._idx] = False
+
+    @property
+    def route(self):
+        return self._agent.route[self._idx, :self._agent.route_length[self._idx]]
+
+    @route.setter
+    def route(self, route):
+        length = len(route)
+        self._agent.route[self._idx, :length] = route
+        self._agent.route_length[self._idx] = length
+        self._agent.visited[self._idx] = False
+        self._agent.visited[self._idx, self._agent.route[self._idx, :length]] = True
+
+    @property
+    def tour(self):
+        return Tour(self.route, self.CITY_NUM)
+
+    @tour.setter
+    def tour(self, tour):
+        self.route = np.asarray(tour)
+
+    @property
+    def distance(self):
+        return self._agent.distance[self._idx]
+
+    @distance.setter
+    def distance(self, distance):
+        self._agent.distance[self._idx] = distance
 
     @property
     def current_city(self):
-        return self.route[-1]
+        return self.get_current_city()
 
     def get_current_city(self):
         """ get agent's current city
@@ -32,7 +72,7 @@ class AgentBase:
         --------
             {int} -- agent's curent city
         """
-        return self.route[-1]
+        return self._agent.route[self._idx, self._agent.route_length[self._idx] - 1]
 
     def set_next_city(self, city):
         """ go to next city
@@ -41,7 +81,10 @@ class AgentBase:
         ----------
             city {int} -- next city
         """
-        self.route.append(city)
+        length = self._agent.route_length[self._idx]
+        self._agent.route[self._idx, length] = city
+        self._agent.visited[self._idx, city] = True
+        self._agent.route_length[self._idx] = length + 1
 
     def is_already_visit(self, city):
         """ check whether specified city is already visited
@@ -50,7 +93,7 @@ class AgentBase:
         --------
             {bool} -- True when specified city is already visited
         """
-        return True if city in self.route else False
+        return bool(self._agent.visited[self._idx, city])
 
     def get_city(self):
         """ yield each city
@@ -59,7 +102,7 @@ class AgentBase:
         -------
             cyty {int} -- city
         """
-        for city in route:
+        for city in self.route:
             yield city
 
     def get_city_pair(self):
@@ -70,22 +113,30 @@ class AgentBase:
             city1 {int} -- base city
             city2 {int} -- city next to base city
         """
-        for i in range(self.CITY_NUM):
-            city1 = self.route[i]
-            city2 = self.route[(i+1)%self.CITY_NUM]
+        route = self.route
+        for city1, city2 in zip(route, np.roll(route, -1)):
             yield city1, city2
 
 
 class Agent:
-    """
+    """ all agents' information. Each array is allocated once and reused at every iteration.
+
     Attributes:
     -----------
         CITY_NUM {int} -- the number of cites
-        distance {float} -- distance
-        route {list[int]} -- list of visit history
-        agent {list[AgentBase]} -- all agents' instance of AgentBase
+        AGENT_NUM {int} -- the number of agents
+        route {np.ndarray} -- each agent's visit history, shape is (agent_num, city_num)
+        visited {np.ndarray} -- whether each agent already visited each city, shape is (agent_num, city_num)
+        route_length {np.ndarray} -- the number of cities each agent already visited
+        distance {np.ndarray} -- each agent's distance
+        best_distance {float} -- the best distance of current iteration
+        best_route {np.ndarray} -- the best route of current iteration
+        agent {list[AgentBase]} -- view of each agent
     """
 
+    __slots__ = ("CITY_NUM", "AGENT_NUM", "route", "visited", "route_length", "distance",
+                 "best_distance", "best_route", "agent")
+
     def __init__(self, city_num, agent_num):
         """
         Arguments:
@@ -94,7 +145,17 @@ class Agent:
             agent_num {int} -- the number of agents
         """
         self.CITY_NUM = city_num
-        self.agent = [AgentBase(city_num) for _ in range(city_num)]
+        self.AGENT_NUM = agent_num
+        self.route = np.zeros((agent_num, city_num), dtype=np.int32)
+        self.visited = np.zeros((agent_num, city_num), dtype=bool)
+        self.route_length = np.zeros(agent_num, dtype=np.int32)
+        self.distance = np.zeros(agent_num)
+        self.best_distance = np.inf
+        self.best_route = np.zeros(city_num, dtype=np.int32)
+        self.agent = [AgentBase(self, i) for i in range(agent_num)]
+
+    def __len__(self):
+        return self.AGENT_NUM
 
     def __iter__(self):
         """ iterator for getting each agent's instance
@@ -120,15 +181,15 @@ class Agent:
 
     def reset_agent(self):
         """reset all agents' instance"""
-        for agent in self.agent:
-            agent.reset_values()
+        self.visited.fill(False)
+        self.route_length.fill(0)
+        self.distance.fill(0.0)
 
     def find_best(self):
         """ find the best result"""
-        distance = [agent.distance for agent in self.agent]
-        self.best_distance = min(distance)
-        best_idx = distance.index(self.best_distance)
-        self.best_route = self.agent[best_idx].route
+        best_idx = self.distance.argmin()
+        self.best_distance = self.distance[best_idx]
+        self.best_route[:] = self.route[best_idx]
 
     def get_best_route_pair(self):
         """ get pair of the best route
@@ -138,14 +199,12 @@ class Agent:
             {int} -- base city
             {int} -- city next to base city
         """
-        for i in range(self.CITY_NUM):
-            city1 = self.best_route[i]
-            city2 = self.best_route[(i+1)%self.CITY_NUM]
+        for city1, city2 in zip(self.best_route, np.roll(self.best_route, -1)):
             yield city1, city2
 
     def get_distance_as_arr(self):
         """ get array of distance"""
-        return [agent.distance for agent in self.agent]
+        return self.distance
 
 
 class AgentRank(Agent):
@@ -153,12 +212,19 @@ class AgentRank(Agent):
     Attributes:
     -----------
         CITY_NUM {int} -- the number of cites
-        distance {float} -- distance
-        route {list[int]} -- list of visit history
-        agent {list[AgentBase]} -- all agents' instance of AgentBase
-        rank {list[int]} -- each agents' ranking
+        AGENT_NUM {int} -- the number of agents
+        route {np.ndarray} -- each agent's visit history, shape is (agent_num, city_num)
+        visited {np.ndarray} -- whether each agent already visited each city, shape is (agent_num, city_num)
+        route_length {np.ndarray} -- the number of cities each agent already visited
+        distance {np.ndarray} -- each agent's distance
+        best_distance {float} -- the best distance of current iteration
+        best_route {np.ndarray} -- the best route of current iteration
+        agent {list[AgentBase]} -- view of each agent
+        rank {dict} -- each agents' ranking
     """
 
+    __slots__ = ("rank",)
+
     def __init__(self, city_num, agent_num):
         """
         Arguments:
@@ -167,26 +233,16 @@ class AgentRank(Agent):
             agent_num {int} -- the number of agents
         """
         super(AgentRank, self).__init__(city_num, agent_num)
-        self.rank = [-1 for _ in range(agent_num)]
+        self.rank = {}
 
     def get_rank(self):
         """ calculate agents' rank"""
-        rank_dict = {k: agent.distance for k, agent in zip(range(self.CITY_NUM), self.agent)}
-        rank_dict_sorted = dict(sorted(rank_dict.items(), key=lambda x: x[1]))
+        order = np.argsort(self.distance, kind="stable")
+        value, rank_start = np.unique(self.distance[order], return_index=True)
 
         self.rank = {}
-        rank = 0
-        for i, (k, v) in enumerate(rank_dict_sorted.items()):
-            if i == 0:
-                self.rank[rank] = {"VALUE": v, "ID": [k]}
-                continue
-
-            if v == self.rank[rank]["VALUE"]:
-                self.rank[rank]["ID"].append(k)
-
-            else:
-                rank += 1
-                self.rank[rank] = {"VALUE": v, "ID": [k]}
+        for rank, (v, ids) in enumerate(zip(value, np.split(order, rank_start[1:]))):
+            self.rank[rank] = {"VALUE": v, "ID": ids.tolist()}
 
     def get_rank_base(self):
         """ get agent's ID according to ranking made by get_rank function
@@ -195,5 +251,5 @@ class AgentRank(Agent):
         -------
             {list[int]} -- ID list which has same distance
         """
-        for k, v in self.rank.item():
-            yield v["ID"]
\ No newline at end of file
+        for k, v in self.rank.items():
+            yield v["ID"]
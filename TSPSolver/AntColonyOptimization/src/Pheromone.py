@@ -0,0 +1,32 @@
+import numpy as np
+
+
+def deposit_pheromone(pheromone, route, increase):
+    """ add pheromone on every edge of routes symmetrically, in place.
+    All edges are accumulated in one scatter on the flattened pheromone array.
+
+    Arguments:
+    ----------
+        pheromone {np.ndarray} -- pheromone concentration, which has to be C-contiguous
+        route {np.ndarray} -- routes, shape is (route_num, city_num) or (city_num, )
+        increase {float or np.ndarray} -- increase of pheromone for each route
+
+    Examples:
+    ---------
+        >>> pheromone *= rho
+        >>> deposit_pheromone(pheromone, agent.route, pheromone_q / agent.distance)
+    """
+    city_num = pheromone.shape[0]
+    route = np.atleast_2d(route).astype(np.intp, copy=False)
+    next_city = np.roll(route, -1, axis=1)
+
+    edge = np.concatenate(((route * city_num + next_city).ravel(), (next_city * city_num + route).ravel()))
+    weight = np.repeat(np.broadcast_to(increase, route.shape[0]), route.shape[1])
+    weight = np.concatenate((weight, weight))
+
+    pheromone_flat = pheromone.reshape(-1)
+    # bincount touches the whole matrix once, so it only pays off when there are many edges
+    if len(edge) * 8 < len(pheromone_flat):
+        np.add.at(pheromone_flat, edge, weight)
+    else:
+        pheromone_flat += np.bincount(edge, weights=weight, minlength=len(pheromone_flat))
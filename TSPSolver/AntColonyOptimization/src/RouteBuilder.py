@@ -0,0 +1,122 @@
+import numpy as np
+
+
+def build_route(choice, route, visited, candidate=None, rng=None):
+    """ build every agent's route at once.
+    All agents advance one step at a time, and each agent draws its next city with one cumulative-sum lookup.
+
+    Arguments:
+    ----------
+        choice {np.ndarray} -- attractiveness of each edge, pheromone ** ALPHA * distance_inv
+        route {np.ndarray} -- buffer which each agent's route is written to, shape is (agent_num, city_num)
+        visited {np.ndarray} -- buffer of visited flags which is cleared beforehand, shape is (agent_num, city_num)
+
+    Keyword Arguments:
+    ------------------
+        candidate {np.ndarray} -- candidate list made by make_candidate_list. If this is None, all cities are candidates (default: None)
+        rng {np.random.Generator} -- random generator. If this is None, np.random is used (default: None)
+
+    Returns:
+    --------
+        route {np.ndarray} -- each agent's route
+
+    Examples:
+    ---------
+        >>> choice = pow(pheromone, alpha) * distance_inv
+        >>> route = build_route(choice, agent.route, agent.visited)
+        >>> route.shape
+        (100, 100)
+    """
+    agent_num, city_num = route.shape
+    agent_idx = np.arange(agent_num)
+
+    current_city = np.random.randint(0, city_num, agent_num) if rng is None else rng.integers(0, city_num, agent_num)
+    route[:, 0] = current_city
+    visited[agent_idx, current_city] = True
+
+    for step in range(1, city_num):
+        if candidate is None:
+            prob = choice[current_city]
+            prob[visited] = 0.0
+            next_city = _draw_city(prob, visited, rng)
+        else:
+            next_city = _select_candidate_city(choice, candidate, current_city, visited, rng)
+
+        route[:, step] = next_city
+        visited[agent_idx, next_city] = True
+        current_city = next_city
+
+    return route
+
+
+def _select_candidate_city(choice, candidate, current_city, visited, rng=None):
+    """ select next city of each agent from its candidate list.
+    When all candidates are already visited, the agent goes to the most attractive city among the rest.
+
+    Arguments:
+    ----------
+        choice {np.ndarray} -- attractiveness of each edge
+        candidate {np.ndarray} -- candidate list
+        current_city {np.ndarray} -- current city of each agent
+        visited {np.ndarray} -- whether each city is already visited, shape is (agent_num, city_num)
+
+    Keyword Arguments:
+    ------------------
+        rng {np.random.Generator} -- random generator. If this is None, np.random is used (default: None)
+
+    Returns:
+    --------
+        next_city {np.ndarray} -- next city of each agent
+    """
+    agent_idx = np.arange(len(current_city))
+    cand = candidate[current_city]
+    cand_visited = visited[agent_idx[:, None], cand]
+    is_exhausted = cand_visited.all(axis=1)
+    next_city = np.empty(len(current_city), dtype=np.int64)
+
+    rows = np.flatnonzero(~is_exhausted)
+    if len(rows) > 0:
+        prob = choice[current_city[rows, None], cand[rows]]
+        prob[cand_visited[rows]] = 0.0
+        col = _draw_city(prob, cand_visited[rows], rng)
+        next_city[rows] = cand[rows, col]
+
+    rows = np.flatnonzero(is_exhausted)
+    if len(rows) > 0:
+        prob = choice[current_city[rows]]
+        prob[visited[rows]] = -np.inf
+        next_city[rows] = prob.argmax(axis=1)
+
+    return next_city
+
+
+def _draw_city(prob, visited, rng=None):
+    """ draw next city of each agent in proportion to prob
+
+    Arguments:
+    ----------
+        prob {np.ndarray} -- unnormalized probability of each city, shape is (agent_num, city_num)
+        visited {np.ndarray} -- whether each city is already visited, shape is (agent_num, city_num)
+
+    Keyword Arguments:
+    ------------------
+        rng {np.random.Generator} -- random generator. If this is None, np.random is used (default: None)
+
+    Returns:
+    --------
+        next_city {np.ndarray} -- next city of each agent
+    """
+    city_num = prob.shape[1]
+    prob_cumsum = np.cumsum(prob, axis=1)
+    rand = (np.random.rand(prob.shape[0]) if rng is None else rng.random(prob.shape[0])) * prob_cumsum[:, -1]
+    next_city = (prob_cumsum <= rand[:, None]).sum(axis=1)
+
+    # rand can reach the total by rounding, or every probability underflows to 0
+    overflow = np.flatnonzero(next_city >= city_num)
+    for agent in overflow:
+        cand = np.flatnonzero(prob[agent] > 0)
+        if len(cand) == 0:
+            cand = np.flatnonzero(~visited[agent])
+        next_city[agent] = cand[-1]
+
+    return next_city
@@ -1,15 +1,210 @@
+import numpy as np
 from .src.Population import Population
-from ..utils.DataLoader import load_dataset
+from .src.CrossOver import order_crossover, partially_mapped_crossover, edge_recombination_crossover
+from .src.Mutation import ordinal_mutation, swap_mutation, inversion_mutation, scramble_mutation
+from .src.Select import elite_selection
+from ..utils.Distance import load_distance
+from ..utils.DataWriter import DataWriter
 
 
 class GeneticAlgorithm:
-    def __init__(self, dataset_filename, population_size, mutation_rate):
-        city_num, distance = load_dataset(dataset_filename)
-        self.CITY_NUM = city_num
+    """ Genetic Algorithm for TSP.
+    Each generation keeps elite individuals, and the others are replaced by children of selected parents,
+    which are made by crossover of routes and mutation of routes or ordinal genes.
+
+    Attributes:
+    -----------
+        CITY_NUM {int} -- the number of cities
+        POPULATION_SIZE {int} -- the number of population
+        MUTATION_RATE {float} -- probability that each child is mutated
+        ELITE_NUM {int} -- the number of elite individuals which survive without change
+        CROSSOVER {str} -- crossover method, "ox", "pmx" or "erx"
+        MUTATION {str} -- mutation method, "ordinal", "swap", "inversion" or "scramble"
+        SELECTION {str} -- selection method, "roulette", "ranking" or "tournament"
+        TOURNAMENT_SIZE {int} -- the number of individuals in each tournament
+        IS_SAVE {bool} -- whether save results or not
+        distance {DistanceBase} -- distance between cities
+        population {Population} -- population
+        best_route {np.ndarray} -- the best route
+        best_distance {float} -- the best distance
+        writer {DataWriter} -- writer for saving scores
+
+    Examples:
+    ---------
+        >>> ga = GeneticAlgorithm("kroA100.tsp", 500, 0.1, crossover="ox", seed=0)
+        >>> best_route, best_distance = ga.search(1000)
+    """
+
+    __CROSSOVER = {"ox": order_crossover, "pmx": partially_mapped_crossover, "erx": edge_recombination_crossover}
+    __MUTATION = {"ordinal": ordinal_mutation, "swap": swap_mutation, "inversion": inversion_mutation, "scramble": scramble_mutation}
+
+    def __init__(self, dataset_filename, population_size, mutation_rate, crossover="ox", mutation="ordinal", selection="roulette",
+                 tournament_size=3, elite_num=1, is_save=True, save_filename="result.csv", seed=None, dtype=np.float64, mmap_mode=None, distance_mode="dense"):
+        """
+        Arguments:
+        ----------
+            dataset_filename {str} -- dataset file name
+            population_size {int} -- the number of population
+            mutation_rate {float} -- probability that each child is mutated
+
+        Keyword Arguments:
+        ------------------
+            crossover {str} -- "ox" (order crossover), "pmx" (partially mapped crossover) or "erx" (edge recombination crossover) (default: "ox")
+            mutation {str} -- "ordinal" which changes a value of gene, or "swap", "inversion" and "scramble" which change route (default: "ordinal")
+            selection {str} -- "roulette", "ranking" or "tournament" (default: "roulette")
+            tournament_size {int} -- the number of individuals in each tournament (default: 3)
+            elite_num {int} -- the number of elite individuals which survive without change (default: 1)
+            is_save {bool} -- whether save results or not (default: True)
+            save_filename {str} -- file name of results (default: result.csv)
+            seed {int} -- seed of random generator (default: None)
+            dtype {np.dtype} -- data type of distance (default: np.float64)
+            mmap_mode {str} -- if this is set, distance is memory-mapped from dataset cache with this mode (default: None)
+            distance_mode {str} -- "dense" holds distance array, "coordinate" calculates distance from coordinates when it's needed (default: "dense")
+        """
+        _, distance = load_distance(dataset_filename, distance_mode, dtype, mmap_mode)
+        self._initialize(distance, population_size, mutation_rate, crossover, mutation, selection, tournament_size, elite_num, seed)
+        self.IS_SAVE = is_save
+        if is_save:
+            self.writer = DataWriter(save_filename)
+
+    def _initialize(self, distance, population_size, mutation_rate, crossover, mutation, selection, tournament_size, elite_num, seed):
+        """ initialize solver with distance, whose arguments are the same as __init__
+
+        Arguments:
+        ----------
+            distance {DistanceBase} -- distance between cities
+        """
+        if crossover not in self.__CROSSOVER:
+            raise ValueError(f"Unknown crossover: {crossover}")
+        if mutation not in self.__MUTATION:
+            raise ValueError(f"Unknown mutation: {mutation}")
+
+        self.CITY_NUM = len(distance)
+        self.POPULATION_SIZE = population_size
         self.MUTATION_RATE = mutation_rate
+        self.ELITE_NUM = min(elite_num, population_size)
+        self.CROSSOVER = crossover
+        self.MUTATION = mutation
+        self.SELECTION = selection
+        self.TOURNAMENT_SIZE = tournament_size
         self.distance = distance
-        self.population = Population(population_size, self.CITY_NUM, distance)
+        self.population = Population(population_size, self.CITY_NUM, distance, seed)
+        self.best_route = None
+        self.best_distance = np.inf
+
+    @classmethod
+    def _from_distance(cls, distance, population_size, mutation_rate, crossover="ox", mutation="ordinal", selection="roulette",
+                       tournament_size=3, elite_num=1, seed=None):
+        """ create solver from distance provider without DataWriter, which is used by IslandModel
+
+        Arguments:
+        ----------
+            distance {DistanceBase} -- distance between cities
+            population_size {int} -- the number of population
+            mutation_rate {float} -- probability that each child is mutated
+
+        Keyword Arguments:
+        ------------------
+            the same as __init__
+
+        Returns:
+        --------
+            {GeneticAlgorithm} -- solver
+        """
+        solver = cls.__new__(cls)
+        solver._initialize(distance, population_size, mutation_rate, crossover, mutation, selection, tournament_size, elite_num, seed)
+        solver.IS_SAVE = False
+        return solver
 
     def search(self, iteration):
+        """ start searching best route
+
+        Arguments:
+        ----------
+            iteration {int} -- the number of generations
+
+        Returns:
+        --------
+            best_route {np.ndarray} -- the best route
+            best_distance {float} -- the best distance
+        """
+        self._update_best()
         for i in range(iteration):
-            self.population.evaluate()
+            self._evolve()
+            self._update_best()
+
+            print(f"{str(i).rjust(len(str(iteration)))} \t{self.best_distance: .3f}")
+            if self.IS_SAVE:
+                self.writer.write(self.population.fitness)
+
+        if self.IS_SAVE:
+            self.writer.save()
+
+        return self.best_route, self.best_distance
+
+    def emigrate(self, num):
+        """ get routes of the best individuals, which migrate to other populations
+
+        Arguments:
+        ----------
+            num {int} -- the number of individuals
+
+        Returns:
+        --------
+            {np.ndarray} -- routes, shape is (num, city_num)
+        """
+        return self.population.get_route(self.population.elite(num))
+
+    def immigrate(self, route):
+        """ replace the worst individuals with routes from other populations
+
+        Arguments:
+        ----------
+            route {np.ndarray} -- routes, shape is (route_num, city_num)
+        """
+        if len(route) == 0:
+            return
+
+        worst = elite_selection(self.population.evaluate(), min(len(route), self.POPULATION_SIZE))
+        self.population.set_route(route[:len(worst)], worst)
+        self._update_best()
+
+    def _evolve(self):
+        """ make next generation"""
+        population = self.population
+        route = population.route
+        elite = population.elite(self.ELITE_NUM)
+
+        child_num = self.POPULATION_SIZE - self.ELITE_NUM
+        parent = population.select(2 * child_num, self.SELECTION, self.TOURNAMENT_SIZE).reshape(2, child_num)
+        child = self.__CROSSOVER[self.CROSSOVER](route[parent[0]], route[parent[1]], population.rng)
+
+        population.set_route(np.concatenate((route[elite], child)))
+        self._mutate()
+        population.evaluate()
+
+    def _mutate(self):
+        """ mutate children in place"""
+        population = self.population
+        if self.MUTATION != "ordinal":
+            idx = self.__MUTATION[self.MUTATION](population.route[self.ELITE_NUM:], self.MUTATION_RATE, population.rng)
+            population.invalidate(self.ELITE_NUM + idx, changed="route")
+            return
+
+        # children are held as routes, so that only genes which are mutated are encoded
+        child_num = self.POPULATION_SIZE - self.ELITE_NUM
+        idx = self.ELITE_NUM + np.flatnonzero(population.rng.random(child_num) < self.MUTATION_RATE)
+        if len(idx) == 0:
+            return
+
+        gene = population.get_gene(idx)
+        ordinal_mutation(gene, 1.0, population.rng)
+        population.set_gene(gene, idx)
+
+    def _update_best(self):
+        """ update the best route with the current population"""
+        fitness = self.population.evaluate()
+        idx = int(fitness.argmin())
+        if fitness[idx] < self.best_distance:
+            self.best_distance = float(fitness[idx])
+            self.best_route = self.population.route[idx].copy()
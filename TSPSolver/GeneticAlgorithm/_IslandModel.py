@@ -0,0 +1,284 @@
+import multiprocessing
+import numpy as np
+
+from ._GeneticAlgorithm import GeneticAlgorithm
+from ..utils.Distance import load_distance, DenseDistance
+from ..utils.DataWriter import DataWriter
+from ..utils.Parallel import get_worker_num, split_chunk, share_array, attach_array
+
+
+class IslandModel:
+    """ Island model of Genetic Algorithm.
+    Each island has its own population which evolves independently, and every MIGRATION_INTERVAL generations
+    the best individuals of each island migrate to its neighbours and replace their worst individuals.
+    Islands are distributed to worker processes which are connected by pipes, and distance array is shared by shared memory,
+    or by its file when it's memory-mapped.
+    Migration is synchronous, so that results are the same for the same seed regardless of the number of processes.
+
+    Attributes:
+    -----------
+        CITY_NUM {int} -- the number of cities
+        ISLAND_NUM {int} -- the number of islands
+        MIGRATION_INTERVAL {int} -- the number of generations between migrations
+        MIGRATION_NUM {int} -- the number of individuals which migrate from each island to each neighbour
+        TOPOLOGY {str} -- "ring" where island i sends individuals to island i+1, or "full" where each island sends them to all other islands
+        IS_SAVE {bool} -- whether save results or not
+        distance {DistanceBase} -- distance between cities
+        best_route {np.ndarray} -- the best route of all islands
+        best_distance {float} -- the best distance of all islands
+        history {list[np.ndarray]} -- the best distance of each island after each migration interval
+        writer {DataWriter} -- writer for saving scores
+
+    Examples:
+    ---------
+        >>> island = IslandModel("kroA100.tsp", 8, 200, 0.1, migration_interval=20, topology="ring", seed=0, n_jobs=-1)
+        >>> best_route, best_distance = island.search(1000)
+    """
+
+    __TOPOLOGY = ("ring", "full")
+
+    def __init__(self, dataset_filename, island_num, population_size, mutation_rate, migration_interval=10, migration_num=1,
+                 topology="ring", crossover="ox", mutation="ordinal", selection="roulette", tournament_size=3, elite_num=1, is_save=True,
+                 save_filename="result.csv", seed=None, n_jobs=None, dtype=np.float64, mmap_mode=None, distance_mode="dense"):
+        """
+        Arguments:
+        ----------
+            dataset_filename {str} -- dataset file name
+            island_num {int} -- the number of islands
+            population_size {int} -- the number of population of each island
+            mutation_rate {float} -- probability that each child is mutated
+
+        Keyword Arguments:
+        ------------------
+            migration_interval {int} -- the number of generations between migrations (default: 10)
+            migration_num {int} -- the number of individuals which migrate from each island to each neighbour (default: 1)
+            topology {str} -- "ring" or "full" (default: "ring")
+            crossover {str} -- "ox", "pmx" or "erx" (default: "ox")
+            mutation {str} -- "ordinal", "swap", "inversion" or "scramble" (default: "ordinal")
+            selection {str} -- "roulette", "ranking" or "tournament" (default: "roulette")
+            tournament_size {int} -- the number of individuals in each tournament (default: 3)
+            elite_num {int} -- the number of elite individuals which survive without change (default: 1)
+            is_save {bool} -- whether save results or not (default: True)
+            save_filename {str} -- file name of results (default: result.csv)
+            seed {int} -- seed from which seeds of islands are spawned. If this is set, results are reproducible (default: None)
+            n_jobs {int} -- the number of processes, which is at most island_num. -1 means all CPUs (default: None)
+            dtype {np.dtype} -- data type of distance (default: np.float64)
+            mmap_mode {str} -- if this is set, distance is memory-mapped from dataset cache with this mode (default: None)
+            distance_mode {str} -- "dense" holds distance array, "coordinate" calculates distance from coordinates when it's needed (default: "dense")
+        """
+        if topology not in self.__TOPOLOGY:
+            raise ValueError(f"Unknown topology: {topology}")
+
+        city_num, distance = load_distance(dataset_filename, distance_mode, dtype, mmap_mode)
+        self.CITY_NUM = city_num
+        self.ISLAND_NUM = island_num
+        self.MIGRATION_INTERVAL = migration_interval
+        self.MIGRATION_NUM = migration_num
+        self.TOPOLOGY = topology
+        self.IS_SAVE = is_save
+        if is_save:
+            self.writer = DataWriter(save_filename)
+
+        self.distance = distance
+        self.n_jobs = n_jobs
+        self._setting = {"population_size": population_size, "mutation_rate": mutation_rate, "crossover": crossover,
+                         "mutation": mutation, "selection": selection, "tournament_size": tournament_size, "elite_num": elite_num}
+        self._seed = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(island_num)]
+        self.best_route = None
+        self.best_distance = np.inf
+        self.history = []
+
+    def search(self, iteration):
+        """ start searching best route
+
+        Arguments:
+        ----------
+            iteration {int} -- the number of generations of each island
+
+        Returns:
+        --------
+            best_route {np.ndarray} -- the best route
+            best_distance {float} -- the best distance
+        """
+        worker_num = min(get_worker_num(self.n_jobs), self.ISLAND_NUM)
+        islands = split_chunk(range(self.ISLAND_NUM), worker_num)
+        generation = [self.MIGRATION_INTERVAL] * (iteration // self.MIGRATION_INTERVAL)
+        if iteration % self.MIGRATION_INTERVAL > 0:
+            generation.append(iteration % self.MIGRATION_INTERVAL)
+
+        with _IslandPool(self.distance, self._setting, self._seed, islands, worker_num > 1) as pool:
+            immigrant = {}
+            for i, _generation in enumerate(generation):
+                result = pool.evolve(_generation, immigrant, self.MIGRATION_NUM)
+                immigrant = self._migrate({island: emigrant for island, (emigrant, _, _) in result.items()})
+
+                island_best = np.array([result[island][2] for island in range(self.ISLAND_NUM)])
+                best_island = int(island_best.argmin())
+                if island_best[best_island] < self.best_distance:
+                    self.best_distance = float(island_best[best_island])
+                    self.best_route = result[best_island][1]
+                self.history.append(island_best)
+
+                print(f"{str(i).rjust(len(str(len(generation))))} \t{self.best_distance: .3f}")
+                if self.IS_SAVE:
+                    self.writer.write(island_best)
+
+        if self.IS_SAVE:
+            self.writer.save()
+
+        return self.best_route, self.best_distance
+
+    def _migrate(self, emigrant):
+        """ decide immigrants of each island according to topology
+
+        Arguments:
+        ----------
+            emigrant {dict[int, np.ndarray]} -- the best routes of each island
+
+        Returns:
+        --------
+            {dict[int, np.ndarray]} -- routes which migrate to each island
+        """
+        if self.ISLAND_NUM == 1:
+            return {}
+
+        if self.TOPOLOGY == "ring":
+            return {island: emigrant[(island - 1) % self.ISLAND_NUM] for island in range(self.ISLAND_NUM)}
+
+        return {island: np.concatenate([emigrant[source] for source in range(self.ISLAND_NUM) if source != island])
+                for island in range(self.ISLAND_NUM)}
+
+
+class _IslandPool:
+    """ worker processes which hold islands, or islands in this process when it's not parallel
+
+    Attributes:
+    -----------
+        islands {list[list[int]]} -- islands of each worker
+    """
+
+    def __init__(self, distance, setting, seed, islands, is_parallel):
+        """
+        Arguments:
+        ----------
+            distance {DistanceBase} -- distance between cities
+            setting {dict} -- arguments of GeneticAlgorithm._from_distance
+            seed {list[int]} -- seed of each island
+            islands {list[list[int]]} -- islands of each worker
+            is_parallel {bool} -- whether islands evolve in worker processes or not
+        """
+        self.islands = islands
+        self._shared = None
+        self._process = []
+        self._connection = []
+        if not is_parallel:
+            self._solver = {island: GeneticAlgorithm._from_distance(distance, seed=seed[island], **setting)
+                            for island in islands[0]}
+            return
+
+        if isinstance(distance, DenseDistance):
+            distance, self._shared = share_array(distance.matrix)
+
+        for _islands in islands:
+            connection, child_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_island_worker,
+                                              args=(child_connection, distance, setting, {i: seed[i] for i in _islands}))
+            process.start()
+            child_connection.close()
+            self._process.append(process)
+            self._connection.append(connection)
+
+    def evolve(self, generation, immigrant, migration_num):
+        """ evolve all islands
+
+        Arguments:
+        ----------
+            generation {int} -- the number of generations
+            immigrant {dict[int, np.ndarray]} -- routes which migrate to each island before evolving
+            migration_num {int} -- the number of the best individuals which each island returns
+
+        Returns:
+        --------
+            {dict[int, tuple]} -- the best routes, the best route and the best distance of each island
+        """
+        if len(self._process) == 0:
+            return _evolve_island(self._solver, generation, immigrant, migration_num)
+
+        for _islands, connection in zip(self.islands, self._connection):
+            connection.send((generation, {i: immigrant[i] for i in _islands if i in immigrant}, migration_num))
+
+        result = {}
+        for connection in self._connection:
+            result.update(connection.recv())
+        return result
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        for connection in self._connection:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+        for process in self._process:
+            process.join()
+        if self._shared is not None:
+            self._shared.unlink()
+
+
+def _evolve_island(solver, generation, immigrant, migration_num):
+    """ evolve islands
+
+    Arguments:
+    ----------
+        solver {dict[int, GeneticAlgorithm]} -- solver of each island
+        generation {int} -- the number of generations
+        immigrant {dict[int, np.ndarray]} -- routes which migrate to each island before evolving
+        migration_num {int} -- the number of the best individuals which each island returns
+
+    Returns:
+    --------
+        {dict[int, tuple]} -- the best routes, the best route and the best distance of each island
+    """
+    result = {}
+    for island, ga in solver.items():
+        if island in immigrant:
+            ga.immigrate(immigrant[island])
+        for _ in range(generation):
+            ga._evolve()
+            ga._update_best()
+        result[island] = (ga.emigrate(migration_num), ga.best_route, ga.best_distance)
+    return result
+
+
+def _island_worker(connection, distance, setting, seed):
+    """ worker process which evolves islands whenever it receives a request, until it receives None
+
+    Arguments:
+    ----------
+        connection {Connection} -- pipe to the main process
+        distance {DistanceBase or tuple} -- distance provider, or spec of share_array which has distance array
+        setting {dict} -- arguments of GeneticAlgorithm._from_distance
+        seed {dict[int, int]} -- seed of each island in this worker
+    """
+    shared = None
+    if isinstance(distance, tuple):
+        matrix, shared = attach_array(distance)
+        distance = DenseDistance(matrix)
+        matrix = None
+
+    solver = {island: GeneticAlgorithm._from_distance(distance, seed=_seed, **setting) for island, _seed in seed.items()}
+    try:
+        while True:
+            request = connection.recv()
+            if request is None:
+                break
+            connection.send(_evolve_island(solver, *request))
+    finally:
+        solver = None
+        distance = None
+        if shared is not None:
+            shared.close()
+        connection.close()
@@ -1,3 +1,4 @@
 from ._GeneticAlgorithm import GeneticAlgorithm
+from ._IslandModel import IslandModel
 
-__all__ = ("GeneticAlgorithm")
\ No newline at end of file
+__all__ = ("GeneticAlgorithm", "IslandModel")
\ No newline at end of file
@@ -0,0 +1,176 @@
+import numpy as np
+
+
+# offsets of cities of parent2 which are checked at once when all neighbours are visited in ERX
+_WINDOW = np.arange(64)
+
+
+def order_crossover(parent1, parent2, rng):
+    """ order crossover (OX) of each pair of parents.
+    Child keeps a random segment of parent1 at the same positions, and the rest cities are filled
+    from the end of the segment in the order of parent2.
+
+    Arguments:
+    ----------
+        parent1 {np.ndarray} -- routes of parents, shape is (pair_num, city_num)
+        parent2 {np.ndarray} -- routes of the other parents, shape is (pair_num, city_num)
+        rng {np.random.Generator} -- random generator
+
+    Returns:
+    --------
+        child {np.ndarray} -- routes of children, shape is (pair_num, city_num)
+
+    Examples:
+    ---------
+        >>> parent1 = np.array([[0, 1, 2, 3, 4, 5, 6]])
+        >>> parent2 = np.array([[6, 4, 2, 0, 5, 3, 1]])
+        >>> order_crossover(parent1, parent2, rng)      # segment is [2, 3, 4]
+        array([[0, 5, 2, 3, 4, 1, 6]])
+    """
+    pair_num, city_num = parent1.shape
+    start, stop = _cut_point(pair_num, city_num, rng)
+    position = np.arange(city_num)
+    in_segment = (position >= start[:, None]) & (position < stop[:, None])
+
+    # cities in the segment of parent1
+    is_taken = np.zeros((pair_num, city_num), dtype=bool)
+    np.put_along_axis(is_taken, parent1, in_segment, axis=1)
+
+    # positions from the end of the segment, whose first (city_num - segment length) positions are out of the segment
+    order = (stop[:, None] + position) % city_num
+    rolled = np.take_along_axis(parent2, order, axis=1)
+    is_rest = ~np.take_along_axis(is_taken, rolled, axis=1)
+    rest = np.take_along_axis(rolled, np.argsort(~is_rest, axis=1, kind="stable"), axis=1)
+
+    child = np.empty_like(parent1)
+    np.put_along_axis(child, order, rest, axis=1)
+    child[in_segment] = parent1[in_segment]
+    return child
+
+
+def partially_mapped_crossover(parent1, parent2, rng):
+    """ partially mapped crossover (PMX) of each pair of parents.
+    Child keeps a random segment of parent1 and the rest positions of parent2.
+    Cities of parent2 which conflict with the segment are replaced by following the mapping from parent1 to parent2 in the segment.
+
+    Arguments:
+    ----------
+        parent1 {np.ndarray} -- routes of parents, shape is (pair_num, city_num)
+        parent2 {np.ndarray} -- routes of the other parents, shape is (pair_num, city_num)
+        rng {np.random.Generator} -- random generator
+
+    Returns:
+    --------
+        child {np.ndarray} -- routes of children, shape is (pair_num, city_num)
+
+    Examples:
+    ---------
+        >>> parent1 = np.array([[0, 1, 2, 3, 4, 5, 6]])
+        >>> parent2 = np.array([[6, 4, 2, 0, 5, 3, 1]])
+        >>> partially_mapped_crossover(parent1, parent2, rng)       # segment is [2, 3, 4]
+        array([[6, 5, 2, 3, 4, 0, 1]])
+    """
+    pair_num, city_num = parent1.shape
+    start, stop = _cut_point(pair_num, city_num, rng)
+    position = np.arange(city_num)
+    in_segment = (position >= start[:, None]) & (position < stop[:, None])
+
+    row, col = np.nonzero(in_segment)
+    is_taken = np.zeros((pair_num, city_num), dtype=bool)
+    is_taken[row, parent1[row, col]] = True
+    mapping = np.tile(position, (pair_num, 1))
+    mapping[row, parent1[row, col]] = parent2[row, col]
+
+    child = parent2.copy()
+    child[in_segment] = parent1[in_segment]
+
+    # follow mapping until the city isn't in the segment, the chain never loops
+    row, col = np.nonzero(~in_segment & np.take_along_axis(is_taken, child, axis=1))
+    city = child[row, col]
+    while len(city) > 0:
+        city = mapping[row, city]
+        is_conflict = is_taken[row, city]
+        child[row[~is_conflict], col[~is_conflict]] = city[~is_conflict]
+        row, col, city = row[is_conflict], col[is_conflict], city[is_conflict]
+
+    return child
+
+
+def edge_recombination_crossover(parent1, parent2, rng):
+    """ edge recombination crossover (ERX) of each pair of parents.
+    Child starts from the first city of parent1, and goes to the neighbour in either parent which is
+    shared by both parents, or which has the fewest unvisited neighbours. When all neighbours are visited,
+    it goes to the first unvisited city in the order of parent2.
+    Each step is vectorized over pairs, but steps are sequential, so that this is slower than OX and PMX.
+
+    Arguments:
+    ----------
+        parent1 {np.ndarray} -- routes of parents, shape is (pair_num, city_num)
+        parent2 {np.ndarray} -- routes of the other parents, shape is (pair_num, city_num)
+        rng {np.random.Generator} -- random generator
+
+    Returns:
+    --------
+        child {np.ndarray} -- routes of children, shape is (pair_num, city_num)
+    """
+    pair_num, city_num = parent1.shape
+    row = np.arange(pair_num)
+    offset = row * city_num
+    neighbour = np.empty((pair_num, city_num, 4), dtype=np.int64)
+    for i, parent in enumerate((parent1, parent2)):
+        neighbour[row[:, None], parent, 2*i] = np.roll(parent, 1, axis=1)
+        neighbour[row[:, None], parent, 2*i + 1] = np.roll(parent, -1, axis=1)
+    is_shared = (neighbour[:, :, :, None] == neighbour[:, :, None, :]).sum(axis=3) >= 2
+
+    # cities are indexed by flat index of (pair, city), which is faster than 2-D indexing
+    neighbour = (neighbour + offset[:, None, None]).reshape(-1, 4)
+    bonus = np.where(is_shared, -4.0, 0.0).reshape(-1, 4)
+    degree = np.full(pair_num * city_num, 4.0)
+    visited = np.zeros(pair_num * city_num, dtype=bool)
+    fallback = parent2 + offset[:, None]
+    pointer = np.zeros(pair_num, dtype=np.int64)
+
+    child = np.empty_like(parent1)
+    child[:, 0] = parent1[:, 0]
+    city = parent1[:, 0] + offset
+    for i in range(1, city_num):
+        visited[city] = True
+        candidate = neighbour[city]
+        for k in range(4):
+            degree[candidate[:, k]] -= 1
+
+        key = degree[candidate] + bonus[city] + rng.random((pair_num, 4))
+        key[visited[candidate]] = np.inf
+        city = candidate[row, key.argmin(axis=1)]
+
+        # cities before pointer in parent2 are all visited, so that the window is moved forward until it finds unvisited one
+        failed = np.flatnonzero(visited[city])
+        while len(failed) > 0:
+            window = fallback[failed[:, None], np.minimum(pointer[failed, None] + _WINDOW, city_num - 1)]
+            is_visited = visited[window]
+            first = np.where(is_visited.all(axis=1), len(_WINDOW), is_visited.argmin(axis=1))
+            pointer[failed] += first
+            city[failed] = window[np.arange(len(failed)), np.minimum(first, len(_WINDOW) - 1)]
+            failed = failed[first == len(_WINDOW)]
+
+        child[:, i] = city - offset
+
+    return child
+
+
+def _cut_point(pair_num, city_num, rng):
+    """ choose random segment of each pair
+
+    Arguments:
+    ----------
+        pair_num {int} -- the number of pairs
+        city_num {int} -- the number of cities
+        rng {np.random.Generator} -- random generator
+
+    Returns:
+    --------
+        start {np.ndarray} -- first position of segment
+        stop {np.ndarray} -- next to last position of segment
+    """
+    point = np.sort(rng.integers(0, city_num + 1, (pair_num, 2)), axis=1)
+    return point[:, 0], point[:, 1]
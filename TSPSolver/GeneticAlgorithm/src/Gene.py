@@ -1,47 +1,93 @@
+from bisect import bisect_left
 import numpy as np
 
 
-class Gene:
-    """ Gene class
+def make_gene(population_size, city_num, rng=None):
+    """ make random genes of ordinal representation.
+    i-th value of gene is an index of city in the list of cities which aren't visited yet, so that it's in [0, city_num - i)
 
-    Attributes:
-    -----------
-        CITY_NUM {int} -- the number of cities
-        GENE_SIZE {int} -- gene size
-        gene {np.ndarray} -- gene representation
-        route {list[int]} -- route converted from gene
+    Arguments:
+    ----------
+        population_size {int} -- the number of genes
+        city_num {int} -- the number of cities
+
+    Keyword Arguments:
+    ------------------
+        rng {np.random.Generator} -- random generator. If this is None, new generator is made (default: None)
+
+    Returns:
+    --------
+        gene {np.ndarray} -- genes, shape is (population_size, city_num)
+
+    Examples:
+    ---------
+        >>> make_gene(2, 5, np.random.default_rng(0))
+        array([[3, 1, 0, 0, 0],
+               [4, 2, 2, 1, 0]])
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    upper = np.arange(city_num, 0, -1)
+    return (rng.random((population_size, city_num)) * upper).astype(np.int64)
+
+
+def gene_to_route(gene):
+    """ convert genes of ordinal representation to routes.
+    Each gene is decoded by popping cities from the list of unvisited cities, whose shift is done by memmove in C,
+    so that this is faster than order-statistic trees in Python or numpy up to tens of thousands of cities.
+
+    Arguments:
+    ----------
+        gene {np.ndarray} -- genes, shape is (population_size, city_num)
+
+    Returns:
+    --------
+        route {np.ndarray} -- routes, shape is (population_size, city_num)
+
+    Examples:
+    ---------
+        >>> gene_to_route(np.array([[4, 3, 2, 1, 0], [0, 0, 0, 0, 0]]))
+        array([[4, 3, 2, 1, 0],
+               [0, 1, 2, 3, 4]])
+    """
+    gene = np.asarray(gene)
+    route = np.empty(gene.shape, dtype=np.int64)
+    cities = list(range(gene.shape[1]))
+    for i, _gene in enumerate(gene.tolist()):
+        city = cities.copy()
+        route[i] = [city.pop(g) for g in _gene]
+
+    return route
+
+
+def route_to_gene(route):
+    """ convert routes to genes of ordinal representation, which is the inverse of gene_to_route
+
+    Arguments:
+    ----------
+        route {np.ndarray} -- routes, shape is (population_size, city_num)
+
+    Returns:
+    --------
+        gene {np.ndarray} -- genes, shape is (population_size, city_num)
+
+    Examples:
+    ---------
+        >>> route_to_gene(np.array([[4, 3, 2, 1, 0], [0, 1, 2, 3, 4]]))
+        array([[4, 3, 2, 1, 0],
+               [0, 0, 0, 0, 0]])
     """
+    route = np.asarray(route)
+    gene = np.empty(route.shape, dtype=np.int64)
+    cities = list(range(route.shape[1]))
+    for i, _route in enumerate(route.tolist()):
+        city = cities.copy()
+        _gene = []
+        for c in _route:
+            idx = bisect_left(city, c)
+            del city[idx]
+            _gene.append(idx)
+        gene[i] = _gene
 
-    def __init__(self, gene_size, city_num):
-        """
-        Arguments:
-        ----------
-            gene_size {int} -- size of gene
-            city_num {int} -- the number of cities
-        """
-        self.CITY_NUM = city_num
-        self.GENE_SIZE = gene_size
-        self._initialize_gene()
-
-    def _initialize_gene(self):
-        """ initialize gene information"""
-        self.gene = np.zeros(self.GENE_SIZE, dtype=np.int32)
-
-        for i in range(self.GENE_SIZE):
-            gene = np.random.randint(0, self.GENE_SIZE-i, 1)[0]
-            self.gene[i] = int(gene)
-
-    def get_route_pair(self):
-        self._convert_to_route()
-        for i in range(self.CITY_NUM):
-            city1 = self.route[i]
-            city2 = self.route[(i+1)%self.CITY_NUM]
-            yield city1, city2
-
-    def _convert_to_route(self):
-        city = [i for i in range(self.CITY_NUM)]
-        self.route = []
-        for g in self.gene:
-            next_city = city[g]
-            del city[g]
-            self.route.append(next_city)
\ No newline at end of file
+    return gene
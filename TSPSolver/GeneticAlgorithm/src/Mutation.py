@@ -1,13 +1,18 @@
 import random
+import numpy as np
 
 
-def mutate(gene, threshold):
+def mutate(gene, threshold, rng=None):
     """ mutate gene
 
     Arguments:
     ----------
         gene {list[int]} -- gene
-        threshold {float} -- threshold for mutating
+        threshold {float} -- probability of mutating
+
+    Keyword Arguments:
+    ------------------
+        rng {np.random.Generator} -- random generator. If this is None, random module is used (default: None)
 
     Returns:
     --------
@@ -25,7 +30,7 @@ def mutate(gene, threshold):
         [2, 3, 2, 1, 0]
         [4, 0, 2, 1, 0]
         >>> for _ in range(5):
-        ...     new_gene = mutate(gene, 0.1)        # change thresold to 0.1
+        ...     new_gene = mutate(gene, 0.9)        # change thresold to 0.9
         ...     print(new_gene)
         [4, 2, 2, 1, 0]
         [4, 3, 0, 1, 0]
@@ -33,7 +38,7 @@ def mutate(gene, threshold):
         [4, 0, 2, 1, 0]
         [2, 3, 2, 1, 0]
         >>> for _ in range(5):
-        ...     new_gene = mutate(gene, 0.9)        # change thresold to 0.9
+        ...     new_gene = mutate(gene, 0.1)        # change thresold to 0.1
         ...     print(new_gene)
         [2, 3, 2, 1, 0]
         [4, 3, 2, 1, 0]
@@ -41,19 +46,162 @@ def mutate(gene, threshold):
         [4, 3, 2, 1, 0]
         [4, 3, 2, 1, 0]]
     """
-    mutate_prob = random.random()
-    if mutate_prob < threshold:
+    random_ = random if rng is None else _GeneratorRandom(rng)
+    mutate_prob = random_.random()
+    if mutate_prob >= threshold:
         new_gene = gene
 
     else:
         length = len(gene)
-        mutate_pos = random.randint(0, length-2)
+        mutate_pos = random_.randint(0, length-2)
 
         new_gene = gene.copy()
         while True:
-            new_value = random.randint(0, length-mutate_pos-1)
+            new_value = random_.randint(0, length-mutate_pos-1)
             if not new_value == gene[mutate_pos]:
                 new_gene[mutate_pos] = new_value
                 break
 
-    return new_gene
\ No newline at end of file
+    return new_gene
+
+
+def swap_mutation(route, rate, rng):
+    """ swap two random cities of each mutated route in place
+
+    Arguments:
+    ----------
+        route {np.ndarray} -- routes, shape is (population_size, city_num)
+        rate {float} -- probability that each route is mutated
+        rng {np.random.Generator} -- random generator
+
+    Returns:
+    --------
+        idx {np.ndarray} -- indices of mutated routes
+    """
+    idx, uniform = _choose_mutation(len(route), rate, rng)
+    position = (uniform * route.shape[1]).astype(np.int64)
+    city1 = route[idx, position[:, 0]]
+    route[idx, position[:, 0]] = route[idx, position[:, 1]]
+    route[idx, position[:, 1]] = city1
+    return idx
+
+
+def inversion_mutation(route, rate, rng):
+    """ reverse a random segment of each mutated route in place, which is the same as 2-opt move
+
+    Arguments:
+    ----------
+        route {np.ndarray} -- routes, shape is (population_size, city_num)
+        rate {float} -- probability that each route is mutated
+        rng {np.random.Generator} -- random generator
+
+    Returns:
+    --------
+        idx {np.ndarray} -- indices of mutated routes
+    """
+    idx, uniform = _choose_mutation(len(route), rate, rng)
+    position = (uniform * route.shape[1]).astype(np.int64)
+    start, stop = _segment(position)
+    column = np.arange(route.shape[1])
+    in_segment = (column >= start[:, None]) & (column < stop[:, None])
+    source = np.where(in_segment, start[:, None] + stop[:, None] - 1 - column, column)
+    route[idx] = np.take_along_axis(route[idx], source, axis=1)
+    return idx
+
+
+def scramble_mutation(route, rate, rng):
+    """ shuffle a random segment of each mutated route in place
+
+    Arguments:
+    ----------
+        route {np.ndarray} -- routes, shape is (population_size, city_num)
+        rate {float} -- probability that each route is mutated
+        rng {np.random.Generator} -- random generator
+
+    Returns:
+    --------
+        idx {np.ndarray} -- indices of mutated routes
+    """
+    idx, uniform = _choose_mutation(len(route), rate, rng)
+    position = (uniform * route.shape[1]).astype(np.int64)
+    start, stop = _segment(position)
+    column = np.arange(route.shape[1])
+    in_segment = (column >= start[:, None]) & (column < stop[:, None])
+    # random keys in the segment lie between keys of positions before and after it, so that only the segment is shuffled
+    key = np.where(in_segment, start[:, None] + rng.random((len(idx), route.shape[1])) * (stop - start)[:, None], column)
+    route[idx] = np.take_along_axis(route[idx], np.argsort(key, axis=1, kind="stable"), axis=1)
+    return idx
+
+
+def ordinal_mutation(gene, rate, rng):
+    """ change a value of each mutated gene of ordinal representation in place, which is the batched version of mutate
+
+    Arguments:
+    ----------
+        gene {np.ndarray} -- genes, shape is (population_size, city_num)
+        rate {float} -- probability that each gene is mutated
+        rng {np.random.Generator} -- random generator
+
+    Returns:
+    --------
+        idx {np.ndarray} -- indices of mutated genes
+    """
+    city_num = gene.shape[1]
+    if city_num < 2:
+        return np.empty(0, dtype=np.int64)
+
+    # the last value is always 0, and new value is drawn from the others than the current one
+    idx, uniform = _choose_mutation(len(gene), rate, rng)
+    position = (uniform[:, 0] * (city_num - 1)).astype(np.int64)
+    current = gene[idx, position]
+    new_value = (uniform[:, 1] * (city_num - 1 - position)).astype(np.int64)
+    new_value += new_value >= current
+    gene[idx, position] = new_value
+    return idx
+
+
+def _choose_mutation(row_num, rate, rng):
+    """ choose mutated rows and two uniform random numbers of each mutated row with one random call
+
+    Arguments:
+    ----------
+        row_num {int} -- the number of rows
+        rate {float} -- probability that each row is mutated
+        rng {np.random.Generator} -- random generator
+
+    Returns:
+    --------
+        idx {np.ndarray} -- indices of mutated rows
+        uniform {np.ndarray} -- random numbers in [0, 1), shape is (len(idx), 2)
+    """
+    random_value = rng.random((row_num, 3))
+    idx = np.flatnonzero(random_value[:, 0] < rate)
+    return idx, random_value[idx, 1:]
+
+
+def _segment(position):
+    """ make segment from two positions, which includes both positions
+
+    Arguments:
+    ----------
+        position {np.ndarray} -- two positions of each row
+
+    Returns:
+    --------
+        start {np.ndarray} -- first position of segment
+        stop {np.ndarray} -- next to last position of segment
+    """
+    return position.min(axis=1), position.max(axis=1) + 1
+
+
+class _GeneratorRandom:
+    """ wrapper of np.random.Generator which has the same interface as random module"""
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def random(self):
+        return self.rng.random()
+
+    def randint(self, a, b):
+        return int(self.rng.integers(a, b + 1))
@@ -1,35 +1,218 @@
-from .Gene import Gene
-from .Select import roulette_selection
-from .Mutation import mutate
-
+import numpy as np
+from .Gene import make_gene, gene_to_route, route_to_gene
+from .Select import elite_selection, roulette_selection, ranking_selection, tournament_selection
 
 
 class Population:
-    """
+    """ Population whose genes and routes are held in arrays.
+    Genes are converted to routes and vice versa only when they're needed, and only individuals which are changed are
+    converted and evaluated again, so that operators on routes like crossover don't pay for ordinal representation.
+
     Attributes:
     -----------
-        population_size {int} -- the number of population
-        city_num {int} -- the number of cities
+        POPULATION_SIZE {int} -- the number of population
+        CITY_NUM {int} -- the number of cities
+        distance {DistanceBase} -- distance between cities
+        rng {np.random.Generator} -- random generator
+        gene {np.ndarray} -- genes of ordinal representation, shape is (population_size, city_num)
+        route {np.ndarray} -- routes converted from gene, shape is (population_size, city_num)
+        fitness {np.ndarray} -- distance of each route
+
+    Examples:
+    ---------
+        >>> population = Population(100, city_num, distance, seed=0)
+        >>> fitness = population.evaluate()
+        >>> population.gene[3, 5] = 0                  # genes are changed in place
+        >>> population.invalidate([3])                 # only the 3rd individual will be decoded and evaluated again
+        >>> fitness = population.evaluate()
+        >>> population.route[4, [0, 1]] = population.route[4, [1, 0]]
+        >>> population.invalidate([4], changed="route")
     """
 
-    def __init__(self, population_size, city_num, distance):
+    __SELECTION = ("roulette", "ranking", "tournament")
+
+    def __init__(self, population_size, city_num, distance, seed=None):
         """
         Arguments:
         ----------
             population_size {int} -- the number of population
             city_num {int} -- the number of cities
+            distance {DistanceBase} -- distance between cities
+
+        Keyword Arguments:
+        ------------------
+            seed {int or np.random.SeedSequence} -- seed of random generator (default: None)
         """
         self.POPULATION_SIZE = population_size
         self.CITY_NUM = city_num
         self.distance = distance
-        self.gene = [Gene(self.POPULATION_SIZE, self.CITY_NUM) for _ in range(self.POPULATION_SIZE)]
-        self.fitness = np.array([0.0 for _ in range(self.POPULATION_SIZE)])
+        self.rng = np.random.default_rng(seed)
+        self.fitness = np.zeros(self.POPULATION_SIZE)
+        self._gene = make_gene(self.POPULATION_SIZE, self.CITY_NUM, self.rng)
+        self._route = np.empty((self.POPULATION_SIZE, self.CITY_NUM), dtype=np.int64)
+        self._has_gene = np.ones(self.POPULATION_SIZE, dtype=bool)
+        self._has_route = np.zeros(self.POPULATION_SIZE, dtype=bool)
+        self._is_evaluated = np.zeros(self.POPULATION_SIZE, dtype=bool)
+
+    @property
+    def gene(self):
+        return self.get_gene()
+
+    @property
+    def route(self):
+        return self.get_route()
+
+    def get_gene(self, idx=None):
+        """ get genes, which are encoded from routes if they're changed
+
+        Keyword Arguments:
+        ------------------
+            idx {np.ndarray} -- indices of individuals. If this is None, genes of all individuals are returned (default: None)
+
+        Returns:
+        --------
+            {np.ndarray} -- genes
+        """
+        self._encode(idx)
+        return self._gene if idx is None else self._gene[idx]
+
+    def get_route(self, idx=None):
+        """ get routes, which are decoded from genes if they're changed
+
+        Keyword Arguments:
+        ------------------
+            idx {np.ndarray} -- indices of individuals. If this is None, routes of all individuals are returned (default: None)
+
+        Returns:
+        --------
+            {np.ndarray} -- routes
+        """
+        self._decode(idx)
+        return self._route if idx is None else self._route[idx]
+
+    def invalidate(self, idx=None, changed="gene"):
+        """ mark individuals whose genes or routes are changed in place
+
+        Keyword Arguments:
+        ------------------
+            idx {np.ndarray} -- indices of changed individuals. If this is None, all individuals are changed (default: None)
+            changed {str} -- "gene" or "route", which is changed (default: "gene")
+        """
+        idx = slice(None) if idx is None else idx
+        if changed == "gene":
+            self._has_route[idx] = False
+        else:
+            self._has_gene[idx] = False
+        self._is_evaluated[idx] = False
+
+    def set_gene(self, gene, idx=None):
+        """ replace genes
+
+        Arguments:
+        ----------
+            gene {np.ndarray} -- new genes
+
+        Keyword Arguments:
+        ------------------
+            idx {np.ndarray} -- indices of replaced individuals. If this is None, all individuals are replaced (default: None)
+        """
+        idx = slice(None) if idx is None else idx
+        self._gene[idx] = gene
+        self._has_gene[idx] = True
+        self.invalidate(idx, changed="gene")
+
+    def set_route(self, route, idx=None):
+        """ replace routes. Genes are encoded from them when they're needed
+
+        Arguments:
+        ----------
+            route {np.ndarray} -- new routes
+
+        Keyword Arguments:
+        ------------------
+            idx {np.ndarray} -- indices of replaced individuals. If this is None, all individuals are replaced (default: None)
+        """
+        idx = slice(None) if idx is None else idx
+        self._route[idx] = route
+        self._has_route[idx] = True
+        self._has_gene[idx] = False
+        self._is_evaluated[idx] = False
+
+    def _encode(self, idx):
+        """ encode genes from routes which are changed
+
+        Arguments:
+        ----------
+            idx {np.ndarray} -- indices of individuals, None for all individuals
+        """
+        idx = np.arange(self.POPULATION_SIZE) if idx is None else np.asarray(idx)
+        changed = idx[~self._has_gene[idx]]
+        if len(changed) > 0:
+            self._gene[changed] = route_to_gene(self._route[changed])
+            self._has_gene[changed] = True
+
+    def _decode(self, idx):
+        """ decode routes from genes which are changed
+
+        Arguments:
+        ----------
+            idx {np.ndarray} -- indices of individuals, None for all individuals
+        """
+        idx = np.arange(self.POPULATION_SIZE) if idx is None else np.asarray(idx)
+        changed = idx[~self._has_route[idx]]
+        if len(changed) > 0:
+            self._route[changed] = gene_to_route(self._gene[changed])
+            self._has_route[changed] = True
 
     def evaluate(self):
-        for i, gene in enumerate(self.gene):
-            self.fitness[i] = 0.0
-            for city1, city2 in gene.get_route_pair():
-                self.fitness[i] += self.distance[city1, city2]
+        """ calculate distance of routes which are changed after the last evaluation at once
+
+        Returns:
+        --------
+            fitness {np.ndarray} -- distance of each route
+        """
+        changed = np.flatnonzero(~self._is_evaluated)
+        if len(changed) > 0:
+            self.fitness[changed] = self.distance.route_distance(self.get_route(changed))
+            self._is_evaluated[changed] = True
+        return self.fitness
+
+    def select(self, num, method="roulette", tournament_size=3):
+        """ select individuals as parents. Shorter route is selected more likely
+
+        Arguments:
+        ----------
+            num {int} -- the number of selected individuals
+
+        Keyword Arguments:
+        ------------------
+            method {str} -- "roulette", "ranking" or "tournament" (default: "roulette")
+            tournament_size {int} -- the number of individuals in each tournament (default: 3)
+
+        Returns:
+        --------
+            {np.ndarray} -- indices of selected individuals
+        """
+        if method not in self.__SELECTION:
+            raise ValueError(f"Unknown selection: {method}")
+
+        score = 1.0 / self.evaluate()
+        if method == "roulette":
+            return roulette_selection(score, num, self.rng)
+        elif method == "ranking":
+            return ranking_selection(score, num, self.rng)
+        else:
+            return tournament_selection(score, num, tournament_size, self.rng)
 
-    def select(self):
-        pass
\ No newline at end of file
+    def elite(self, num):
+        """ get the best individuals
+
+        Arguments:
+        ----------
+            num {int} -- the number of individuals
+
+        Returns:
+        --------
+            {np.ndarray} -- indices of individuals in ascending order of distance
+        """
+        return elite_selection(-self.evaluate(), num)
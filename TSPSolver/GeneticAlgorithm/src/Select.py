@@ -1,4 +1,4 @@
-import random
+import numpy as np
 
 
 def _make_rank(fitness):
@@ -6,25 +6,20 @@ def _make_rank(fitness):
 
     Arguments:
     ----------
-        fitness {list[float]} -- each indivisuals' fitness
+        fitness {np.ndarray} -- each indivisuals' fitness
 
     Returns:
     --------
-        rank {list[int]} -- rank
+        rank {np.ndarray} -- indivisuals' id in ascending order of fitness
 
     Examples:
     ---------
         >>> fitness = [5, 3, 4, 1, 2]
         >>> rank = _make_rank(fitness)
         >>> rank
-        [3, 4, 1, 2, 0]
+        array([3, 4, 1, 2, 0])
     """
-    rank_dict = {i: _fitness for i, _fitness in enumerate(fitness)}
-    rank = []
-    for k, _ in sorted(rank_dict.items(), key=lambda x: x[1]):
-        rank.append(k)
-
-    return rank
+    return np.argsort(fitness, kind="stable")
 
 
 def _calculate_probability(fitness):
@@ -32,25 +27,21 @@ def _calculate_probability(fitness):
 
     Arguments:
     ----------
-        fitness {list[float]} -- each indivisuals' fitness
+        fitness {np.ndarray} -- each indivisuals' fitness
 
     Returns:
     --------
-        prob {list[float]} -- each indivisuals' probability for selecting
+        prob {np.ndarray} -- each indivisuals' probability for selecting
 
     Examples:
     ---------
         >>> fitness = [1, 2, 3, 4]
         >>> prob = _calculate_probability(fitness)
         >>> prob
-        [0.1, 0.2, 0.3, 0.4]
+        array([0.1, 0.2, 0.3, 0.4])
     """
-    prob_sum = sum(fitness)
-    prob = []
-    for _fitness in fitness:
-        prob.append(_fitness/prob_sum)
-
-    return prob
+    fitness = np.asarray(fitness, dtype=np.float64)
+    return fitness / fitness.sum()
 
 
 def elite_selection(fitness, num):
@@ -58,34 +49,98 @@ def elite_selection(fitness, num):
 
     Arguments:
     ----------
-        fitness {list[float]} -- list of each indivisual's fitness
+        fitness {np.ndarray} -- each indivisual's fitness, which is larger for better one
+        num {int} -- the number of indivisuals which will be selected
+
+    Returns:
+    --------
+        {np.ndarray} -- selected indivisuals' id in descending order of fitness
+
+    Examples:
+    ---------
+        >>> elite_selection([5, 3, 4, 1, 2], 2)
+        array([0, 2])
+    """
+    fitness = np.asarray(fitness)
+    num = min(num, len(fitness))
+    if num <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    # only the best num indivisuals are sorted
+    idx = np.argpartition(-fitness, num - 1)[:num]
+    return idx[np.argsort(-fitness[idx], kind="stable")]
+
+
+def roulette_selection(fitness, num, rng=None):
+    """ select with probability proportional to fitness, by searching random numbers in cumulative sum of fitness
+
+    Arguments:
+    ----------
+        fitness {np.ndarray} -- each indivisual's fitness, which is larger for better one and not negative
         num {int} -- the number of indivisuals which will be selected
 
+    Keyword Arguments:
+    ------------------
+        rng {np.random.Generator} -- random generator. If this is None, new generator is made (default: None)
+
     Returns:
     --------
-        rank {list[int]} -- selected indivisuals' id
+        {np.ndarray} -- selected indivisuals' id
+
+    Examples:
+    ---------
+        >>> roulette_selection([1, 0, 3], 5, np.random.default_rng(0))
+        array([2, 2, 0, 0, 2])
     """
-    rank = _make_rank(fitness)
-    return rank[:num]
+    if rng is None:
+        rng = np.random.default_rng()
+
+    cumulative = np.cumsum(fitness, dtype=np.float64)
+    point = rng.random(num) * cumulative[-1]
+    return np.minimum(np.searchsorted(cumulative, point, side="right"), len(cumulative) - 1)
+
+
+def ranking_selection(fitness, num, rng=None):
+    """ select with probability proportional to rank, where the worst indivisual's rank is 1
+
+    Arguments:
+    ----------
+        fitness {np.ndarray} -- each indivisual's fitness, which is larger for better one
+        num {int} -- the number of indivisuals which will be selected
 
+    Keyword Arguments:
+    ------------------
+        rng {np.random.Generator} -- random generator. If this is None, new generator is made (default: None)
 
-def roulette_selection(fitness, num):
-    prob = _calculate_probability(fitness)
+    Returns:
+    --------
+        {np.ndarray} -- selected indivisuals' id
+    """
+    rank = np.empty(len(fitness))
+    rank[_make_rank(fitness)] = np.arange(1, len(fitness) + 1)
+    return roulette_selection(rank, num, rng)
 
 
-def ranking_selection(fitness, num):
-    pass
+def tournament_selection(fitness, num, tournament_size, rng=None):
+    """ select the best indivisual of each tournament, whose members are drawn with replacement
 
+    Arguments:
+    ----------
+        fitness {np.ndarray} -- each indivisual's fitness, which is larger for better one
+        num {int} -- the number of indivisuals which will be selected
+        tournament_size {int} -- the number of indivisuals in each tournament
 
-def tournament_selection(fitness, num, tournament_size):
-    base = [i for i in range(len(fitness))]
-    result = []
+    Keyword Arguments:
+    ------------------
+        rng {np.random.Generator} -- random generator. If this is None, new generator is made (default: None)
 
-    for i in range(num):
-        cand = random.sample(base, tournament_size)
-        cand_value = [fitness[_cand] for _cand in cand]
-        max_value = max(cand_value)
-        max_idx = cand_value.index(max_value)
-        result.append(max_idx)
+    Returns:
+    --------
+        {np.ndarray} -- selected indivisuals' id
+    """
+    if rng is None:
+        rng = np.random.default_rng()
 
-    return result
\ No newline at end of file
+    fitness = np.asarray(fitness)
+    candidate = rng.integers(0, len(fitness), (num, tournament_size))
+    return candidate[np.arange(num), fitness[candidate].argmax(axis=1)]
@@ -1,71 +1,265 @@
-from ..utils.DataLoader import load_dataset
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from ..utils.Distance import load_distance, CoordinateDistance, DenseDistance
+from ..utils.DataLoader import load_coordinate
 from ..utils.DataWriter import DataWriter
+from ..utils.SpatialIndex import GridIndex
+from ..utils.Parallel import get_worker_num, split_chunk, share_array, attach_array
 from pprint import pprint
 
 
+# state of worker process which is set by _init_worker
+_worker = {}
+
+
 class Greedy:
     """ Greedy method
 
     Attributes:
     -----------
         CITY_NUM {int} -- the number of cities
-        distance_arr {np.ndarray} -- distance between cities
+        ENGINE {str} -- "matrix" scans distance rows, "grid" queries spatial index over coordinates
+        START_NUM {int} -- the number of start cities, None means all cities
+        SEED {int} -- seed of sampling start cities
+        distance_arr {DistanceBase} -- distance between cities
+        coord {np.ndarray} -- coordinates of cities, which is loaded only for "grid" engine
         writer {DataWriter} -- writer of saving scores
         route {dict} -- route which starts from each cities
+        distance {dict} -- distance of route which starts from each cities
+        best_route {list[int]} -- the best route
+        best_distance {float} -- the best distance
 
     Examples:
     ---------
         >>> from TSPSolver.Greedy import Greedy
         >>> greedy = Greedy("kroA100.tsp")
         >>> greedy.search()
+        >>> greedy = Greedy("pla33810.tsp", distance_mode="coordinate", engine="grid", start_num=10, seed=0)
+        >>> best_route, distance = greedy.search(n_jobs=-1)     # use all CPUs
     """
 
-    def __init__(self, dataset_filename):
+    __ENGINE = ("matrix", "grid")
+
+    def __init__(self, dataset_filename, dtype=np.float64, mmap_mode=None, distance_mode="dense",
+                 engine="matrix", start_num=None, seed=None):
         """
         Arguments:
         ----------
             dataset_filename {str} -- dataset file name
+
+        Keyword Arguments:
+        ------------------
+            dtype {np.dtype} -- data type of distance (default: np.float64)
+            mmap_mode {str} -- if this is set, distance is memory-mapped from dataset cache with this mode (default: None)
+            distance_mode {str} -- "dense" holds distance array, "coordinate" calculates distance from coordinates when it's needed (default: "dense")
+            engine {str} -- "matrix" scans distance rows, "grid" finds the nearest city with spatial index over coordinates (default: "matrix")
+            start_num {int} -- the number of start cities which are sampled at random. If this is None, route starts from each cities (default: None)
+            seed {int} -- seed of sampling start cities. If this is set, the same start cities are sampled (default: None)
         """
-        city_num, distance = load_dataset(dataset_filename)
+        if engine not in self.__ENGINE:
+            raise ValueError(f"Unknown engine: {engine}")
+
+        city_num, distance = load_distance(dataset_filename, distance_mode, dtype, mmap_mode)
         self.CITY_NUM = city_num
+        self.ENGINE = engine
+        self.START_NUM = start_num
+        self.SEED = seed
         self.distance_arr = distance
+        self.coord = None
+        if engine == "grid":
+            self.coord = self._load_coordinate(dataset_filename)
         self.writer = DataWriter()
 
-    def search(self):
-        """ search path"""
-        self.generate_route()
-        self.calculate_distance()
+    def search(self, n_jobs=None):
+        """ search path
+
+        Keyword Arguments:
+        ------------------
+            n_jobs {int} -- the number of processes which build routes from different start cities. -1 means all CPUs (default: None)
+
+        Returns:
+        --------
+            best_route {list[int]} -- the best route
+            distance {dict} -- distance of route which starts from each cities
+        """
+        if get_worker_num(n_jobs) == 1:
+            self.generate_route()
+            self.calculate_distance()
+        else:
+            self._search_parallel(get_worker_num(n_jobs))
+
+        best_start = min(self.distance, key=self.distance.get)
+        self.best_route = self.route[best_start]
+        self.best_distance = self.distance[best_start]
 
         for k, v in self.distance.items():
             print(f"Start: {k}\tDistance: {v:.4f}")
 
+        return self.best_route, self.distance
+
     def generate_route(self):
         """ gnerate route"""
         self.route = {}
-        for i in range(self.CITY_NUM):
-            self.route[i] = [i]
+        for start in self._get_start_city():
+            if self.ENGINE == "grid":
+                self.route[start] = _generate_route_grid(self.coord, start)
+            else:
+                self.route[start] = _generate_route_matrix(self.distance_arr, start)
+
+    def _search_parallel(self, worker_num):
+        """ build routes in worker processes. Dense distance array is shared through shared memory, or through its file when it's memory-mapped.
 
-            for next_city in range(self.CITY_NUM):
-                if next_city == i:
-                    continue
+        Arguments:
+        ----------
+            worker_num {int} -- the number of worker processes
+        """
+        shared = None
+        distance = self.distance_arr
+        if isinstance(distance, DenseDistance):
+            distance, shared = share_array(distance.matrix)
 
-                distance = self.distance_arr[self.route[i][-1]]
-                distance_dict = {k: v for k, v in zip(range(self.CITY_NUM), distance)}
-                distance_dict_sorted = dict(sorted(distance_dict.items(), key=lambda x: x[1]))
+        self.route = {}
+        self.distance = {}
+        try:
+            # a few chunks per worker keep the load balanced without much communication
+            chunks = split_chunk(self._get_start_city(), worker_num * 4)
+            with ProcessPoolExecutor(worker_num, initializer=_init_worker,
+                                     initargs=(distance, self.coord, self.ENGINE)) as executor:
+                for result in executor.map(_generate_route_worker, chunks):
+                    for start, route, route_distance in result:
+                        self.route[start] = route
+                        self.distance[start] = route_distance
+        finally:
+            if shared is not None:
+                shared.unlink()
+
+    def _get_start_city(self):
+        """ get start cities
+
+        Returns:
+        --------
+            {list[int]} -- start cities
+        """
+        if self.START_NUM is None or self.START_NUM >= self.CITY_NUM:
+            return list(range(self.CITY_NUM))
+
+        return sorted(np.random.default_rng(self.SEED).choice(self.CITY_NUM, self.START_NUM, replace=False).tolist())
+
+    def _load_coordinate(self, dataset_filename):
+        """ load coordinates for spatial index
+
+        Arguments:
+        ----------
+            dataset_filename {str} -- dataset file name
+
+        Returns:
+        --------
+            coord {np.ndarray} -- coordinates of cities
+        """
+        if isinstance(self.distance_arr, CoordinateDistance):
+            coord, edge_weight_type = self.distance_arr.coord, self.distance_arr.EDGE_WEIGHT_TYPE
+        else:
+            _, coord, edge_weight_type = load_coordinate(dataset_filename)
 
-                for k, v in distance_dict_sorted.items():
-                    if v == -1 or k in self.route[i]:
-                        continue
-                    self.route[i].append(k)
-                    break
+        if edge_weight_type == "GEO":
+            raise ValueError("grid engine doesn't support EDGE_WEIGHT_TYPE GEO")
+
+        return coord
 
     def calculate_distance(self):
         """ calculate distance"""
         self.distance = {}
 
         for k, v in self.route.items():
-            self.distance[k] = 0
-            for i in range(self.CITY_NUM):
-                city1 = v[i]
-                city2 = v[(i+1) % self.CITY_NUM]
-                self.distance[k] += self.distance_arr[city1, city2]
\ No newline at end of file
+            self.distance[k] = self.distance_arr.route_distance(v)
+
+
+def _generate_route_matrix(distance, start):
+    """ generate route by scanning distance row of current city
+
+    Arguments:
+    ----------
+        distance {DistanceBase} -- distance between cities
+        start {int} -- start city
+
+    Returns:
+    --------
+        route {list[int]} -- route
+    """
+    city_num = len(distance)
+    route = [start]
+    visited = np.zeros(city_num, dtype=bool)
+    visited[start] = True
+
+    for _ in range(city_num - 1):
+        row_distance = np.array(distance.row(route[-1]), dtype=np.float64)
+        row_distance[visited] = np.inf
+        next_city = int(row_distance.argmin())
+        route.append(next_city)
+        visited[next_city] = True
+
+    return route
+
+
+def _generate_route_grid(coord, start):
+    """ generate route by querying spatial index, from which visited cities are removed
+
+    Arguments:
+    ----------
+        coord {np.ndarray} -- coordinates of cities
+        start {int} -- start city
+
+    Returns:
+    --------
+        route {list[int]} -- route
+    """
+    index = GridIndex(coord)
+    route = [start]
+    index.remove(start)
+
+    for _ in range(len(coord) - 1):
+        next_city = index.nearest(route[-1])
+        route.append(next_city)
+        index.remove(next_city)
+
+    return route
+
+
+def _init_worker(distance, coord, engine):
+    """ initialize worker process
+
+    Arguments:
+    ----------
+        distance {DistanceBase or tuple} -- distance provider, or spec of share_array which has distance array
+        coord {np.ndarray} -- coordinates of cities
+        engine {str} -- "matrix" or "grid"
+    """
+    if isinstance(distance, tuple):
+        matrix, _worker["shared"] = attach_array(distance)
+        distance = DenseDistance(matrix)
+
+    _worker["distance"] = distance
+    _worker["coord"] = coord
+    _worker["engine"] = engine
+
+
+def _generate_route_worker(starts):
+    """ generate routes in worker process
+
+    Arguments:
+    ----------
+        starts {list[int]} -- start cities
+
+    Returns:
+    --------
+        {list[tuple]} -- start city, route and distance of each start city
+    """
+    result = []
+    for start in starts:
+        if _worker["engine"] == "grid":
+            route = _generate_route_grid(_worker["coord"], start)
+        else:
+            route = _generate_route_matrix(_worker["distance"], start)
+        result.append((start, route, float(_worker["distance"].route_distance(route))))
+
+    return result
@@ -1,7 +1,14 @@
-from ..utils.DataLoader import load_dataset
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from ..utils.Distance import load_distance, DenseDistance
 from ..utils.DataWriter import DataWriter
+from ..utils.Parallel import get_worker_num, split_chunk, share_array, attach_array
+from ..utils.Tour import Tour
 import numpy as np
-from random import shuffle
+import heapq
+
+
+# state of worker process which is set by _init_worker
+_worker = {}
 
 
 class InsertionBase:
@@ -10,28 +17,73 @@ class InsertionBase:
     Attributes:
     -----------
         CITY_NUM {int} -- the number of cities
-        distasnce {np.ndarray} -- distance between cities
+        distasnce {DistanceBase} -- distance between cities
         writer {DataWriter} -- writer for saving scores
         best_distance {float} -- the best score
-        route {list[int]} -- list of visit history, which is defined in child-class
+        best_route {list[int]} -- the best route
+        route {Tour} -- visit history, which is defined in child-class
+        route_distance {float} -- distance of route, which is updated whenever a city is inserted
     """
 
-    def __init__(self, dataset_filename):
+    def __init__(self, dataset_filename, dtype=np.float64, mmap_mode=None, distance_mode="dense"):
         """
         Arguments:
         ----------
             dataset_filename {str} -- dataset file name
+
+        Keyword Arguments:
+        ------------------
+            dtype {np.dtype} -- data type of distance (default: np.float64)
+            mmap_mode {str} -- if this is set, distance is memory-mapped from dataset cache with this mode (default: None)
+            distance_mode {str} -- "dense" holds distance array, "coordinate" calculates distance from coordinates when it's needed (default: "dense")
+        """
+        city_num, distance = load_distance(dataset_filename, distance_mode, dtype, mmap_mode)
+        self._initialize(city_num, distance)
+        self.writer = DataWriter()
+
+    def _initialize(self, city_num, distance):
+        """ initialize solver with distance
+
+        Arguments:
+        ----------
+            city_num {int} -- the number of cities
+            distance {DistanceBase} -- distance between cities
         """
-        city_num, distance = load_dataset(dataset_filename)
         self.CITY_NUM = city_num
         self.distance = distance
-        self.writer = DataWriter()
         self.best_distance = np.inf
+        self.best_route = None
+
+    @classmethod
+    def _from_distance(cls, distance):
+        """ create solver from distance provider without DataWriter, which is used in worker processes
+
+        Arguments:
+        ----------
+            distance {DistanceBase} -- distance between cities
+
+        Returns:
+        --------
+            {InsertionBase} -- solver
+        """
+        solver = cls.__new__(cls)
+        solver._initialize(len(distance), distance)
+        return solver
 
     def _select_city(self):
         """ function for selecting next city (this function is implemented in each Child Class)"""
         pass
 
+    def _init_route(self, start):
+        """ initialize route with start city
+
+        Arguments:
+        ----------
+            start {int} -- start city
+        """
+        self.route = Tour([start], self.CITY_NUM)
+        self.route_distance = 0.0
+
     def _generate_route(self):
         """ generate route"""
         for i in range(self.CITY_NUM-1):
@@ -48,20 +100,122 @@ class InsertionBase:
         length = len(self.route)
 
         if length <= 2:
+            self.route_distance += self._insertion_cost(np.array([self.route[-1]]), np.array([self.route[0]]), next_city)[0]
             self.route.append(next_city)
         else:
-            best_distance = np.inf
-            best_route = None
-            for pos in range(length):
-                route_cp = self.route.copy()
-                route_cp.insert(pos, next_city)
-                distance = self._calculate_distance(route_cp)
+            route = self.route.route
+            prev_city = np.roll(route, 1)
+            cost = self._insertion_cost(prev_city, route, next_city)
+            pos = int(cost.argmin())
+
+            self.route.insert(pos, next_city)
+            self.route_distance += cost[pos]
 
-                if distance < best_distance:
-                    best_distance = distance
-                    best_route = route_cp
+    def _insertion_cost(self, city1, city2, next_city):
+        """ calculate increase of distance when next_city is inserted between city1 and city2
 
-            self.route = best_route
+        Arguments:
+        ----------
+            city1 {np.ndarray} -- cities of edges
+            city2 {np.ndarray} -- cities next to city1
+            next_city {int} -- city to insert
+
+        Returns:
+        --------
+            cost {np.ndarray} -- d(city1, next_city) + d(next_city, city2) - d(city1, city2)
+        """
+        cost = self.distance.pair(city1, next_city) + self.distance.pair(next_city, city2)
+        # route which has only one city has no edge
+        return cost - np.where(city1 == city2, 0.0, self.distance.pair(city1, city2))
+
+    def _construct(self, start, seed=None):
+        """ construct route from start city
+
+        Arguments:
+        ----------
+            start {int} -- start city
+
+        Keyword Arguments:
+        ------------------
+            seed {np.random.SeedSequence} -- seed of random construction (default: None)
+
+        Returns:
+        --------
+            route {list[int]} -- route
+            route_distance {float} -- distance of route
+        """
+        self._init_route(start)
+        self._generate_route()
+        return list(self.route), float(self.route_distance)
+
+    def _search_multi_start(self, tasks, n_jobs=None, on_result=None):
+        """ construct routes of all tasks and update the best route.
+        Routes are constructed in worker processes when n_jobs is set, and dense distance array is shared through shared memory,
+        or through its file when it's memory-mapped.
+
+        Arguments:
+        ----------
+            tasks {list[tuple]} -- id, start city and seed of each construction, which are passed to _construct
+
+        Keyword Arguments:
+        ------------------
+            n_jobs {int} -- the number of processes. -1 means all CPUs (default: None)
+            on_result {callable} -- function which is called with id of task and distance of its route in order of completion.
+                                    If this is None, id of task and the best distance so far are printed (default: None)
+
+        Returns:
+        --------
+            best_route {list[int]} -- the best route
+            best_distance {float} -- the best distance
+        """
+        for route, route_distance, result in self._iter_construct(tasks, get_worker_num(n_jobs)):
+            if route_distance < self.best_distance:
+                self.best_distance = route_distance
+                self.best_route = route
+
+            for task_id, task_distance in result:
+                if on_result is None:
+                    print(task_id, self.best_distance)
+                else:
+                    on_result(task_id, task_distance)
+
+        return self.best_route, self.best_distance
+
+    def _iter_construct(self, tasks, worker_num):
+        """ construct routes of all tasks
+
+        Arguments:
+        ----------
+            tasks {list[tuple]} -- id, start city and seed of each construction
+            worker_num {int} -- the number of worker processes
+
+        Yields:
+        -------
+            route {list[int]} -- the best route of tasks which are finished together
+            route_distance {float} -- distance of route
+            result {list[tuple]} -- id of each task and distance of its route
+        """
+        if worker_num == 1:
+            for task_id, start, seed in tasks:
+                route, route_distance = self._construct(start, seed)
+                yield route, route_distance, [(task_id, route_distance)]
+            return
+
+        shared = None
+        distance = self.distance
+        if isinstance(distance, DenseDistance):
+            distance, shared = share_array(distance.matrix)
+
+        try:
+            # a few chunks per worker keep the load balanced, and each chunk sends back only its best route
+            chunks = split_chunk(tasks, worker_num * 4)
+            with ProcessPoolExecutor(worker_num, initializer=_init_worker, initargs=(type(self), distance)) as executor:
+                futures = [executor.submit(_construct_worker, chunk) for chunk in chunks]
+                for future in as_completed(futures):
+                    yield future.result()
+        finally:
+            if shared is not None:
+                shared.unlink()
 
     def _calculate_distance(self, route):
         """ calculate distance
@@ -74,14 +228,7 @@ class InsertionBase:
         --------
             distance {float} -- distance of route
         """
-        distance = 0
-        length = len(route)
-        for i in range(length):
-            city1 = route[i]
-            city2 = route[(i+1) % length]
-            distance += self.distance[city1, city2]
-
-        return distance
+        return self.distance.route_distance(route)
 
 
 class RandomInsertion(InsertionBase):
@@ -89,10 +236,10 @@ class RandomInsertion(InsertionBase):
     Attributes:
     -----------
         CITY_NUM {int} -- the number of cities
-        distasnce {np.ndarray} -- distance between cities
+        distasnce {DistanceBase} -- distance between cities
         writer {DataWriter} -- writer for saving scores
         best_distance {float} -- the best score
-        route {list[int]} -- list of visit history
+        route {Tour} -- visit history
 
     Examples:
     ---------
@@ -101,30 +248,69 @@ class RandomInsertion(InsertionBase):
         >>> ri.search(100)
     """
 
-    def __init__(self, dataset_filename):
+    def __init__(self, dataset_filename, dtype=np.float64, mmap_mode=None, distance_mode="dense"):
         """
         Arguments:
         ----------
             dataset_filename {str} -- dataset file name
+
+        Keyword Arguments:
+        ------------------
+            dtype {np.dtype} -- data type of distance (default: np.float64)
+            mmap_mode {str} -- if this is set, distance is memory-mapped from dataset cache with this mode (default: None)
+            distance_mode {str} -- "dense" holds distance array, "coordinate" calculates distance from coordinates when it's needed (default: "dense")
         """
-        super(RandomInsertion, self).__init__(dataset_filename)
+        super(RandomInsertion, self).__init__(dataset_filename, dtype, mmap_mode, distance_mode)
 
-    def search(self, iteration):
+    def search(self, iteration, n_jobs=None, seed=None, on_result=None):
         """ start searching
 
         Arguments:
         ----------
             iteration {int} -- the number of iterations
+
+        Keyword Arguments:
+        ------------------
+            n_jobs {int} -- the number of processes which run iterations. -1 means all CPUs (default: None)
+            seed {int} -- seed of iterations. If this is None, seed is drawn from np.random (default: None)
+            on_result {callable} -- function which is called with each iteration and distance of its route as soon as it's finished.
+                                    If this is None, iteration and the best distance so far are printed (default: None)
+
+        Returns:
+        --------
+            best_route {list[int]} -- the best route
+            best_distance {float} -- the best distance
         """
-        for i in range(iteration):
-            self.route = [np.random.randint(0, self.CITY_NUM, 1)[0]]
-            self._generate_route()
+        if seed is None:
+            seed = np.random.randint(0, 2**31)
+
+        # each iteration has its own seed, so that result doesn't depend on n_jobs
+        seeds = np.random.SeedSequence(seed).spawn(iteration)
+        return self._search_multi_start([(i, None, seeds[i]) for i in range(iteration)], n_jobs, on_result)
+
+    def _construct(self, start, seed=None):
+        """ construct route which inserts cities in random order
+
+        Arguments:
+        ----------
+            start {int} -- start city. If this is None, start city is also selected at random
 
-            distance = self._calculate_distance(self.route)
-            if distance < self.best_distance:
-                self.best_distance = distance
+        Keyword Arguments:
+        ------------------
+            seed {np.random.SeedSequence} -- seed of random order (default: None)
 
-            print(i, self.best_distance)
+        Returns:
+        --------
+            route {list[int]} -- route
+            route_distance {float} -- distance of route
+        """
+        order = np.random.default_rng(seed).permutation(self.CITY_NUM)
+        if start is not None:
+            order = np.concatenate(([start], order[order != start]))
+
+        # cities are popped from the end
+        self._order = order[:0:-1].tolist()
+        return super(RandomInsertion, self)._construct(int(order[0]))
 
     def _select_city(self):
         """ select next city
@@ -133,11 +319,7 @@ class RandomInsertion(InsertionBase):
         --------
             city {int} -- id of next city
         """
-        city_list = [i for i in range(self.CITY_NUM)]
-        shuffle(city_list)
-        for city in city_list:
-            if not city in self.route:
-                return city
+        return self._order.pop()
 
 
 class NearestInsertion(InsertionBase):
@@ -145,29 +327,68 @@ class NearestInsertion(InsertionBase):
     Attributes:
     -----------
         CITY_NUM {int} -- the number of cities
-        distasnce {np.ndarray} -- distance between cities
+        distasnce {DistanceBase} -- distance between cities
         writer {DataWriter} -- writer for saving scores
         best_distance {float} -- the best score
-        route {list[int]} -- list of visit history
+        route {Tour} -- visit history
+        is_routed {np.ndarray} -- whether each city is in route
+        unrouted_distance {np.ndarray} -- distance from each unrouted city to the nearest city in route
 
     Examples:
     ---------
         >>> from TSPSolver.Insertion import NearestInsertion
         >>> ni = NearestInsertion("kroA100.tsp")
-        >>> ni.search(100)
+        >>> ni.search()
+        >>> best_route, best_distance = ni.search(n_jobs=-1)     # use all CPUs
+        >>> distance = {}
+        >>> best_route, best_distance = ni.search(n_jobs=-1, on_result=distance.__setitem__)     # distance of route from each start city
     """
 
-    def search(self):
-        """ start searching"""
-        for i in range(self.CITY_NUM):
-            self.route = [i]
-            self._generate_route()
+    # value of routed cities in unrouted_distance, which is never selected
+    _ROUTED_DISTANCE = np.inf
 
-            distance = self._calculate_distance(self.route)
-            if distance < self.best_distance:
-                self.best_distance = distance
+    def search(self, n_jobs=None, on_result=None):
+        """ start searching from each city
 
-            print(i, self.best_distance)
+        Keyword Arguments:
+        ------------------
+            n_jobs {int} -- the number of processes which construct routes from different start cities. -1 means all CPUs (default: None)
+            on_result {callable} -- function which is called with each start city and distance of its route as soon as it's finished.
+                                    If this is None, start city and the best distance so far are printed (default: None)
+
+        Returns:
+        --------
+            best_route {list[int]} -- the best route
+            best_distance {float} -- the best distance
+        """
+        return self._search_multi_start([(i, i, None) for i in range(self.CITY_NUM)], n_jobs, on_result)
+
+    def _init_route(self, start):
+        """ initialize route with start city and distance from route to each city
+
+        Arguments:
+        ----------
+            start {int} -- start city
+        """
+        super(NearestInsertion, self)._init_route(start)
+        self.is_routed = np.zeros(self.CITY_NUM, dtype=bool)
+        self.unrouted_distance = np.full(self.CITY_NUM, self._ROUTED_DISTANCE)
+        self._update_unrouted_distance(start)
+
+    def _append_city(self, next_city):
+        super(NearestInsertion, self)._append_city(next_city)
+        self._update_unrouted_distance(next_city)
+
+    def _update_unrouted_distance(self, city):
+        """ update distance from route to each unrouted city after city is routed
+
+        Arguments:
+        ----------
+            city {int} -- routed city
+        """
+        self.is_routed[city] = True
+        np.minimum(self.unrouted_distance, self.distance.row(city), out=self.unrouted_distance, where=~self.is_routed)
+        self.unrouted_distance[city] = self._ROUTED_DISTANCE
 
     def _select_city(self):
         """ select the next city
@@ -176,17 +397,7 @@ class NearestInsertion(InsertionBase):
         --------
             idx {int} -- id of next city
         """
-        distance_min = np.inf
-        idx = None
-        for city in self.route:
-            distance_dict = {k: v for k, v in zip(range(self.CITY_NUM), self.distance[city, :]) if v > 0}
-            for k, v in sorted(distance_dict.items(), key=lambda x: x[1]):
-                if v < distance_min and not k in self.route:
-                    distance_min = v
-                    idx = k
-                    break
-
-        return idx
+        return int(self.unrouted_distance.argmin())
 
 
 class FarthestInsertion(NearestInsertion):
@@ -194,18 +405,33 @@ class FarthestInsertion(NearestInsertion):
     Attributes:
     -----------
         CITY_NUM {int} -- the number of cities
-        distasnce {np.ndarray} -- distance between cities
+        distasnce {DistanceBase} -- distance between cities
         writer {DataWriter} -- writer for saving scores
         best_distance {float} -- the best score
-        route {list[int]} -- list of visit history
+        route {Tour} -- visit history
+        is_routed {np.ndarray} -- whether each city is in route
+        unrouted_distance {np.ndarray} -- distance from each unrouted city to the farthest city in route
 
     Examples:
     ---------
         >>> from TSPSolver.Insertion import FarthestInsertion
         >>> fi = FarthesttInsertion("kroA100.tsp")
-        >>> fi.search(100)
+        >>> fi.search()
     """
 
+    _ROUTED_DISTANCE = -np.inf
+
+    def _update_unrouted_distance(self, city):
+        """ update distance from route to each unrouted city after city is routed
+
+        Arguments:
+        ----------
+            city {int} -- routed city
+        """
+        self.is_routed[city] = True
+        np.maximum(self.unrouted_distance, self.distance.row(city), out=self.unrouted_distance, where=~self.is_routed)
+        self.unrouted_distance[city] = self._ROUTED_DISTANCE
+
     def _select_city(self):
         """ select the next city
 
@@ -213,17 +439,182 @@ class FarthestInsertion(NearestInsertion):
         --------
             idx {int} -- id of next city
         """
-        distance_min = 0
-        idx = None
-        for city in self.route:
-            distance_dict = {k: v for k, v in zip(range(self.CITY_NUM), self.distance[city]) if v > 0}
-            for k, v in sorted(distance_dict.items(), key=lambda x: -x[1]):
-                if v > distance_min and not k in self.route:
-                    distance_min = v
-                    idx = k
-                    break
+        return int(self.unrouted_distance.argmax())
 
-        return idx
 
 class CheapestInsertion(InsertionBase):
-    pass
\ No newline at end of file
+    """ Insert the city whose insertion cost is the smallest among all pairs of unrouted city and route edge.
+    Each unrouted city has the best candidate edge in heap. When a candidate's edge is split by other insertion,
+    the candidate is re-evaluated lazily when it's popped.
+
+    Attributes:
+    -----------
+        CITY_NUM {int} -- the number of cities
+        distasnce {DistanceBase} -- distance between cities
+        writer {DataWriter} -- writer for saving scores
+        best_distance {float} -- the best score
+        route {Tour} -- visit history
+        is_routed {np.ndarray} -- whether each city is in route
+        next_city {np.ndarray} -- next city of each routed city, so that edge (a, next_city[a]) is in route
+        best_cost {np.ndarray} -- the best insertion cost of each unrouted city which is pushed to heap
+        heap {list[tuple]} -- candidates as (cost, city, edge start, edge end)
+
+    Examples:
+    ---------
+        >>> from TSPSolver.Insertion import CheapestInsertion
+        >>> ci = CheapestInsertion("kroA100.tsp")
+        >>> ci.search()
+    """
+
+    def search(self, n_jobs=None, on_result=None):
+        """ start searching from each city
+
+        Keyword Arguments:
+        ------------------
+            n_jobs {int} -- the number of processes which construct routes from different start cities. -1 means all CPUs (default: None)
+            on_result {callable} -- function which is called with each start city and distance of its route as soon as it's finished.
+                                    If this is None, start city and the best distance so far are printed (default: None)
+
+        Returns:
+        --------
+            best_route {list[int]} -- the best route
+            best_distance {float} -- the best distance
+        """
+        return self._search_multi_start([(i, i, None) for i in range(self.CITY_NUM)], n_jobs, on_result)
+
+    def _init_route(self, start):
+        """ initialize route with start city and candidates of all other cities
+
+        Arguments:
+        ----------
+            start {int} -- start city
+        """
+        super(CheapestInsertion, self)._init_route(start)
+        self.is_routed = np.zeros(self.CITY_NUM, dtype=bool)
+        self.is_routed[start] = True
+        self.next_city = np.full(self.CITY_NUM, -1, dtype=np.int64)
+        self.next_city[start] = start
+        self._routed_city = [start]
+
+        # route which has only one city has no edge, so that insertion cost is round trip
+        self.best_cost = 2.0 * np.asarray(self.distance.row(start), dtype=np.float64)
+        self.best_cost[start] = np.inf
+        self.heap = [(cost, city, start, start) for city, cost in enumerate(self.best_cost.tolist()) if city != start]
+        heapq.heapify(self.heap)
+
+    def _generate_route(self):
+        """ generate route"""
+        while len(self._routed_city) < self.CITY_NUM:
+            cost, city, city1, city2 = heapq.heappop(self.heap)
+            if self.is_routed[city]:
+                continue
+
+            if self.next_city[city1] != city2:
+                # the edge was split after this candidate was pushed
+                self._push_best_candidate(city)
+                continue
+
+            self._insert_city(city, city1, city2, cost)
+
+        self.route = Tour(self._get_route())
+
+    def _insert_city(self, city, city1, city2, cost):
+        """ insert city between city1 and city2, and push candidates of new edges which are better than before
+
+        Arguments:
+        ----------
+            city {int} -- city to insert
+            city1 {int} -- start of edge
+            city2 {int} -- end of edge
+            cost {float} -- insertion cost
+        """
+        self.next_city[city1] = city
+        self.next_city[city] = city2
+        self.is_routed[city] = True
+        self._routed_city.append(city)
+        self.route_distance += cost
+        self.best_cost[city] = np.inf
+
+        unrouted = np.flatnonzero(~self.is_routed)
+        if len(unrouted) == 0:
+            return
+
+        cost1 = self._insertion_cost(city1, city, unrouted)
+        cost2 = self._insertion_cost(city, city2, unrouted)
+        is_second = cost2 < cost1
+        cost = np.where(is_second, cost2, cost1)
+
+        # push only candidates which are better than before, others still have valid or stale candidates in heap
+        is_better = cost < self.best_cost[unrouted]
+        self.best_cost[unrouted[is_better]] = cost[is_better]
+        for next_city, next_cost, second in zip(unrouted[is_better].tolist(), cost[is_better].tolist(), is_second[is_better].tolist()):
+            edge = (city, city2) if second else (city1, city)
+            heapq.heappush(self.heap, (next_cost, next_city, *edge))
+
+    def _push_best_candidate(self, city):
+        """ evaluate all edges of current route for city and push the best one
+
+        Arguments:
+        ----------
+            city {int} -- unrouted city
+        """
+        city1 = np.asarray(self._routed_city)
+        city2 = self.next_city[city1]
+        cost = self._insertion_cost(city1, city2, city)
+        idx = int(cost.argmin())
+
+        self.best_cost[city] = cost[idx]
+        heapq.heappush(self.heap, (float(cost[idx]), city, int(city1[idx]), int(city2[idx])))
+
+    def _get_route(self):
+        """ get route by following next city from start city
+
+        Returns:
+        --------
+            route {list[int]} -- route
+        """
+        route = [self._routed_city[0]]
+        for _ in range(self.CITY_NUM - 1):
+            route.append(int(self.next_city[route[-1]]))
+
+        return route
+
+
+def _init_worker(solver_class, distance):
+    """ initialize worker process
+
+    Arguments:
+    ----------
+        solver_class {type} -- class of solver
+        distance {DistanceBase or tuple} -- distance provider, or spec of share_array which has distance array
+    """
+    if isinstance(distance, tuple):
+        matrix, _worker["shared"] = attach_array(distance)
+        distance = DenseDistance(matrix)
+
+    _worker["solver"] = solver_class._from_distance(distance)
+
+
+def _construct_worker(tasks):
+    """ construct routes in worker process
+
+    Arguments:
+    ----------
+        tasks {list[tuple]} -- id, start city and seed of each construction
+
+    Returns:
+    --------
+        best_route {list[int]} -- the best route of tasks
+        best_distance {float} -- distance of the best route
+        result {list[tuple]} -- id of each task and distance of its route
+    """
+    best_route = None
+    best_distance = np.inf
+    result = []
+    for task_id, start, seed in tasks:
+        route, route_distance = _worker["solver"]._construct(start, seed)
+        if route_distance < best_distance:
+            best_route, best_distance = route, route_distance
+        result.append((task_id, route_distance))
+
+    return best_route, best_distance, result
@@ -1,6 +1,7 @@
 from ._Insertion import RandomInsertion
 from ._Insertion import NearestInsertion
 from ._Insertion import FarthestInsertion
+from ._Insertion import CheapestInsertion
 
 
-__all__ = ("RandomInsertion", "NearestInsertion", "FarthestInsertion")
\ No newline at end of file
+__all__ = ("RandomInsertion", "NearestInsertion", "FarthestInsertion", "CheapestInsertion")
\ No newline at end of file
@@ -0,0 +1,443 @@
+from collections import deque
+import time
+import numpy as np
+
+from ..utils.Distance import load_distance
+from ..utils.CandidateList import make_candidate_list
+from ..utils.Tour import Tour
+
+
+# improvement which is smaller than this is regarded as rounding error
+EPS = 1e-9
+# double-bridge kick swaps two paths within this number of consecutive cities
+_KICK_WINDOW = 100
+
+
+class LocalSearch:
+    """ Local search which improves route with 2-opt, Or-opt and Or-3opt moves.
+    Moves are searched only toward each city's nearest cities, and cities whose neighbourhood didn't change are skipped by don't-look bits.
+    Or-3opt is a variable-length segment insertion, whose three edges are chosen through neighbour lists like Lin-Kernighan.
+
+    Attributes:
+    -----------
+        CITY_NUM {int} -- the number of cities
+        SEGMENT_LENGTH {int} -- the maximum length of segment which is moved by Or-opt
+        distance {DistanceBase} -- distance between cities
+        candidate {np.ndarray} -- each city's nearest cities sorted by distance
+        candidate_distance {np.ndarray} -- distance to each candidate
+        tour {Tour} -- tour which is being improved
+        tour_distance {float} -- distance of tour
+
+    Examples:
+    ---------
+        >>> from TSPSolver.LocalSearch import LocalSearch
+        >>> greedy = Greedy("kroA100.tsp")
+        >>> best_route, _ = greedy.search()
+        >>> local_search = LocalSearch("kroA100.tsp")
+        >>> route, route_distance = local_search.improve(best_route)
+        >>> route, route_distance = local_search.iterated_improve(best_route, time_limit=10.0)
+    """
+
+    __METHOD = ("2opt", "oropt", "or3opt")
+
+    def __init__(self, distance, candidate_num=10, candidate=None, segment_length=3, method=("2opt", "oropt")):
+        """
+        Arguments:
+        ----------
+            distance {str, np.ndarray or DistanceBase} -- dataset file name, distance array or distance provider
+
+        Keyword Arguments:
+        ------------------
+            candidate_num {int} -- the number of nearest cities which are checked for each city (default: 10)
+            candidate {np.ndarray} -- candidate list which is made by make_candidate_list. If this is None, it's made from distance (default: None)
+            segment_length {int} -- the maximum length of segment which is moved by Or-opt (default: 3)
+            method {tuple[str]} -- moves which are used, "2opt", "oropt" and/or "or3opt" (default: ("2opt", "oropt"))
+        """
+        for m in method:
+            if m not in self.__METHOD:
+                raise ValueError(f"Unknown method: {m}")
+
+        city_num, distance = load_distance(distance)
+        self.CITY_NUM = city_num
+        self.SEGMENT_LENGTH = segment_length
+        self.distance = distance
+        self.candidate = make_candidate_list(distance, candidate_num) if candidate is None else np.asarray(candidate)
+        self.candidate_distance = np.asarray(distance.pair(np.arange(city_num)[:, None], self.candidate), dtype=np.float64)
+
+        self._pair = distance.item
+        self._candidate = self.candidate.tolist()
+        self._candidate_distance = self.candidate_distance.tolist()
+        self._move = [{"2opt": self._two_opt, "oropt": self._or_opt, "or3opt": self._or3opt}[m] for m in method]
+
+    def improve(self, route):
+        """ improve route until no move improves it
+
+        Arguments:
+        ----------
+            route {list[int] or np.ndarray} -- route
+
+        Returns:
+        --------
+            route {np.ndarray} -- improved route which starts from the same city
+            route_distance {float} -- distance of improved route
+        """
+        tour = self.improve_tour(Tour(route))
+        route = tour.to_array(route[0])
+        return route, float(self.distance.route_distance(route))
+
+    def improve_tour(self, tour, cities=None):
+        """ improve tour in place until no move improves it
+
+        Arguments:
+        ----------
+            tour {Tour} -- tour which has all cities
+
+        Keyword Arguments:
+        ------------------
+            cities {list[int]} -- cities which are checked first. If this is None, all cities are checked and tour_distance is reset (default: None)
+
+        Returns:
+        --------
+            tour {Tour} -- the same tour
+        """
+        self.tour = tour
+        self._next = tour.next
+        self._prev = tour.prev
+        if cities is None:
+            cities = list(tour)
+            self.tour_distance = float(self.distance.route_distance(tour.route))
+
+        if self.CITY_NUM >= 5:
+            queue = deque(cities)
+            is_queued = np.zeros(self.CITY_NUM, dtype=bool)
+            is_queued[cities] = True
+            while len(queue) > 0:
+                city = queue.popleft()
+                is_queued[city] = False
+
+                for move in self._move:
+                    touched = move(city)
+                    if touched is not None:
+                        # cities around changed edges are checked again
+                        for c in touched:
+                            if not is_queued[c]:
+                                is_queued[c] = True
+                                queue.append(c)
+                        break
+
+        return tour
+
+    def iterated_improve(self, route, time_limit=None, iteration=None, seed=None):
+        """ improve route, then repeat double-bridge kick and local search around it while time remains.
+        Kicked tour is kept only when it becomes shorter than the best tour.
+
+        Arguments:
+        ----------
+            route {list[int] or np.ndarray} -- route
+
+        Keyword Arguments:
+        ------------------
+            time_limit {float} -- time budget in seconds. If both of time_limit and iteration are None, tour isn't kicked (default: None)
+            iteration {int} -- the maximum number of kicks (default: None)
+            seed {int} -- seed of kicks (default: None)
+
+        Returns:
+        --------
+            route {np.ndarray} -- improved route which starts from the same city
+            route_distance {float} -- distance of improved route
+        """
+        start_time = time.perf_counter()
+        rng = np.random.default_rng(seed)
+        tour = self.improve_tour(Tour(route))
+        best_order = tour.order.copy()
+        best_position = tour.position.copy()
+        best_distance = self.tour_distance
+
+        i = 0
+        while self.CITY_NUM >= 8 and (time_limit is not None or iteration is not None):
+            if iteration is not None and i >= iteration:
+                break
+            if time_limit is not None and time.perf_counter() - start_time >= time_limit:
+                break
+
+            self.improve_tour(tour, self._double_bridge(rng))
+            if self.tour_distance < best_distance - EPS:
+                best_order[:] = tour.order
+                best_position[:] = tour.position
+                best_distance = self.tour_distance
+            else:
+                tour.order[:] = best_order
+                tour.position[:] = best_position
+                self.tour_distance = best_distance
+            i += 1
+
+        route = tour.to_array(route[0])
+        return route, float(self.distance.route_distance(route))
+
+    def two_opt(self, route):
+        """ improve route only with 2-opt
+
+        Arguments:
+        ----------
+            route {list[int] or np.ndarray} -- route
+
+        Returns:
+        --------
+            route {np.ndarray} -- improved route
+            route_distance {float} -- distance of improved route
+        """
+        return self._improve_with(route, [self._two_opt])
+
+    def or_opt(self, route):
+        """ improve route only with Or-opt
+
+        Arguments:
+        ----------
+            route {list[int] or np.ndarray} -- route
+
+        Returns:
+        --------
+            route {np.ndarray} -- improved route
+            route_distance {float} -- distance of improved route
+        """
+        return self._improve_with(route, [self._or_opt])
+
+    def _improve_with(self, route, move):
+        """ improve route with specified moves"""
+        default_move = self._move
+        self._move = move
+        try:
+            return self.improve(route)
+        finally:
+            self._move = default_move
+
+    def _two_opt(self, city1):
+        """ find improving 2-opt move which adds edge between city1 and its candidate, and apply it
+
+        Arguments:
+        ----------
+            city1 {int} -- base city
+
+        Returns:
+        --------
+            {tuple[int]} -- cities of changed edges, or None if no move improves route
+        """
+        pair = self._pair
+
+        for is_forward in (True, False):
+            city2 = self._next(city1) if is_forward else self._prev(city1)
+            removed = pair(city1, city2)
+
+            for city3, added in zip(self._candidate[city1], self._candidate_distance[city1]):
+                # gain of first exchange has to be positive
+                if added >= removed:
+                    break
+
+                city4 = self._next(city3) if is_forward else self._prev(city3)
+                if city3 == city2 or city4 == city1:
+                    continue
+
+                delta = added + pair(city2, city4) - removed - pair(city3, city4)
+                if delta < -EPS:
+                    self.tour.two_opt_move(city1, city2, city3, city4)
+                    self.tour_distance += delta
+                    return (city1, city2, city3, city4)
+
+        return None
+
+    def _or_opt(self, city1):
+        """ find improving Or-opt move which moves segment starting from city1 next to candidate of its ends, and apply it
+
+        Arguments:
+        ----------
+            city1 {int} -- first city of segment
+
+        Returns:
+        --------
+            {tuple[int]} -- cities of changed edges, or None if no move improves route
+        """
+        pair = self._pair
+        prev_city = self._prev(city1)
+        city2 = city1
+        in_segment = set()
+
+        for length in range(1, min(self.SEGMENT_LENGTH, self.CITY_NUM - 3) + 1):
+            if length > 1:
+                city2 = self._next(city2)
+            in_segment.add(city2)
+            next_city = self._next(city2)
+            removed = pair(prev_city, city1) + pair(city2, next_city) - pair(prev_city, next_city)
+            if removed <= EPS:
+                continue
+
+            for end, other_end in ((city1, city2), (city2, city1)):
+                for city3, added in zip(self._candidate[end], self._candidate_distance[end]):
+                    if added >= removed:
+                        break
+                    if city3 in in_segment:
+                        continue
+
+                    for is_forward in (True, False):
+                        city4 = self._next(city3) if is_forward else self._prev(city3)
+                        if city4 in in_segment:
+                            continue
+
+                        delta = added + pair(other_end, city4) - pair(city3, city4) - removed
+                        if delta < -EPS:
+                            self.tour.move_segment(end, other_end, city3, city4)
+                            self.tour_distance += delta
+                            return (prev_city, next_city, city1, city2, city3, city4)
+
+        return None
+
+    def _or3opt(self, city1):
+        """ find improving Or-3opt move, and apply it.
+        Segment starts from city2 next to city1 and ends at city5. Edges (city1, city2), (city3, city4), (city5, city6) are replaced with
+        (city2, city3), (city4, city5), (city6, city1), so that segment is inserted between city3 and city4 which is found from neighbour lists.
+
+        Arguments:
+        ----------
+            city1 {int} -- base city
+
+        Returns:
+        --------
+            {tuple[int]} -- cities of changed edges, or None if no move improves route
+        """
+        pair = self._pair
+        tour = self.tour
+
+        for is_forward in (True, False):
+            city2 = self._next(city1) if is_forward else self._prev(city1)
+            removed = pair(city1, city2)
+
+            for city3, added1 in zip(self._candidate[city2], self._candidate_distance[city2]):
+                gain1 = removed - added1
+                if gain1 <= EPS:
+                    break
+                if city3 == city1:
+                    continue
+
+                for city4 in (self._next(city3), self._prev(city3)):
+                    if city4 == city2:
+                        continue
+                    gain2 = gain1 + pair(city3, city4)
+
+                    for city5, added2 in zip(self._candidate[city4], self._candidate_distance[city4]):
+                        gain3 = gain2 - added2
+                        if gain3 <= EPS:
+                            break
+
+                        city6 = self._next(city5) if is_forward else self._prev(city5)
+                        if city5 == city1 or city6 == city1:
+                            continue
+
+                        # segment is the path from city2 to city5 going away from city1
+                        first, last = (city2, city5) if is_forward else (city5, city2)
+                        if tour.between(first, city1, last) or tour.between(first, city3, last) or tour.between(first, city4, last):
+                            continue
+                        if 2 * ((tour.position[last] - tour.position[first]) % self.CITY_NUM + 1) > self.CITY_NUM:
+                            continue
+
+                        gain = gain3 + pair(city5, city6) - pair(city6, city1)
+                        if gain > EPS:
+                            tour.move_segment(city2, city5, city3, city4)
+                            self.tour_distance -= gain
+                            return (city1, city2, city3, city4, city5, city6)
+
+        return None
+
+    def _double_bridge(self, rng):
+        """ kick tour by double-bridge move within a window of consecutive cities
+
+        Arguments:
+        ----------
+            rng {np.random.Generator} -- random generator
+
+        Returns:
+        --------
+            {list[int]} -- cities of changed edges
+        """
+        tour = self.tour
+        size = self.CITY_NUM
+        window = min(size, _KICK_WINDOW)
+        start = int(rng.integers(0, size - window + 1))
+        pos1, pos2, pos3 = (start + np.sort(rng.choice(np.arange(1, window), 3, replace=False))).tolist()
+
+        cities = [tour.order[pos1 - 1], tour.order[pos1], tour.order[pos2 - 1], tour.order[pos2], tour.order[pos3 - 1], tour.order[pos3 % size]]
+        a1, b1, a2, b2, a3, b3 = [int(c) for c in cities]
+        removed = self._pair(a1, b1) + self._pair(a2, b2) + self._pair(a3, b3)
+        tour.double_bridge(pos1, pos2, pos3)
+        self.tour_distance += self._pair(a1, b2) + self._pair(a3, b1) + self._pair(a2, b3) - removed
+
+        return [a1, b1, a2, b2, a3, b3]
+
+
+def two_opt(route, distance, candidate_num=10):
+    """ improve route with 2-opt
+
+    Arguments:
+    ----------
+        route {list[int] or np.ndarray} -- route
+        distance {str, np.ndarray or DistanceBase} -- dataset file name, distance array or distance provider
+
+    Keyword Arguments:
+    ------------------
+        candidate_num {int} -- the number of nearest cities which are checked for each city (default: 10)
+
+    Returns:
+    --------
+        route {np.ndarray} -- improved route
+        route_distance {float} -- distance of improved route
+    """
+    return LocalSearch(distance, candidate_num, method=("2opt", )).improve(route)
+
+
+def or_opt(route, distance, candidate_num=10, segment_length=3):
+    """ improve route with Or-opt
+
+    Arguments:
+    ----------
+        route {list[int] or np.ndarray} -- route
+        distance {str, np.ndarray or DistanceBase} -- dataset file name, distance array or distance provider
+
+    Keyword Arguments:
+    ------------------
+        candidate_num {int} -- the number of nearest cities which are checked for each city (default: 10)
+        segment_length {int} -- the maximum length of segment which is moved (default: 3)
+
+    Returns:
+    --------
+        route {np.ndarray} -- improved route
+        route_distance {float} -- distance of improved route
+    """
+    return LocalSearch(distance, candidate_num, segment_length=segment_length, method=("oropt", )).improve(route)
+
+
+def improve(route, distance, time_limit=None, iteration=None, candidate_num=10, seed=None):
+    """ improve route with 2-opt, Or-opt and Or-3opt, and kick it by double-bridge while time remains
+
+    Arguments:
+    ----------
+        route {list[int] or np.ndarray} -- route, such as best route of Greedy, Insertion or AntColonyOptimization
+        distance {str, np.ndarray or DistanceBase} -- dataset file name, distance array or distance provider
+
+    Keyword Arguments:
+    ------------------
+        time_limit {float} -- time budget in seconds. If both of time_limit and iteration are None, route is improved only until local optimum (default: None)
+        iteration {int} -- the maximum number of kicks (default: None)
+        candidate_num {int} -- the number of nearest cities which are checked for each city (default: 10)
+        seed {int} -- seed of kicks (default: None)
+
+    Returns:
+    --------
+        route {np.ndarray} -- improved route
+        route_distance {float} -- distance of improved route
+
+    Examples:
+    ---------
+        >>> greedy = Greedy("kroA100.tsp")
+        >>> best_route, _ = greedy.search()
+        >>> route, route_distance = improve(best_route, greedy.distance_arr, time_limit=10.0)
+    """
+    local_search = LocalSearch(distance, candidate_num, method=("2opt", "oropt", "or3opt"))
+    return local_search.iterated_improve(route, time_limit, iteration, seed)
@@ -0,0 +1,7 @@
+from ._LocalSearch import LocalSearch
+from ._LocalSearch import two_opt
+from ._LocalSearch import or_opt
+from ._LocalSearch import improve
+
+
+__all__ = ("LocalSearch", "two_opt", "or_opt", "improve")
@@ -1,43 +1,113 @@
-from ..utils.DataLoader import load_dataset
+from ..utils.Distance import load_distance
 from ..utils.DataWriter import DataWriter
-from itertools import permutations
+from ..LocalSearch import LocalSearch
+from .src.HeldKarp import held_karp
+from .src.BranchAndBound import BranchAndBound
+from .src.Enumeration import enumerate_route
 import numpy as np
 from math import factorial
 from pprint import pprint
 
 
 class RoundRobin:
-    """ Round-Robin method for TSP
+    """ Round-Robin method for TSP, which finds the shortest route exactly
+
+    Attributes:
+    -----------
+        CITY_NUM {int} -- the number of cities
+        HELD_KARP_CITY_NUM {int} -- the maximum number of cities which "auto" method solves by Held-Karp
+        distance_arr {DistanceBase} -- distance between cities
+        writer {DataWriter} -- writer for saving scores
+        best_route {list[int]} -- the best route
+        best_distance {float} -- the best distance
+        lower_bound {float} -- lower bound of the shortest distance
+        upper_bound {float} -- upper bound of the shortest distance, which is the same as best_distance
 
     Notes:
     ------
-        You should not use this method beacause this'll take astronomical time.
+        "permutation" method enumerates routes with pruning, so that you should not use it for more than about 14 cities beacause this'll take astronomical time.
+        Held-Karp needs O(2^n * n) memory, and branch-and-bound is for a few tens of cities.
 
     Examples:
     ---------
         >>> rr = RoundRobin(dataset_filename="kroA100.tsp")     # You can download the benchmark problem
         >>> rr.search()
-
+        >>> rr = RoundRobin(dataset_filename="r30.tsp")
+        >>> best_route, best_distance = rr.search(method="branch_and_bound", time_limit=60.0)
+        >>> rr.lower_bound, rr.upper_bound
     """
 
-    def __init__(self, dataset_filename):
+    HELD_KARP_CITY_NUM = 20
+    __METHOD = ("auto", "held_karp", "branch_and_bound", "permutation")
+
+    def __init__(self, dataset_filename, dtype=np.float64, mmap_mode=None, distance_mode="dense"):
         """
         Arguments:
         ----------
             dataset_filename {str} -- dataset file name
+
+        Keyword Arguments:
+        ------------------
+            dtype {np.dtype} -- data type of distance (default: np.float64)
+            mmap_mode {str} -- if this is set, distance is memory-mapped from dataset cache with this mode (default: None)
+            distance_mode {str} -- "dense" holds distance array, "coordinate" calculates distance from coordinates when it's needed (default: "dense")
         """
-        city_num, distance = load_dataset(dataset_filename)
+        city_num, distance = load_distance(dataset_filename, distance_mode, dtype, mmap_mode)
         self.CITY_NUM = city_num
         self.distance_arr = distance
         self.writer = DataWriter()
+        self.best_route = None
         self.best_distance = np.inf
+        self.lower_bound = -np.inf
+        self.upper_bound = np.inf
+
+    def search(self, method="auto", time_limit=None, n_jobs=None):
+        """ search path
+
+        Keyword Arguments:
+        ------------------
+            method {str} -- "held_karp", "branch_and_bound", "permutation", or "auto" which uses Held-Karp for at most HELD_KARP_CITY_NUM cities and branch-and-bound for others (default: "auto")
+            time_limit {float} -- time budget of branch-and-bound in seconds. If it runs out, lower_bound is smaller than upper_bound (default: None)
+            n_jobs {int} -- the number of processes of "permutation" method. -1 means all CPUs (default: None)
+
+        Returns:
+        --------
+            best_route {list[int]} -- the best route
+            best_distance {float} -- the best distance
+        """
+        if method not in self.__METHOD:
+            raise ValueError(f"Unknown method: {method}")
+        if method == "auto":
+            method = "held_karp" if self.CITY_NUM <= self.HELD_KARP_CITY_NUM else "branch_and_bound"
+
+        if method == "held_karp":
+            self.best_route, self.best_distance = held_karp(self.distance_arr)
+            self.lower_bound = self.best_distance
+        elif method == "branch_and_bound":
+            branch_and_bound = BranchAndBound(self.distance_arr)
+            self.best_route, self.best_distance = branch_and_bound.search(self._initial_route(), time_limit)
+            self.lower_bound = branch_and_bound.lower_bound
+        else:
+            self.best_route, self.best_distance = enumerate_route(self.distance_arr, self._initial_route(), n_jobs)
+            self.lower_bound = self.best_distance
+
+        self.upper_bound = self.best_distance
+        return self.best_route, self.best_distance
 
-    def search(self):
-        """ search path"""
-        for route in list(permutations([i for i in range(self.CITY_NUM)])):
-            distance = self._calculate_distance(route)
-            if distance < self.best_distance:
-                self.best_distance = distance
+    def _initial_route(self):
+        """ make good route for upper bound of branch-and-bound
+
+        Returns:
+        --------
+            route {np.ndarray} -- route
+        """
+        route = np.arange(self.CITY_NUM)
+        if self.CITY_NUM < 8:
+            return route
+
+        local_search = LocalSearch(self.distance_arr, method=("2opt", "oropt", "or3opt"))
+        route, _ = local_search.iterated_improve(route, iteration=20 * self.CITY_NUM, seed=0)
+        return route
 
     def _calculate_distance(self, route):
         """ calculate distance
@@ -46,10 +116,4 @@ class RoundRobin:
         --------
             distance {float} -- distance
         """
-        distance = 0
-        for i in range(self.CITY_NUM):
-            city1 = route[i]
-            city2 = route[(i+1) % self.CITY_NUM]
-            distance += self.distance_arr[city1, city2]
-
-        return distance
\ No newline at end of file
+        return self.distance_arr.route_distance(route)
@@ -0,0 +1,277 @@
+import time
+import numpy as np
+
+
+# improvement which is smaller than this is regarded as rounding error
+EPS = 1e-9
+
+
+class BranchAndBound:
+    """ Depth-first branch-and-bound for TSP with 1-tree lower bound.
+    Route starts from city 0. Each partial route is pruned when its distance plus the lower bound of the rest exceeds the best route.
+    The rest has to be a path from the last city through unvisited cities to city 0, so that its lower bound is
+    minimum spanning tree of unvisited cities and the shortest edges which connect it to both ends.
+    Distance is penalized with node potentials which are optimized by subgradient method on 1-trees (Held-Karp bound),
+    which doesn't change the order of routes but makes the bound much tighter.
+
+    Attributes:
+    -----------
+        CITY_NUM {int} -- the number of cities
+        SUBGRADIENT_ITERATION {int} -- the number of iterations of subgradient method
+        distance {np.ndarray} -- distance between cities, whose diagonal is inf
+        potential {np.ndarray} -- node potentials of penalized distance
+        lower_bound {float} -- lower bound of the shortest route
+        upper_bound {float} -- distance of the best route
+        best_route {list[int]} -- the best route
+        node_num {int} -- the number of searched nodes
+        is_optimal {bool} -- whether the best route is proved to be optimal
+
+    Examples:
+    ---------
+        >>> bb = BranchAndBound(distance)
+        >>> route, route_distance = bb.search(route=greedy_route)
+        >>> bb.lower_bound, bb.upper_bound
+        (21011.45..., 21011.45...)
+    """
+
+    def __init__(self, distance, subgradient_iteration=200):
+        """
+        Arguments:
+        ----------
+            distance {np.ndarray or DistanceBase} -- distance between cities
+
+        Keyword Arguments:
+        ------------------
+            subgradient_iteration {int} -- the number of iterations of subgradient method (default: 200)
+        """
+        self.distance = np.array(distance, dtype=np.float64)
+        np.fill_diagonal(self.distance, np.inf)
+        self.CITY_NUM = len(self.distance)
+        self.SUBGRADIENT_ITERATION = subgradient_iteration
+        self.potential = np.zeros(self.CITY_NUM)
+        self.lower_bound = -np.inf
+        self.upper_bound = np.inf
+        self.best_route = None
+        self.node_num = 0
+        self.is_optimal = False
+
+    def search(self, route=None, time_limit=None):
+        """ search the shortest route
+
+        Keyword Arguments:
+        ------------------
+            route {list[int]} -- initial route which gives upper bound. If this is None, nearest neighbour route is used (default: None)
+            time_limit {float} -- time budget in seconds. If it runs out, the best route so far is returned and is_optimal is False (default: None)
+
+        Returns:
+        --------
+            best_route {list[int]} -- the best route
+            best_distance {float} -- distance of the best route
+        """
+        if route is None:
+            route = self._nearest_neighbour()
+        route = [int(c) for c in np.roll(route, -int(np.flatnonzero(np.asarray(route) == 0)[0]))]
+        self.best_route = route
+        self.upper_bound = self._route_distance(route)
+        if self.CITY_NUM <= 3:
+            self.lower_bound = self.upper_bound
+            self.is_optimal = True
+            return self.best_route, self.upper_bound
+
+        self._deadline = None if time_limit is None else time.perf_counter() + time_limit
+        self._is_timeout = False
+        self.lower_bound = self._optimize_potential()
+        self._penalized = self.distance + self.potential[:, None] + self.potential[None, :]
+        self.node_num = 0
+
+        visited = np.zeros(self.CITY_NUM, dtype=bool)
+        visited[0] = True
+        self._branch([0], visited, 0.0)
+
+        self.is_optimal = not self._is_timeout
+        if self.is_optimal:
+            self.lower_bound = self.upper_bound
+
+        return self.best_route, self.upper_bound
+
+    def _branch(self, route, visited, route_distance):
+        """ search routes which start with route
+
+        Arguments:
+        ----------
+            route {list[int]} -- partial route
+            visited {np.ndarray} -- whether each city is in route
+            route_distance {float} -- distance of partial route
+        """
+        self.node_num += 1
+        if self._check_timeout():
+            return
+
+        last = route[-1]
+        if len(route) == self.CITY_NUM:
+            total = route_distance + self.distance[last, 0]
+            if total < self.upper_bound - EPS:
+                self.upper_bound = total
+                self.best_route = list(route)
+            return
+
+        unvisited = np.flatnonzero(~visited)
+        row = self.distance[last, unvisited]
+        for idx in np.argsort(row, kind="stable").tolist():
+            city = int(unvisited[idx])
+            next_distance = route_distance + row[idx]
+            # each bound is minimum spanning tree of the rest, so that the deadline is checked before each of them
+            if self._check_timeout():
+                return
+            if next_distance + self._rest_bound(city, unvisited[unvisited != city]) >= self.upper_bound - EPS:
+                continue
+
+            route.append(city)
+            visited[city] = True
+            self._branch(route, visited, next_distance)
+            visited[city] = False
+            route.pop()
+
+    def _check_timeout(self):
+        """ check whether time budget runs out
+
+        Returns:
+        --------
+            {bool} -- True when it runs out
+        """
+        if not self._is_timeout and self._deadline is not None and time.perf_counter() > self._deadline:
+            self._is_timeout = True
+        return self._is_timeout
+
+    def _rest_bound(self, last, unvisited):
+        """ lower bound of path from last city through unvisited cities to city 0
+
+        Arguments:
+        ----------
+            last {int} -- last city of partial route
+            unvisited {np.ndarray} -- unvisited cities
+
+        Returns:
+        --------
+            {float} -- lower bound
+        """
+        if len(unvisited) == 0:
+            return self.distance[last, 0]
+
+        penalized = self._penalized
+        weight, _ = _minimum_spanning_tree(penalized[np.ix_(unvisited, unvisited)])
+        weight += penalized[last, unvisited].min() + penalized[unvisited, 0].min()
+        return weight - 2 * self.potential[unvisited].sum() - self.potential[last] - self.potential[0]
+
+    def _optimize_potential(self):
+        """ maximize 1-tree lower bound by subgradient method, and keep the best potentials
+
+        Returns:
+        --------
+            {float} -- the best 1-tree lower bound
+        """
+        potential = np.zeros(self.CITY_NUM)
+        best_bound = -np.inf
+        step_coef = 2.0
+
+        for _ in range(self.SUBGRADIENT_ITERATION):
+            # potentials so far still give a valid lower bound
+            if self._check_timeout():
+                break
+            penalized = self.distance + potential[:, None] + potential[None, :]
+            weight, degree = _one_tree(penalized)
+            bound = weight - 2 * potential.sum()
+            if bound > best_bound:
+                best_bound = bound
+                self.potential = potential.copy()
+
+            subgradient = degree - 2
+            norm = (subgradient * subgradient).sum()
+            # 1-tree is a tour
+            if norm == 0:
+                break
+
+            potential = potential + step_coef * (self.upper_bound - bound) / norm * subgradient
+            step_coef *= 0.97
+
+        return best_bound
+
+    def _nearest_neighbour(self):
+        """ make route by nearest neighbour from city 0
+
+        Returns:
+        --------
+            route {list[int]} -- route
+        """
+        route = [0]
+        visited = np.zeros(self.CITY_NUM, dtype=bool)
+        visited[0] = True
+        for _ in range(self.CITY_NUM - 1):
+            row = np.where(visited, np.inf, self.distance[route[-1]])
+            route.append(int(row.argmin()))
+            visited[route[-1]] = True
+        return route
+
+    def _route_distance(self, route):
+        return float(self.distance[route, np.roll(route, -1)].sum()) if len(route) > 1 else 0.0
+
+
+def _minimum_spanning_tree(distance):
+    """ calculate minimum spanning tree by Prim's algorithm
+
+    Arguments:
+    ----------
+        distance {np.ndarray} -- distance between nodes
+
+    Returns:
+    --------
+        weight {float} -- weight of tree
+        degree {np.ndarray} -- degree of each node
+    """
+    node_num = len(distance)
+    degree = np.zeros(node_num, dtype=np.int64)
+    if node_num <= 1:
+        return 0.0, degree
+
+    in_tree = np.zeros(node_num, dtype=bool)
+    in_tree[0] = True
+    key = distance[0].copy()
+    parent = np.zeros(node_num, dtype=np.int64)
+    key[0] = np.inf
+    weight = 0.0
+
+    for _ in range(node_num - 1):
+        node = int(key.argmin())
+        weight += key[node]
+        degree[node] += 1
+        degree[parent[node]] += 1
+        in_tree[node] = True
+        key[node] = np.inf
+
+        is_closer = ~in_tree & (distance[node] < key)
+        key[is_closer] = distance[node, is_closer]
+        parent[is_closer] = node
+
+    return weight, degree
+
+
+def _one_tree(distance):
+    """ calculate 1-tree, which is minimum spanning tree of cities except city 0 and two shortest edges of city 0
+
+    Arguments:
+    ----------
+        distance {np.ndarray} -- distance between cities, whose diagonal is inf
+
+    Returns:
+    --------
+        weight {float} -- weight of 1-tree
+        degree {np.ndarray} -- degree of each city
+    """
+    weight, tree_degree = _minimum_spanning_tree(distance[1:, 1:])
+    nearest = np.argpartition(distance[0, 1:], 1)[:2]
+
+    degree = np.zeros(len(distance), dtype=np.int64)
+    degree[1:] = tree_degree
+    degree[nearest + 1] += 1
+    degree[0] = 2
+    return weight + distance[0, nearest + 1].sum(), degree
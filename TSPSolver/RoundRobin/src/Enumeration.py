@@ -0,0 +1,217 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import permutations
+import multiprocessing
+import numpy as np
+
+from ...utils.Parallel import get_worker_num
+
+
+# state of worker process which is set by _init_worker
+_worker = {}
+# the number of nodes between reading the best distance which is shared by other processes
+_SYNC_INTERVAL = 4096
+
+
+def enumerate_route(distance, route=None, n_jobs=None):
+    """ find the shortest route by enumerating all routes depth-first.
+    Route starts from city 0, and its mirror image is skipped by making the second city smaller than the last city.
+    Prefixes whose distance plus the shortest edge of each remaining city exceeds the best route are abandoned.
+    Prefixes of the second, the last and the third city are distributed to worker processes, which share the best distance.
+
+    Arguments:
+    ----------
+        distance {np.ndarray or DistanceBase} -- distance between cities
+
+    Keyword Arguments:
+    ------------------
+        route {list[int]} -- initial route which gives the best distance at first (default: None)
+        n_jobs {int} -- the number of processes. -1 means all CPUs (default: None)
+
+    Returns:
+    --------
+        best_route {list[int]} -- the shortest route
+        best_distance {float} -- distance of the shortest route
+
+    Examples:
+    ---------
+        >>> city_num, distance = load_distance("r13.tsp")
+        >>> best_route, best_distance = enumerate_route(distance, n_jobs=-1)
+    """
+    distance = np.array(distance, dtype=np.float64)
+    city_num = len(distance)
+    best_route = None
+    best_distance = np.inf
+    if route is not None:
+        best_route = [int(c) for c in route]
+        best_distance = float(distance[best_route, np.roll(best_route, -1)].sum()) if city_num > 1 else 0.0
+
+    if city_num < 5:
+        for rest in permutations(range(1, city_num)):
+            candidate = [0, *rest]
+            candidate_distance = float(distance[candidate, np.roll(candidate, -1)].sum()) if city_num > 1 else 0.0
+            if candidate_distance < best_distance:
+                best_route, best_distance = candidate, candidate_distance
+        return best_route, best_distance
+
+    prefixes = _make_prefix(distance)
+    worker_num = get_worker_num(n_jobs)
+    if worker_num == 1:
+        _init_worker(distance, None)
+        _worker["best_distance"] = best_distance
+        for prefix in prefixes:
+            prefix_distance, prefix_route = _search_prefix(prefix)
+            if prefix_distance < best_distance:
+                best_route, best_distance = prefix_route, prefix_distance
+        return best_route, best_distance
+
+    shared_best = multiprocessing.Value("d", best_distance)
+    with ProcessPoolExecutor(worker_num, initializer=_init_worker, initargs=(distance, shared_best)) as executor:
+        futures = [executor.submit(_search_prefix, prefix) for prefix in prefixes]
+        for future in as_completed(futures):
+            prefix_distance, prefix_route = future.result()
+            if prefix_distance < best_distance:
+                best_route, best_distance = prefix_route, prefix_distance
+
+    return best_route, best_distance
+
+
+def _make_prefix(distance):
+    """ make prefixes of (second city, last city, third city), sorted by their distance so that good routes are found early
+
+    Arguments:
+    ----------
+        distance {np.ndarray} -- distance between cities
+
+    Returns:
+    --------
+        {list[tuple[int]]} -- prefixes
+    """
+    city_num = len(distance)
+    prefixes = []
+    for second in range(1, city_num):
+        for last in range(second + 1, city_num):
+            for third in range(1, city_num):
+                if third != second and third != last:
+                    cost = distance[last, 0] + distance[0, second] + distance[second, third]
+                    prefixes.append((cost, second, last, third))
+
+    return [prefix[1:] for prefix in sorted(prefixes)]
+
+
+def _init_worker(distance, shared_best):
+    """ initialize worker process
+
+    Arguments:
+    ----------
+        distance {np.ndarray} -- distance between cities
+        shared_best {multiprocessing.Value} -- the best distance which is shared by processes, None for single process
+    """
+    city_num = len(distance)
+    masked = distance + np.diag(np.full(city_num, np.inf))
+    _worker["distance"] = distance.tolist()
+    _worker["min_edge"] = masked.min(axis=1).tolist()
+    _worker["shared_best"] = shared_best
+    _worker["best_distance"] = np.inf if shared_best is None else shared_best.value
+
+
+def _search_prefix(prefix):
+    """ search all routes which start with 0, second and third city, and end with last city
+
+    Arguments:
+    ----------
+        prefix {tuple[int]} -- second, last and third city
+
+    Returns:
+    --------
+        best_distance {float} -- distance of the best route in this prefix, inf if no route is better than shared best distance
+        best_route {list[int]} -- the best route in this prefix
+    """
+    second, last, third = prefix
+    distance = _worker["distance"]
+    min_edge = _worker["min_edge"]
+    city_num = len(distance)
+
+    rest = [c for c in range(1, city_num) if c != second and c != third and c != last]
+    # distance to close the route from last city, and lower bound of edges from third city and rest cities
+    closing = distance[last][0]
+    cost = closing + distance[0][second] + distance[second][third]
+    rest_bound = min_edge[third] + sum(min_edge[c] for c in rest)
+
+    state = {"best_distance": np.inf, "best_route": None, "node": 0}
+    path = [0, second, third]
+    _dfs(distance, min_edge, path, rest, last, cost, rest_bound, state)
+
+    if state["best_route"] is None:
+        return np.inf, None
+    return state["best_distance"], state["best_route"] + [last]
+
+
+def _dfs(distance, min_edge, path, rest, last, cost, rest_bound, state):
+    """ extend path depth-first with running distance
+
+    Arguments:
+    ----------
+        distance {list[list[float]]} -- distance between cities
+        min_edge {list[float]} -- the shortest edge of each city
+        path {list[int]} -- path from city 0
+        rest {list[int]} -- cities which are not in path except last city
+        last {int} -- last city of route
+        cost {float} -- distance of path and the edge from last city to city 0
+        rest_bound {float} -- sum of the shortest edges of the end of path and rest cities
+        state {dict} -- the best distance and route in this prefix, and the number of nodes
+    """
+    state["node"] += 1
+    if state["node"] % _SYNC_INTERVAL == 0:
+        _sync_best()
+
+    current = path[-1]
+    row = distance[current]
+    if len(rest) == 0:
+        total = cost + row[last]
+        if total < _worker["best_distance"]:
+            _update_best(total)
+            state["best_distance"] = total
+            state["best_route"] = list(path)
+        return
+
+    bound = cost + rest_bound
+    rest_bound -= min_edge[current]
+    for i in range(len(rest)):
+        city = rest[i]
+        next_cost = cost + row[city]
+        if next_cost + rest_bound >= _worker["best_distance"]:
+            continue
+
+        # remove city from rest by swapping with the last element, and restore it after search
+        rest[i] = rest[-1]
+        rest.pop()
+        path.append(city)
+        _dfs(distance, min_edge, path, rest, last, next_cost, rest_bound, state)
+        path.pop()
+        rest.append(city)
+        rest[i], rest[-1] = rest[-1], rest[i]
+
+        if bound >= _worker["best_distance"]:
+            break
+
+
+def _sync_best():
+    """ read the best distance which is found by other processes"""
+    shared_best = _worker["shared_best"]
+    if shared_best is not None:
+        _worker["best_distance"] = min(_worker["best_distance"], shared_best.value)
+
+
+def _update_best(best_distance):
+    """ update the best distance of this process and share it
+
+    Arguments:
+    ----------
+        best_distance {float} -- new best distance
+    """
+    _worker["best_distance"] = best_distance
+    shared_best = _worker["shared_best"]
+    if shared_best is not None:
+        with shared_best.get_lock():
+            if best_distance < shared_best.value:
+                shared_best.value = best_distance
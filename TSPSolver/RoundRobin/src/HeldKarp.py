@@ -0,0 +1,82 @@
+import numpy as np
+
+
+def held_karp(distance):
+    """ solve TSP exactly by Held-Karp dynamic programming.
+    Route starts from city 0, and cost[mask, j] is the shortest path which visits cities in mask and ends at j.
+    Masks are processed by the number of cities, so that each layer is calculated with numpy at once.
+    Memory is O(2^n * n), so that this is for about 20 cities at most.
+
+    Arguments:
+    ----------
+        distance {np.ndarray or DistanceBase} -- distance between cities
+
+    Returns:
+    --------
+        route {list[int]} -- the shortest route
+        route_distance {float} -- distance of route
+
+    Examples:
+    ---------
+        >>> city_num, distance = load_distance("r12.tsp")
+        >>> route, route_distance = held_karp(distance)
+    """
+    distance = np.array(distance, dtype=np.float64)
+    city_num = len(distance)
+    if city_num <= 3:
+        route = list(range(city_num))
+        return route, _route_distance(distance, route)
+
+    # city 0 is start, so that masks hold cities 1, ..., city_num-1 as bits 0, ..., city_num-2
+    bit_num = city_num - 1
+    mask_num = 1 << bit_num
+    bit = np.arange(bit_num)
+    cost = np.full((mask_num, bit_num), np.inf)
+    parent = np.full((mask_num, bit_num), -1, dtype=np.int8)
+    cost[1 << bit, bit] = distance[0, 1:]
+
+    mask = np.arange(mask_num)
+    popcount = np.zeros(mask_num, dtype=np.int8)
+    for b in range(bit_num):
+        popcount += (mask >> b) & 1
+
+    inner_distance = distance[1:, 1:]
+    for size in range(2, bit_num + 1):
+        layer = np.flatnonzero(popcount == size)
+        for k in range(bit_num):
+            target = layer[(layer >> k) & 1 == 1]
+            # cost of cities which are not in source mask is inf, so that they're never selected
+            source_cost = cost[target ^ (1 << k)] + inner_distance[:, k]
+            best = source_cost.argmin(axis=1)
+            cost[target, k] = source_cost[np.arange(len(target)), best]
+            parent[target, k] = best
+
+    full = mask_num - 1
+    last = int((cost[full] + distance[1:, 0]).argmin())
+
+    route = []
+    mask = full
+    while last >= 0:
+        route.append(last + 1)
+        mask, last = mask ^ (1 << last), int(parent[mask, last])
+    route = [0] + route[::-1]
+
+    return route, _route_distance(distance, route)
+
+
+def _route_distance(distance, route):
+    """ calculate distance of closed route
+
+    Arguments:
+    ----------
+        distance {np.ndarray} -- distance between cities
+        route {list[int]} -- route
+
+    Returns:
+    --------
+        {float} -- distance
+    """
+    if len(route) <= 1:
+        return 0.0
+
+    return float(distance[route, np.roll(route, -1)].sum())
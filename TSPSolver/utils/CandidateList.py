@@ -0,0 +1,43 @@
+import numpy as np
+
+
+def make_candidate_list(distance, candidate_num, chunk_size=1024):
+    """ make list of nearest cities for each city
+
+    Arguments:
+    ----------
+        distance {np.ndarray} -- distance array which is returned by load_dataset
+        candidate_num {int} -- the number of candidates of each city
+
+    Keyword Arguments:
+    ------------------
+        chunk_size {int} -- the number of rows which are processed at once (default: 1024)
+
+    Returns:
+    --------
+        candidate {np.ndarray} -- candidates sorted by distance, shape is (city_num, candidate_num)
+
+    Examples:
+    ---------
+        >>> city_num, distance = load_dataset("kroA100.tsp")
+        >>> candidate = make_candidate_list(distance, 10)
+        >>> candidate.shape
+        (100, 10)
+    """
+    if candidate_num < 1:
+        raise ValueError(f"candidate_num must be at least 1: {candidate_num}")
+
+    city_num = distance.shape[0]
+    candidate_num = min(candidate_num, city_num - 1)
+    candidate = np.empty((city_num, candidate_num), dtype=np.int32)
+
+    for start in range(0, city_num, chunk_size):
+        rows = np.arange(start, min(start + chunk_size, city_num))
+        row_distance = np.array(distance[rows], dtype=np.float64)
+        row_distance[np.arange(len(rows)), rows] = np.inf
+
+        nearest = np.argpartition(row_distance, candidate_num - 1, axis=1)[:, :candidate_num]
+        order = np.argsort(np.take_along_axis(row_distance, nearest, axis=1), axis=1)
+        candidate[rows] = np.take_along_axis(nearest, order, axis=1)
+
+    return candidate
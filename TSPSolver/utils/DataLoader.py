@@ -1,20 +1,42 @@
+import hashlib
+import json
+import math
+import os
+import warnings
 import numpy as np
-import re
-from pprint import pprint
 
 
-def load_dataset(dataset_filename):
+# size of temporary arrays which are used while one chunk of distance rows is calculated
+_CHUNK_BYTES = 64 * 1024 * 1024
+_CACHE_DIRNAME = ".tsp_cache"
+_EARTH_RADIUS = 6378.388
+
+
+def load_dataset(dataset_filename, use_cache=True, cache_dir=None, dtype=np.float64, mmap_mode=None):
     """ load dataset
 
     Arguments:
     ----------
         dataset_filename {str} -- dataset file name
 
+    Keyword Arguments:
+    ------------------
+        use_cache {bool} -- whether read and write parsed data as .npy cache (default: True)
+        cache_dir {str} -- directory for cache. If this is None, .tsp_cache next to dataset is used (default: None)
+        dtype {np.dtype} -- data type of distance, np.float32 halves memory (default: np.float64)
+        mmap_mode {str} -- if this is set, distance is memory-mapped from cache with this mode, such as "r" (default: None)
+
     Returns:
     --------
         city_num {int} -- the number of city
         distance {np.ndarray} -- distance array
 
+    Notes:
+    ------
+        With mmap_mode, the matrix is written to cache chunk by chunk and never held in memory as a whole.
+        Processes which load the same dataset with mmap_mode="r" share one on-disk matrix through page cache,
+        so a worker pool does not rebuild or copy it.
+
     Examples:
     ---------
         >>> city_num, distasnce = load_dataset("kroA100.tsp")
@@ -24,30 +46,360 @@ def load_dataset(dataset_filename):
         <class 'numpy.ndarray'>
         >>> distance.shape
         (100, 100)
+        >>> city_num, distance = load_dataset("pla33810.tsp", dtype=np.float32, mmap_mode="r")
+        >>> type(distance)
+        <class 'numpy.memmap'>
     """
-    city_cnt = 0
+    dtype = np.dtype(dtype)
+    if mmap_mode is not None and not use_cache:
+        raise ValueError("mmap_mode needs use_cache=True because the matrix is mapped from cache")
+
+    if use_cache:
+        cache_filename = _get_cache_filename(dataset_filename, cache_dir, dtype)
+        if os.path.exists(cache_filename["distance"]):
+            distance = np.load(cache_filename["distance"], mmap_mode=mmap_mode)
+            return distance.shape[0], distance
+
+    # cache names come from hash of the whole dataset, so that they're calculated only once
+    header, coord = _load_coordinate(dataset_filename, use_cache, cache_dir, cache_filename if use_cache else None)
+    city_num = len(coord)
+
+    if mmap_mode is not None:
+        tmp_filename = f"{cache_filename['distance']}.{os.getpid()}.tmp"
+        os.makedirs(os.path.dirname(tmp_filename), exist_ok=True)
+        out = np.lib.format.open_memmap(tmp_filename, mode="w+", dtype=dtype, shape=(city_num, city_num))
+        calculate_distance_matrix(coord, header["EDGE_WEIGHT_TYPE"], out=out)
+        out.flush()
+        del out
+        os.replace(tmp_filename, cache_filename["distance"])
+        return city_num, np.load(cache_filename["distance"], mmap_mode=mmap_mode)
+
+    distance = calculate_distance_matrix(coord, header["EDGE_WEIGHT_TYPE"], out=np.empty((city_num, city_num), dtype=dtype))
+    if use_cache:
+        _save_cache(cache_filename["distance"], distance)
+
+    return city_num, distance
+
+
+def load_coordinate(dataset_filename, use_cache=True, cache_dir=None):
+    """ load coordinates of cities
+
+    Arguments:
+    ----------
+        dataset_filename {str} -- dataset file name
+
+    Keyword Arguments:
+    ------------------
+        use_cache {bool} -- whether read and write parsed data as .npy cache (default: True)
+        cache_dir {str} -- directory for cache. If this is None, .tsp_cache next to dataset is used (default: None)
+
+    Returns:
+    --------
+        city_num {int} -- the number of city
+        coord {np.ndarray} -- coordinates of cities, shape is (city_num, 2)
+        edge_weight_type {str} -- EDGE_WEIGHT_TYPE of dataset
+
+    Examples:
+    ---------
+        >>> city_num, coord, edge_weight_type = load_coordinate("kroA100.tsp")
+        >>> coord.shape
+        (100, 2)
+        >>> edge_weight_type
+        'EUC_2D'
+    """
+    header, coord = _load_coordinate(dataset_filename, use_cache, cache_dir)
+    return len(coord), coord, header["EDGE_WEIGHT_TYPE"]
+
+
+def parse_tsplib(dataset_filename):
+    """ parse TSPLIB file according to its header keywords
+
+    Arguments:
+    ----------
+        dataset_filename {str} -- dataset file name
+
+    Returns:
+    --------
+        header {dict} -- header keywords such as NAME, DIMENSION and EDGE_WEIGHT_TYPE
+        coord {np.ndarray} -- coordinates of cities, shape is (city_num, 2)
+
+    Examples:
+    ---------
+        >>> header, coord = parse_tsplib("kroA100.tsp")
+        >>> header["NAME"], header["DIMENSION"], header["EDGE_WEIGHT_TYPE"]
+        ('kroA100', 100, 'EUC_2D')
+    """
+    header = {"EDGE_WEIGHT_TYPE": "EUC_2D"}
+    coord = None
     with open(dataset_filename, "r", encoding="utf-8") as f:
-        for i, line in enumerate(f.readlines()):
-            if i <= 2:
+        for line in f:
+            line = line.strip()
+            if line == "":
                 continue
+            if line == "EOF":
+                break
+
+            if line.startswith("NODE_COORD_SECTION"):
+                if "DIMENSION" not in header:
+                    raise ValueError(f"DIMENSION is not defined before NODE_COORD_SECTION: {dataset_filename}")
+                node = np.loadtxt(f, max_rows=header["DIMENSION"], ndmin=2)
+                coord = np.empty((header["DIMENSION"], 2))
+                coord[node[:, 0].astype(np.int64) - 1] = node[:, 1:3]
+                break
+
+            if line.endswith("_SECTION"):
+                raise ValueError(f"{line} is not supported: {dataset_filename}")
+
+            key, _, value = line.partition(":")
+            header[key.strip()] = value.strip()
+            if key.strip() == "DIMENSION":
+                header["DIMENSION"] = int(header["DIMENSION"])
+
+    if coord is None:
+        raise ValueError(f"NODE_COORD_SECTION is not found: {dataset_filename}")
+
+    return header, coord
+
+
+def calculate_distance(coord, rows, edge_weight_type="EUC_2D"):
+    """ calculate distance from specified cities to all cities
+
+    Arguments:
+    ----------
+        coord {np.ndarray} -- coordinates of cities
+        rows {np.ndarray} -- ids of base cities
+
+    Keyword Arguments:
+    ------------------
+        edge_weight_type {str} -- EUC_2D, CEIL_2D, ATT or GEO (default: "EUC_2D")
+
+    Returns:
+    --------
+        distance {np.ndarray} -- distance array, shape is (len(rows), city_num). Distance to itself is -1
 
-            elif i == 3:
-                city_num = int(line.strip().split(" ")[-1])
-                distance = np.zeros((city_num, city_num))
-                city_info = np.zeros((city_num, 2))
+    Notes:
+    ------
+        EUC_2D distance is not rounded to integer, which is different from TSPLIB.
+    """
+    rows = np.atleast_1d(rows)
+    distance = _calculate(coord[rows, None, :], coord[None, :, :], edge_weight_type)
+    distance[np.arange(len(rows)), rows] = -1
+    return distance
+
+
+def calculate_pair_distance(coord, city1, city2, edge_weight_type="EUC_2D"):
+    """ calculate distance between each pair of cities
 
-            elif 6 <= i <= city_num + 5:
-                split = re.sub(r"\s+", " ", line.strip()).split(" ")
-                city_info[city_cnt][0] = int(split[-2])
-                city_info[city_cnt][1] = int(split[-1])
-                city_cnt += 1
+    Arguments:
+    ----------
+        coord {np.ndarray} -- coordinates of cities
+        city1 {int or np.ndarray} -- ids of cities
+        city2 {int or np.ndarray} -- ids of cities, which is broadcasted with city1
 
-    for i in range(city_num):
-        for j in range(i+1, city_num):
-            dis = pow(pow(city_info[i][0] - city_info[j][0], 2.0) + pow(city_info[i][1] - city_info[j][1], 2.0), 0.5)
-            distance[i, j] = dis
-            distance[j, i] = dis
+    Keyword Arguments:
+    ------------------
+        edge_weight_type {str} -- EUC_2D, CEIL_2D, ATT or GEO (default: "EUC_2D")
+
+    Returns:
+    --------
+        distance {np.ndarray} -- distance of each pair. Distance to itself is -1
+    """
+    city1, city2 = np.broadcast_arrays(city1, city2)
+    distance = _calculate(coord[city1], coord[city2], edge_weight_type)
+    return np.where(city1 == city2, -1.0, distance)
 
-        distance[i, i] = -1
 
-    return city_num, distance
\ No newline at end of file
+def calculate_scalar_distance(dx, dy, edge_weight_type="EUC_2D"):
+    """ calculate distance of a pair of cities from difference of their coordinates without numpy, which is much faster for a single pair
+
+    Arguments:
+    ----------
+        dx {float} -- difference of x coordinates
+        dy {float} -- difference of y coordinates
+
+    Keyword Arguments:
+    ------------------
+        edge_weight_type {str} -- EUC_2D, CEIL_2D or ATT (default: "EUC_2D")
+
+    Returns:
+    --------
+        distance {float} -- distance, which is the same as _calculate
+    """
+    distance = math.sqrt(dx * dx + dy * dy)
+    if edge_weight_type == "CEIL_2D":
+        return float(math.ceil(distance))
+    if edge_weight_type == "ATT":
+        distance /= math.sqrt(10.0)
+        rounded = float(round(distance))
+        return rounded + 1 if rounded < distance else rounded
+    if edge_weight_type != "EUC_2D":
+        raise ValueError(f"EDGE_WEIGHT_TYPE {edge_weight_type} is not supported")
+
+    return distance
+
+
+def calculate_distance_matrix(coord, edge_weight_type="EUC_2D", chunk_size=None, out=None):
+    """ calculate distance between all cities with broadcasting
+
+    Arguments:
+    ----------
+        coord {np.ndarray} -- coordinates of cities
+
+    Keyword Arguments:
+    ------------------
+        edge_weight_type {str} -- EUC_2D, CEIL_2D, ATT or GEO (default: "EUC_2D")
+        chunk_size {int} -- the number of rows which are calculated at once. If this is None, it is decided from memory size (default: None)
+        out {np.ndarray} -- array which distance is written to (default: None)
+
+    Returns:
+    --------
+        distance {np.ndarray} -- distance array
+    """
+    city_num = len(coord)
+    if out is None:
+        out = np.empty((city_num, city_num))
+
+    if chunk_size is None:
+        chunk_size = max(1, _CHUNK_BYTES // (city_num * 8 * 4))
+
+    for start in range(0, city_num, chunk_size):
+        stop = min(start + chunk_size, city_num)
+        out[start:stop] = calculate_distance(coord, np.arange(start, stop), edge_weight_type)
+
+    return out
+
+
+def _calculate(coord1, coord2, edge_weight_type):
+    """ calculate distance between coordinates which are broadcasted with each other
+
+    Arguments:
+    ----------
+        coord1 {np.ndarray} -- coordinates, shape of the last axis is 2
+        coord2 {np.ndarray} -- coordinates, shape of the last axis is 2
+        edge_weight_type {str} -- EUC_2D, CEIL_2D, ATT or GEO
+
+    Returns:
+    --------
+        distance {np.ndarray} -- distance array
+    """
+    if edge_weight_type == "GEO":
+        return _calculate_geo_distance(coord1, coord2)
+
+    diff = coord1 - coord2
+    distance = np.sqrt((diff * diff).sum(axis=-1))
+    if edge_weight_type == "CEIL_2D":
+        distance = np.ceil(distance)
+    elif edge_weight_type == "ATT":
+        distance /= np.sqrt(10.0)
+        rounded = np.rint(distance)
+        distance = np.where(rounded < distance, rounded + 1, rounded)
+    elif edge_weight_type != "EUC_2D":
+        raise ValueError(f"EDGE_WEIGHT_TYPE {edge_weight_type} is not supported")
+
+    return distance
+
+
+def _calculate_geo_distance(coord1, coord2):
+    """ calculate GEO distance which is defined in TSPLIB
+
+    Arguments:
+    ----------
+        coord1 {np.ndarray} -- latitude and longitude, shape of the last axis is 2
+        coord2 {np.ndarray} -- latitude and longitude, shape of the last axis is 2
+
+    Returns:
+    --------
+        distance {np.ndarray} -- distance array
+    """
+    latitude1, longitude1 = _to_radian(coord1)
+    latitude2, longitude2 = _to_radian(coord2)
+
+    q1 = np.cos(longitude1 - longitude2)
+    q2 = np.cos(latitude1 - latitude2)
+    q3 = np.cos(latitude1 + latitude2)
+    cos = np.clip(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1.0, 1.0)
+    return np.trunc(_EARTH_RADIUS * np.arccos(cos) + 1.0)
+
+
+def _to_radian(coord):
+    """ convert TSPLIB's DDD.MM format to radian
+
+    Returns:
+    --------
+        latitude {np.ndarray} -- latitude
+        longitude {np.ndarray} -- longitude
+    """
+    degree = np.trunc(coord)
+    radian = np.pi * (degree + 5.0 * (coord - degree) / 3.0) / 180.0
+    return radian[..., 0], radian[..., 1]
+
+
+def _load_coordinate(dataset_filename, use_cache, cache_dir, cache_filename=None):
+    """ load header and coordinates from cache or dataset
+
+    Keyword Arguments:
+    ------------------
+        cache_filename {dict} -- cache file names which are returned by _get_cache_filename.
+                                 If this is None, they are calculated from dataset (default: None)
+
+    Returns:
+    --------
+        header {dict} -- header keywords
+        coord {np.ndarray} -- coordinates of cities
+    """
+    if use_cache:
+        if cache_filename is None:
+            cache_filename = _get_cache_filename(dataset_filename, cache_dir)
+        if os.path.exists(cache_filename["coord"]) and os.path.exists(cache_filename["header"]):
+            with open(cache_filename["header"], "r", encoding="utf-8") as f:
+                header = json.load(f)
+            return header, np.load(cache_filename["coord"])
+
+    header, coord = parse_tsplib(dataset_filename)
+
+    if use_cache:
+        _save_cache(cache_filename["coord"], coord)
+        _save_cache(cache_filename["header"], header)
+
+    return header, coord
+
+
+def _get_cache_filename(dataset_filename, cache_dir, dtype=np.float64):
+    """ get cache file names which are keyed by hash of dataset and data type of distance
+
+    Returns:
+    --------
+        cache_filename {dict} -- file names of header, coordinates and distance
+    """
+    digest = hashlib.sha1()
+    with open(dataset_filename, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(dataset_filename)), _CACHE_DIRNAME)
+
+    base = os.path.join(cache_dir, digest.hexdigest())
+    return {"header": base + "_header.json", "coord": base + "_coord.npy", "distance": f"{base}_distance_{np.dtype(dtype).name}.npy"}
+
+
+def _save_cache(filename, data):
+    """ save cache atomically, so that other processes never read a partial file
+
+    Arguments:
+    ----------
+        filename {str} -- cache file name
+        data {np.ndarray or dict} -- data to save
+    """
+    tmp_filename = f"{filename}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        if isinstance(data, dict):
+            with open(tmp_filename, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+        else:
+            with open(tmp_filename, "wb") as f:
+                np.save(f, data)
+        os.replace(tmp_filename, filename)
+    except OSError as e:
+        warnings.warn(f"Failed to write cache {filename}: {e}")
@@ -0,0 +1,298 @@
+from collections import OrderedDict
+import numpy as np
+
+from .DataLoader import load_dataset, load_coordinate, calculate_distance, calculate_pair_distance, calculate_scalar_distance
+
+
+def load_distance(dataset, mode="dense", dtype=np.float64, mmap_mode=None, cache_size=0):
+    """ load distance provider
+
+    Arguments:
+    ----------
+        dataset {str, np.ndarray or DistanceBase} -- dataset file name, distance array or distance provider
+
+    Keyword Arguments:
+    ------------------
+        mode {str} -- "dense" holds distance array, "coordinate" calculates distance from coordinates when it's needed (default: "dense")
+        dtype {np.dtype} -- data type of distance (default: np.float64)
+        mmap_mode {str} -- if this is set, distance array is memory-mapped from dataset cache with this mode, only for "dense" (default: None)
+        cache_size {int} -- the number of rows kept by LRU cache, only for "coordinate" (default: 0)
+
+    Returns:
+    --------
+        city_num {int} -- the number of city
+        distance {DistanceBase} -- distance provider
+
+    Examples:
+    ---------
+        >>> city_num, distance = load_distance("kroA100.tsp")
+        >>> distance[0, 1]
+        3988.3174...
+        >>> city_num, distance = load_distance("pla85900.tsp", mode="coordinate", cache_size=1024)
+        >>> distance.row(0).shape
+        (85900,)
+    """
+    if isinstance(dataset, DistanceBase):
+        return len(dataset), dataset
+
+    if isinstance(dataset, np.ndarray):
+        return len(dataset), DenseDistance(dataset)
+
+    if mode == "dense":
+        city_num, distance = load_dataset(dataset, dtype=dtype, mmap_mode=mmap_mode)
+        return city_num, DenseDistance(distance)
+
+    if mode == "coordinate":
+        city_num, coord, edge_weight_type = load_coordinate(dataset)
+        return city_num, CoordinateDistance(coord, edge_weight_type, dtype, cache_size)
+
+    raise ValueError(f"Unknown distance mode: {mode}")
+
+
+class DistanceBase:
+    """ Base class of distance provider.
+    Solvers access distance through this class, so that distance array doesn't have to be held in memory.
+    Indexing follows np.ndarray, such as distance[i, j], distance[i] and distance[route, next_route].
+
+    Attributes:
+    -----------
+        CITY_NUM {int} -- the number of cities
+        dtype {np.dtype} -- data type of distance
+    """
+
+    def __init__(self, city_num, dtype):
+        """
+        Arguments:
+        ----------
+            city_num {int} -- the number of cities
+            dtype {np.dtype} -- data type of distance
+        """
+        self.CITY_NUM = city_num
+        self.dtype = np.dtype(dtype)
+
+    def __len__(self):
+        return self.CITY_NUM
+
+    @property
+    def shape(self):
+        return (self.CITY_NUM, self.CITY_NUM)
+
+    def __getitem__(self, key):
+        """ index distance like np.ndarray
+
+        Arguments:
+        ----------
+            key {int, np.ndarray or tuple} -- index of rows, or a pair of indices
+
+        Returns:
+        --------
+            {float or np.ndarray} -- distance
+        """
+        if not isinstance(key, tuple):
+            return self.row(key) if np.ndim(key) == 0 else self.rows(key)
+
+        city1, city2 = key
+        if isinstance(city2, slice) or city2 is Ellipsis:
+            return self[city1][..., city2]
+
+        return self.pair(city1, city2)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.rows(np.arange(self.CITY_NUM)).astype(dtype or self.dtype, copy=False)
+
+    def row(self, city):
+        """ get distance from a city to all cities
+
+        Arguments:
+        ----------
+            city {int} -- base city
+
+        Returns:
+        --------
+            {np.ndarray} -- distance, shape is (city_num, )
+        """
+        return self.rows([city])[0]
+
+    def rows(self, cities):
+        """ get distance from cities to all cities (this function is implemented in each Child Class)
+
+        Arguments:
+        ----------
+            cities {np.ndarray} -- base cities
+
+        Returns:
+        --------
+            {np.ndarray} -- distance, shape is (len(cities), city_num)
+        """
+        raise NotImplementedError
+
+    def pair(self, city1, city2):
+        """ get distance between each pair of cities (this function is implemented in each Child Class)
+
+        Arguments:
+        ----------
+            city1 {int or np.ndarray} -- cities
+            city2 {int or np.ndarray} -- cities, which is broadcasted with city1
+
+        Returns:
+        --------
+            {float or np.ndarray} -- distance
+        """
+        raise NotImplementedError
+
+    def item(self, city1, city2):
+        """ get distance between two cities as float, which is faster than pair for a single pair
+
+        Arguments:
+        ----------
+            city1 {int} -- city
+            city2 {int} -- city
+
+        Returns:
+        --------
+            {float} -- distance
+        """
+        return float(self.pair(city1, city2))
+
+    def iter_rows(self, chunk_size=1024):
+        """ yield distance by chunk of rows
+
+        Keyword Arguments:
+        ------------------
+            chunk_size {int} -- the number of rows of each chunk (default: 1024)
+
+        Yields:
+        -------
+            start {int} -- first row of chunk
+            stop {int} -- next to last row of chunk
+            distance {np.ndarray} -- distance, shape is (stop - start, city_num)
+        """
+        for start in range(0, self.CITY_NUM, chunk_size):
+            stop = min(start + chunk_size, self.CITY_NUM)
+            yield start, stop, self.rows(np.arange(start, stop))
+
+    def route_distance(self, route):
+        """ calculate distance of closed route
+
+        Arguments:
+        ----------
+            route {list[int] or np.ndarray} -- route, or routes of shape (route_num, city_num)
+
+        Returns:
+        --------
+            {float or np.ndarray} -- distance of each route
+        """
+        route = np.asarray(route)
+        return self.pair(route, np.roll(route, -1, axis=-1)).sum(axis=-1, dtype=np.float64)
+
+
+class DenseDistance(DistanceBase):
+    """ distance provider which holds distance array
+
+    Attributes:
+    -----------
+        CITY_NUM {int} -- the number of cities
+        dtype {np.dtype} -- data type of distance
+        matrix {np.ndarray} -- distance array
+    """
+
+    def __init__(self, matrix):
+        """
+        Arguments:
+        ----------
+            matrix {np.ndarray} -- distance array which is returned by load_dataset
+        """
+        super(DenseDistance, self).__init__(matrix.shape[0], matrix.dtype)
+        self.matrix = matrix
+
+    def __getitem__(self, key):
+        return self.matrix[key]
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.matrix, dtype=dtype)
+
+    def row(self, city):
+        return self.matrix[city]
+
+    def rows(self, cities):
+        return self.matrix[cities]
+
+    def pair(self, city1, city2):
+        return self.matrix[city1, city2]
+
+    def item(self, city1, city2):
+        return self.matrix.item(city1, city2)
+
+    def iter_rows(self, chunk_size=1024):
+        for start in range(0, self.CITY_NUM, chunk_size):
+            stop = min(start + chunk_size, self.CITY_NUM)
+            yield start, stop, self.matrix[start:stop]
+
+
+class CoordinateDistance(DistanceBase):
+    """ distance provider which calculates distance from coordinates in vectorized row batches
+
+    Attributes:
+    -----------
+        CITY_NUM {int} -- the number of cities
+        dtype {np.dtype} -- data type of distance
+        coord {np.ndarray} -- coordinates of cities
+        EDGE_WEIGHT_TYPE {str} -- EUC_2D, CEIL_2D, ATT or GEO
+        CACHE_SIZE {int} -- the number of rows kept by LRU cache
+        cache {OrderedDict} -- LRU cache of rows
+    """
+
+    def __init__(self, coord, edge_weight_type="EUC_2D", dtype=np.float64, cache_size=0):
+        """
+        Arguments:
+        ----------
+            coord {np.ndarray} -- coordinates of cities which are returned by load_coordinate
+
+        Keyword Arguments:
+        ------------------
+            edge_weight_type {str} -- EUC_2D, CEIL_2D, ATT or GEO (default: "EUC_2D")
+            dtype {np.dtype} -- data type of distance (default: np.float64)
+            cache_size {int} -- the number of rows kept by LRU cache (default: 0)
+        """
+        super(CoordinateDistance, self).__init__(len(coord), dtype)
+        self.coord = coord
+        self.EDGE_WEIGHT_TYPE = edge_weight_type
+        self.CACHE_SIZE = cache_size
+        self.cache = OrderedDict()
+        self._x = coord[:, 0].tolist()
+        self._y = coord[:, 1].tolist()
+
+    def rows(self, cities):
+        cities = np.asarray(cities)
+        if self.CACHE_SIZE <= 0:
+            return calculate_distance(self.coord, cities, self.EDGE_WEIGHT_TYPE).astype(self.dtype, copy=False)
+
+        distance = np.empty((len(cities), self.CITY_NUM), dtype=self.dtype)
+        missing = []
+        for i, city in enumerate(cities.tolist()):
+            if city in self.cache:
+                self.cache.move_to_end(city)
+                distance[i] = self.cache[city]
+            else:
+                missing.append(i)
+
+        if len(missing) > 0:
+            distance[missing] = calculate_distance(self.coord, cities[missing], self.EDGE_WEIGHT_TYPE)
+            for i in missing[-self.CACHE_SIZE:]:
+                self.cache[int(cities[i])] = distance[i].copy()
+            while len(self.cache) > self.CACHE_SIZE:
+                self.cache.popitem(last=False)
+
+        return distance
+
+    def pair(self, city1, city2):
+        distance = calculate_pair_distance(self.coord, city1, city2, self.EDGE_WEIGHT_TYPE).astype(self.dtype, copy=False)
+        return distance[()] if distance.ndim == 0 else distance
+
+    def item(self, city1, city2):
+        if city1 == city2:
+            return -1.0
+        if self.EDGE_WEIGHT_TYPE == "GEO":
+            return float(self.pair(city1, city2))
+
+        return calculate_scalar_distance(self._x[city1] - self._x[city2], self._y[city1] - self._y[city2], self.EDGE_WEIGHT_TYPE)
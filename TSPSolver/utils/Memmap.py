@@ -0,0 +1,35 @@
+import tempfile
+import numpy as np
+
+
+def allocate_array(shape, dtype=np.float64, use_mmap=False, filename=None):
+    """ allocate array which is backed by memory or by an anonymous temporary file
+
+    Arguments:
+    ----------
+        shape {tuple[int]} -- shape of array
+
+    Keyword Arguments:
+    ------------------
+        dtype {np.dtype} -- data type (default: np.float64)
+        use_mmap {bool} -- if this is True, array is memory-mapped to a temporary file which is removed when it's closed (default: False)
+        filename {str} -- if this is set with use_mmap, array is memory-mapped to this .npy file instead, which is kept
+                          so that other processes can open it by path (default: None)
+
+    Returns:
+    --------
+        array {np.ndarray} -- uninitialized array
+
+    Examples:
+    ---------
+        >>> pheromone = allocate_array((20000, 20000), np.float32, use_mmap=True)
+        >>> type(pheromone)
+        <class 'numpy.memmap'>
+    """
+    if use_mmap and filename is not None:
+        return np.lib.format.open_memmap(filename, mode="w+", dtype=dtype, shape=shape)
+
+    if use_mmap:
+        return np.memmap(tempfile.TemporaryFile(), dtype=dtype, mode="w+", shape=shape)
+
+    return np.empty(shape, dtype=dtype)
@@ -0,0 +1,211 @@
+import os
+from multiprocessing import shared_memory
+import numpy as np
+
+
+def get_worker_num(n_jobs):
+    """ get the number of worker processes
+
+    Arguments:
+    ----------
+        n_jobs {int} -- the number of jobs. None means 1, and negative value counts back from the number of CPUs like joblib
+
+    Returns:
+    --------
+        {int} -- the number of worker processes
+
+    Examples:
+    ---------
+        >>> get_worker_num(-1) == os.cpu_count()
+        True
+    """
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return max(1, n_jobs)
+
+
+def split_chunk(items, chunk_num):
+    """ split items into chunks whose sizes are as even as possible
+
+    Arguments:
+    ----------
+        items {list} -- items
+        chunk_num {int} -- the number of chunks
+
+    Returns:
+    --------
+        {list[list]} -- chunks, empty chunks are removed
+
+    Examples:
+    ---------
+        >>> split_chunk(list(range(5)), 2)
+        [[0, 1, 2], [3, 4]]
+    """
+    items = list(items)
+    chunk_num = max(1, min(chunk_num, len(items)))
+    size, rest = divmod(len(items), chunk_num)
+    chunks = []
+    start = 0
+    for i in range(chunk_num):
+        stop = start + size + (1 if i < rest else 0)
+        chunks.append(items[start:stop])
+        start = stop
+    return [chunk for chunk in chunks if len(chunk) > 0]
+
+
+class SharedArray:
+    """ np.ndarray on shared memory, which other processes can attach to without copying
+
+    Attributes:
+    -----------
+        array {np.ndarray} -- array on shared memory
+        spec {tuple} -- name, shape and dtype which are passed to attach in other processes
+        shm {SharedMemory} -- shared memory block
+
+    Examples:
+    ---------
+        >>> shared = SharedArray.copy_from(distance)        # in parent process
+        >>> shared.spec
+        ('psm_1a2b3c4d', (100, 100), '<f8')
+        >>> worker = SharedArray.attach(shared.spec)       # in child process
+        >>> worker.array.shape
+        (100, 100)
+        >>> shared.unlink()                                 # in parent process, after all workers finished
+    """
+
+    def __init__(self, shm, shape, dtype, is_owner):
+        """
+        Arguments:
+        ----------
+            shm {SharedMemory} -- shared memory block
+            shape {tuple[int]} -- shape of array
+            dtype {np.dtype} -- data type of array
+            is_owner {bool} -- whether this process created shared memory block
+        """
+        self.shm = shm
+        self._is_owner = is_owner
+        self.array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    @classmethod
+    def create(cls, shape, dtype=np.float64):
+        """ allocate array on new shared memory block
+
+        Arguments:
+        ----------
+            shape {tuple[int]} -- shape of array
+
+        Keyword Arguments:
+        ------------------
+            dtype {np.dtype} -- data type of array (default: np.float64)
+
+        Returns:
+        --------
+            {SharedArray} -- shared array, which is not initialized
+        """
+        dtype = np.dtype(dtype)
+        size = max(1, int(np.prod(shape)) * dtype.itemsize)
+        return cls(shared_memory.SharedMemory(create=True, size=size), tuple(shape), dtype, True)
+
+    @classmethod
+    def copy_from(cls, array):
+        """ copy array to new shared memory block
+
+        Arguments:
+        ----------
+            array {np.ndarray} -- source array
+
+        Returns:
+        --------
+            {SharedArray} -- shared array
+        """
+        array = np.asarray(array)
+        shared = cls.create(array.shape, array.dtype)
+        shared.array[...] = array
+        return shared
+
+    @classmethod
+    def attach(cls, spec):
+        """ attach to shared memory block which is created by other process
+
+        Arguments:
+        ----------
+            spec {tuple} -- spec of SharedArray
+
+        Returns:
+        --------
+            {SharedArray} -- shared array
+        """
+        name, shape, dtype = spec
+        return cls(shared_memory.SharedMemory(name=name), shape, dtype, False)
+
+    @property
+    def spec(self):
+        return (self.shm.name, self.array.shape, self.array.dtype.str)
+
+    def close(self):
+        """ close shared memory block in this process"""
+        self.array = None
+        self.shm.close()
+
+    def unlink(self):
+        """ close and free shared memory block, which is called by creator"""
+        self.close()
+        if self._is_owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.unlink()
+
+
+def share_array(array):
+    """ share read-only array with worker processes.
+    Memory-mapped .npy file, such as distance which is loaded with mmap_mode, is reopened from its path in workers,
+    so that it's neither read into memory nor copied. The other array is copied to shared memory.
+
+    Arguments:
+    ----------
+        array {np.ndarray} -- array to share
+
+    Returns:
+    --------
+        spec {tuple} -- spec which is passed to attach_array in worker processes
+        shared {SharedArray} -- shared array which is unlinked by caller after all workers finished, None for memory-mapped file
+
+    Examples:
+    ---------
+        >>> spec, shared = share_array(distance.matrix)     # in parent process
+        >>> array, worker_shared = attach_array(spec)       # in child process
+    """
+    if isinstance(array, np.memmap) and isinstance(array.filename, str) and array.filename.endswith(".npy"):
+        return ("memmap", array.filename, array.shape, array.dtype.str), None
+
+    shared = SharedArray.copy_from(array)
+    return ("shared", shared.spec), shared
+
+
+def attach_array(spec):
+    """ open array which is shared by share_array
+
+    Arguments:
+    ----------
+        spec {tuple} -- spec which is returned by share_array
+
+    Returns:
+    --------
+        array {np.ndarray} -- shared array, which is read-only when it's memory-mapped file
+        shared {SharedArray} -- shared array which is closed by worker when it finished, None for memory-mapped file
+    """
+    if spec[0] == "memmap":
+        _, filename, shape, dtype = spec
+        array = np.load(filename, mmap_mode="r")
+        if array.shape != tuple(shape) or array.dtype != np.dtype(dtype):
+            raise ValueError(f"Memory-mapped file is changed: {filename}")
+        return array, None
+
+    shared = SharedArray.attach(spec[1])
+    return shared.array, shared
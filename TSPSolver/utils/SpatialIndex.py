@@ -0,0 +1,144 @@
+import numpy as np
+
+
+class GridIndex:
+    """ Uniform grid over coordinates for nearest-neighbour queries.
+    Cities can be removed from the index, so that queries return the nearest city which is not removed yet.
+
+    Attributes:
+    -----------
+        coord {np.ndarray} -- coordinates of cities
+        cell_size {float} -- width of each cell
+        cell {list[set[int]]} -- cities in each cell
+        city_cell {np.ndarray} -- cell of each city as (x, y)
+        remaining {np.ndarray} -- cities which are not removed, its first remaining_num elements are valid
+        remaining_num {int} -- the number of cities which are not removed
+
+    Examples:
+    ---------
+        >>> index = GridIndex(coord)
+        >>> index.remove(0)
+        >>> index.nearest(0)
+        53
+    """
+
+    def __init__(self, coord, city_per_cell=2.0):
+        """
+        Arguments:
+        ----------
+            coord {np.ndarray} -- coordinates of cities, shape is (city_num, 2)
+
+        Keyword Arguments:
+        ------------------
+            city_per_cell {float} -- average number of cities in a cell (default: 2.0)
+        """
+        self.coord = np.asarray(coord, dtype=np.float64)
+        self._x = self.coord[:, 0].tolist()
+        self._y = self.coord[:, 1].tolist()
+        city_num = len(self.coord)
+        self._origin = self.coord.min(axis=0)
+        span = self.coord.max(axis=0) - self._origin
+        self.cell_size = max(span.max() / max(1.0, np.sqrt(city_num / city_per_cell)), 1e-12)
+
+        self.city_cell = ((self.coord - self._origin) / self.cell_size).astype(np.int64)
+        self._cell_shape = tuple(self.city_cell.max(axis=0) + 1)
+        self.cell = [set() for _ in range(self._cell_shape[0] * self._cell_shape[1])]
+        for city, (x, y) in enumerate(self.city_cell.tolist()):
+            self.cell[x * self._cell_shape[1] + y].add(city)
+
+        self.remaining = np.arange(city_num)
+        self._position = np.arange(city_num)
+        self.remaining_num = city_num
+
+    def __len__(self):
+        return self.remaining_num
+
+    def remove(self, city):
+        """ remove city from index
+
+        Arguments:
+        ----------
+            city {int} -- city to remove
+        """
+        x, y = self.city_cell[city].tolist()
+        self.cell[x * self._cell_shape[1] + y].discard(city)
+
+        # swap city with the last remaining city
+        pos = self._position[city]
+        last = self.remaining[self.remaining_num - 1]
+        self.remaining[pos], self.remaining[self.remaining_num - 1] = last, city
+        self._position[last], self._position[city] = pos, self.remaining_num - 1
+        self.remaining_num -= 1
+
+    def nearest(self, city):
+        """ find the nearest city which is not removed
+
+        Arguments:
+        ----------
+            city {int} -- base city
+
+        Returns:
+        --------
+            {int} -- the nearest city, or None if all cities are removed
+        """
+        if self.remaining_num == 0:
+            return None
+
+        x, y = self.city_cell[city].tolist()
+        px, py = self._x[city], self._y[city]
+        best_city = None
+        best_distance = np.inf
+        checked_cell = 0
+
+        for radius in range(max(self._cell_shape)):
+            # cells out of ring are at least (radius - 1) cells away from base city
+            if best_distance <= ((radius - 1) * self.cell_size) ** 2:
+                break
+
+            # scanning empty cells costs more than checking all remaining cities
+            if checked_cell > self.remaining_num:
+                return self._nearest_brute_force(city)
+
+            for cell in self._ring(x, y, radius):
+                checked_cell += 1
+                for cand in self.cell[cell]:
+                    dx = self._x[cand] - px
+                    dy = self._y[cand] - py
+                    distance = dx * dx + dy * dy
+                    if distance < best_distance or (distance == best_distance and cand < best_city):
+                        best_distance = distance
+                        best_city = cand
+
+        return best_city
+
+    def _nearest_brute_force(self, city):
+        """ find the nearest city by checking all remaining cities
+
+        Arguments:
+        ----------
+            city {int} -- base city
+
+        Returns:
+        --------
+            {int} -- the nearest city
+        """
+        cand = np.sort(self.remaining[:self.remaining_num])
+        diff = self.coord[cand] - self.coord[city]
+        return int(cand[(diff * diff).sum(axis=1).argmin()])
+
+    def _ring(self, x, y, radius):
+        """ yield cells whose Chebyshev distance from (x, y) is radius
+
+        Yields:
+        -------
+            {int} -- cell id
+        """
+        width, height = self._cell_shape
+        for i in range(max(0, x - radius), min(width, x + radius + 1)):
+            if abs(i - x) == radius:
+                for j in range(max(0, y - radius), min(height, y + radius + 1)):
+                    yield i * height + j
+            else:
+                for j in (y - radius, y + radius):
+                    if 0 <= j < height:
+                        yield i * height + j
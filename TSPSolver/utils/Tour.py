@@ -0,0 +1,236 @@
+import numpy as np
+
+
+class Tour:
+    """ Closed tour which holds order of cities and position of each city.
+    next, prev and between are O(1), and path is reversed on its shorter side.
+    Tour can also hold a part of cities, so that it's built by append and insert like list.
+
+    Attributes:
+    -----------
+        CITY_NUM {int} -- the number of all cities
+        order {np.ndarray} -- cities in tour order, its first len(tour) elements are valid
+        position {np.ndarray} -- position of each city in order, -1 for cities which are not in tour
+
+    Examples:
+    ---------
+        >>> tour = Tour([0, 1, 2, 3, 4])
+        >>> tour.next(4)
+        0
+        >>> tour.two_opt_move(0, 1, 3, 4)       # (0, 1), (3, 4) are replaced with (0, 3), (1, 4)
+        >>> sorted((tour.prev(0), tour.next(0)))
+        [3, 4]
+        >>> tour.to_array(0)                    # the shorter side, 4 and 0, is reversed
+        array([0, 4, 1, 2, 3])
+        >>> tour = Tour([0], 5)
+        >>> tour.append(3)
+        >>> tour.insert(1, 2)
+        >>> list(tour)
+        [0, 2, 3]
+    """
+
+    def __init__(self, route, city_num=None):
+        """
+        Arguments:
+        ----------
+            route {list[int] or np.ndarray} -- route
+
+        Keyword Arguments:
+        ------------------
+            city_num {int} -- the number of all cities. If this is None, route has all cities (default: None)
+        """
+        route = np.asarray(route, dtype=np.int64)
+        self.CITY_NUM = len(route) if city_num is None else city_num
+        self.order = np.empty(self.CITY_NUM, dtype=np.int64)
+        self.order[:len(route)] = route
+        self.position = np.full(self.CITY_NUM, -1, dtype=np.int64)
+        self.position[route] = np.arange(len(route))
+        self._size = len(route)
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        return iter(self.order[:self._size].tolist())
+
+    def __getitem__(self, idx):
+        city = self.order[:self._size][idx]
+        return int(city) if np.ndim(city) == 0 else city
+
+    def __contains__(self, city):
+        return self.position[city] >= 0
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.order[:self._size], dtype=dtype)
+
+    @property
+    def route(self):
+        return self.order[:self._size]
+
+    def to_array(self, start=None):
+        """ get cities in tour order
+
+        Keyword Arguments:
+        ------------------
+            start {int} -- first city. If this is None, the first city of order is used (default: None)
+
+        Returns:
+        --------
+            {np.ndarray} -- route
+        """
+        if start is None:
+            return self.route.copy()
+
+        return np.roll(self.route, -int(self.position[start]))
+
+    def next(self, city):
+        """ get next city
+
+        Arguments:
+        ----------
+            city {int} -- city
+
+        Returns:
+        --------
+            {int} -- next city
+        """
+        pos = self.position[city] + 1
+        return int(self.order[pos if pos < self._size else 0])
+
+    def prev(self, city):
+        """ get previous city
+
+        Arguments:
+        ----------
+            city {int} -- city
+
+        Returns:
+        --------
+            {int} -- previous city
+        """
+        pos = self.position[city]
+        return int(self.order[pos - 1 if pos > 0 else self._size - 1])
+
+    def between(self, city1, city2, city3):
+        """ check whether city2 is on path from city1 to city3 in tour order
+
+        Arguments:
+        ----------
+            city1 {int} -- first city of path
+            city2 {int} -- city to check
+            city3 {int} -- last city of path
+
+        Returns:
+        --------
+            {bool} -- True when city2 is on the path, including both ends
+        """
+        pos1, pos2, pos3 = self.position[city1], self.position[city2], self.position[city3]
+        if pos1 <= pos3:
+            return bool(pos1 <= pos2 <= pos3)
+
+        return bool(pos2 >= pos1 or pos2 <= pos3)
+
+    def append(self, city):
+        """ append city to the end of order
+
+        Arguments:
+        ----------
+            city {int} -- city which is not in tour
+        """
+        self.order[self._size] = city
+        self.position[city] = self._size
+        self._size += 1
+
+    def insert(self, idx, city):
+        """ insert city before idx-th city of order like list.insert
+
+        Arguments:
+        ----------
+            idx {int} -- position to insert
+            city {int} -- city which is not in tour
+        """
+        idx = min(idx, self._size)
+        self.order[idx+1:self._size+1] = self.order[idx:self._size]
+        self.position[self.order[idx+1:self._size+1]] += 1
+        self.order[idx] = city
+        self.position[city] = idx
+        self._size += 1
+
+    def reverse(self, city1, city2):
+        """ reverse path from city1 to city2 in tour order. If the rest of tour is shorter, it's reversed instead, which makes the same tour
+
+        Arguments:
+        ----------
+            city1 {int} -- first city of path
+            city2 {int} -- last city of path
+        """
+        size = self._size
+        start = int(self.position[city1])
+        length = (int(self.position[city2]) - start) % size + 1
+        if 2 * length > size:
+            start = (start + length) % size
+            length = size - length
+        if length <= 1:
+            return
+
+        if start + length <= size:
+            idx = slice(start, start + length)
+            self.order[idx] = self.order[idx][::-1]
+            self.position[self.order[idx]] = np.arange(start, start + length)
+        else:
+            idx = (start + np.arange(length)) % size
+            self.order[idx] = self.order[idx[::-1]]
+            self.position[self.order[idx]] = idx
+
+    def two_opt_move(self, city1, city2, city3, city4):
+        """ replace edges (city1, city2) and (city3, city4) with (city1, city3) and (city2, city4)
+
+        Arguments:
+        ----------
+            city1 {int} -- city
+            city2 {int} -- next of city1, or previous of city1 when city4 is previous of city3
+            city3 {int} -- city
+            city4 {int} -- next of city3, or previous of city3 when city2 is previous of city1
+        """
+        if city2 == self.next(city1):
+            self.reverse(city2, city3)
+        else:
+            self.reverse(city1, city4)
+
+    def move_segment(self, city1, city2, city3, city4):
+        """ move path between city1 and city2 between adjacent city3 and city4, so that city1 is connected to city3 and city2 to city4
+
+        Arguments:
+        ----------
+            city1 {int} -- one end of path, which is not longer than the rest of tour
+            city2 {int} -- the other end of path
+            city3 {int} -- city which is not in path
+            city4 {int} -- city next to city3, which is not in path
+        """
+        # path from city1 to city2 in tour order has to be the segment, not the rest of tour
+        if (self.position[city2] - self.position[city1]) % self._size > (self.position[city1] - self.position[city2]) % self._size:
+            city1, city2, city3, city4 = city2, city1, city4, city3
+
+        prev_city = self.prev(city1)
+        next_city = self.next(city2)
+        is_forward = city4 == self.next(city3)
+        if not is_forward:
+            city3, city4 = city4, city3
+
+        # segment is inserted between city3 and city4 in reversed order by two 2-opt moves
+        self.two_opt_move(prev_city, city1, city3, city4)
+        self.two_opt_move(prev_city, city3, next_city, city2)
+        if is_forward:
+            self.two_opt_move(city3, city2, city1, city4)
+
+    def double_bridge(self, pos1, pos2, pos3):
+        """ swap path order[pos1:pos2] and order[pos2:pos3], which is double-bridge move
+
+        Arguments:
+        ----------
+            pos1 {int} -- first position of the first path
+            pos2 {int} -- first position of the second path
+            pos3 {int} -- next to last position of the second path, which is at most len(tour)
+        """
+        self.order[pos1:pos3] = np.concatenate((self.order[pos2:pos3], self.order[pos1:pos2]))
+        self.position[self.order[pos1:pos3]] = np.arange(pos1, pos3)